@@ -0,0 +1,102 @@
+import pytest
+
+from src.observability.testing import QueryBudget
+
+
+@pytest.fixture
+def query_budget():
+    """Assert query count, duplicate (N+1) and duration budgets in tests."""
+    return QueryBudget()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with empty in-process rate limit counters."""
+    from src.api.throttling import reset
+
+    reset()
+
+
+@pytest.fixture
+def petition(db):
+    """Create a petition without signatures."""
+    from src.petitions.models import Petition
+
+    return Petition.objects.create(
+        name="Test Petition",
+        target=100,
+        email_subject="Thank you for signing",
+        email_content="Thank you for supporting our cause.",
+    )
+
+
+@pytest.fixture
+def signatures(request, petition):
+    """
+    Sign ``petition`` by a few people.
+
+    Three signatures, unless a test asks for another count with
+    ``@pytest.mark.parametrize("signatures", [count], indirect=True)``.
+    """
+    from src.petitions.models import PetitionSignature
+
+    return [
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="John",
+            last_name=f"Doe{i}",
+            email=f"john{i}@example.com",
+            phone_number="+48123456789",
+        )
+        for i in range(getattr(request, "param", 3))
+    ]
+
+
+@pytest.fixture
+def home_page(db):
+    """Create a home page served by the default site."""
+    from wagtail.models import Page, Site
+
+    from src.cms.models import HomePage
+
+    root = Page.get_first_root_node()
+    home = root.add_child(instance=HomePage(title="Home", slug="home-test"))
+    Site.objects.update_or_create(
+        is_default_site=True,
+        defaults={"hostname": "localhost", "root_page": home},
+    )
+    return home
+
+
+@pytest.fixture
+def petition_page(home_page, petition):
+    """Publish a page for ``petition`` at /save-the-park/."""
+    from src.cms.models import PetitionPage
+
+    page = home_page.add_child(
+        instance=PetitionPage(
+            title="Save the park", slug="save-the-park", petition=petition
+        )
+    )
+    page.save_revision().publish()
+    return page
+
+
+@pytest.fixture
+def sign_petition():
+    """Return a helper that signs a petition through the API."""
+
+    def sign(client, petition, email="jane@example.com", **extra):
+        return client.post(
+            f"/api/petitions/{petition.id}/signatures",
+            {
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": email,
+                "phone_number": "+48123456789",
+            },
+            content_type="application/json",
+            **extra,
+        )
+
+    return sign
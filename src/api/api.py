@@ -11,6 +11,10 @@ api = NinjaAPI(
 
 # Import and include routers from endpoints
 from src.api.endpoints.petitions import router as petitions_router
+from src.api.endpoints.signatures import router as signatures_router
+from src.api.endpoints.pages import router as pages_router
 
 # Add routers to the API
 api.add_router("/petitions/", petitions_router)
+api.add_router("/signatures/", signatures_router)
+api.add_router("/pages/", pages_router)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.api"
+
+    def ready(self):
+        from src.api import signals  # noqa: F401
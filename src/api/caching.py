@@ -0,0 +1,187 @@
+"""
+HTTP caching for public petition reads.
+
+``conditional`` wraps a Ninja operation (with ``decorate_view``) so that a
+GET whose If-None-Match still matches is answered with a 304 before the
+view runs: no serialization and no queries beyond computing the ETag. Both
+200 and 304 responses carry the ETag, the operation's Cache-Control and,
+for CDNs, its surrogate keys, which purge_petition purges when a petition
+changes.
+"""
+
+import functools
+import json
+import logging
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from src.petitions.models import Petition, PetitionSignature
+
+logger = logging.getLogger(__name__)
+
+LIST_SURROGATE_KEY = "petition-list"
+
+
+def _timestamp(value):
+    return int(value.timestamp() * 1_000_000) if value is not None else 0
+
+
+def _etag(*parts):
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _petition_parts(petition):
+    return petition.version, _timestamp(petition.updated_at), petition.signature_count
+
+
+def petition_etag(petition):
+    """
+    The ETag of a petition's representations.
+
+    Changes with every edit and every new signature. It starts with the
+    petition's version, which is all If-Match on updates compares (see
+    etag_version), so new signatures never make an edit fail.
+    """
+    return _etag(*_petition_parts(petition))
+
+
+def etag_version(etag):
+    """The petition version ``etag`` was made at, or None if it is not ours."""
+    try:
+        return int(etag.removeprefix("W/").strip('"').split("-")[0])
+    except ValueError:
+        return None
+
+
+def petition_surrogate_key(petition_id):
+    return f"petition-{petition_id}"
+
+
+def _get_petition(petition_id):
+    return (
+        Petition.objects.filter(pk=petition_id)
+        .only("version", "updated_at", "signature_count")
+        .first()
+    )
+
+
+def petition_widget_etag(request, petition_id, **kwargs):
+    petition = _get_petition(petition_id)
+    return petition_etag(petition) if petition is not None else None
+
+
+def petition_detail_etag(request, petition_id, **kwargs):
+    """
+    The petition's ETag extended with the state of its signatures.
+
+    The detail lists the signatures, which can be edited or deleted without
+    touching the petition: the count catches deletions, the highest ID a
+    deletion followed by a new signature and the latest updated_at edits.
+    """
+    petition = _get_petition(petition_id)
+    if petition is None:
+        return None
+    signatures = PetitionSignature.objects.filter(petition_id=petition_id).aggregate(
+        count=Count("id"), last_id=Max("id"), updated_at=Max("updated_at")
+    )
+    return _etag(
+        *_petition_parts(petition),
+        signatures["count"],
+        signatures["last_id"] or 0,
+        _timestamp(signatures["updated_at"]),
+    )
+
+
+def petition_list_etag(request, **kwargs):
+    # Counts only grow and edits bump updated_at; deletions change the count
+    state = Petition.objects.aggregate(
+        petitions=Count("id"),
+        updated_at=Max("updated_at"),
+        signatures=Sum("signature_count"),
+    )
+    return _etag(
+        state["petitions"], _timestamp(state["updated_at"]), state["signatures"] or 0
+    )
+
+
+def _matches(etag, if_none_match):
+    # If-None-Match uses weak comparison: CDNs weaken ETags they compress
+    tags = parse_etags(if_none_match)
+    return "*" in tags or etag in {tag.removeprefix("W/") for tag in tags}
+
+
+def conditional(etag_func, cache_control, surrogate_keys=None):
+    """
+    Conditional GET for a Ninja operation; use with ``decorate_view``.
+
+    ``etag_func(request, **path_params)`` returns the current ETag, or None
+    to let the view answer (with a 404, say). ``cache_control`` holds
+    ``patch_cache_control`` arguments and ``surrogate_keys(**path_params)``
+    the keys to tag the response with.
+    """
+
+    def decorator(run):
+        @functools.wraps(run)
+        def wrapper(request, **kwargs):
+            etag = etag_func(request, **kwargs)
+            if etag is None:
+                return run(request, **kwargs)
+            if _matches(etag, request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+            else:
+                response = run(request, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response["ETag"] = etag
+            patch_cache_control(response, **cache_control)
+            if surrogate_keys is not None:
+                response[settings.SURROGATE_KEY_HEADER] = " ".join(
+                    surrogate_keys(**kwargs)
+                )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def purge_surrogate_keys(keys):
+    """
+    Ask the CDN to drop everything tagged with ``keys``.
+
+    Posts ``{"surrogate_keys": [...]}`` to CDN_PURGE_URL with the shared
+    token as a bearer token. Does nothing when no purge hook is configured.
+    Returns True when the CDN accepted the request.
+    """
+    if not settings.CDN_PURGE_URL or not keys:
+        return False
+    request = urllib.request.Request(
+        settings.CDN_PURGE_URL,
+        data=json.dumps({"surrogate_keys": keys}).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {settings.CDN_PURGE_TOKEN}",
+        },
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(
+            request, timeout=settings.CDN_PURGE_TIMEOUT
+        ) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError) as exc:
+        logger.warning("CDN purge failed for %s: %s", keys, exc)
+        return False
+
+
+def purge_petition(petition_id):
+    """Purge the cached widget and list responses showing a petition."""
+    return purge_surrogate_keys(
+        [petition_surrogate_key(petition_id), LIST_SURROGATE_KEY]
+    )
@@ -0,0 +1,47 @@
+from ninja import Query, Router
+from ninja.errors import HttpError
+
+from src.api.schemas.pages import PageSearchResponse
+from src.cms.search import SearchTimeout, search_petition_pages
+
+# Create a router for CMS page endpoints
+router = Router()
+
+
+@router.get("/search", response=PageSearchResponse)
+def search(
+    request,
+    q: str = Query(..., min_length=2, max_length=200),
+    page: int = Query(1, ge=1, le=100),
+    page_size: int = Query(20, ge=1, le=50),
+):
+    """
+    Full-text search over published petition pages, best match first.
+
+    Matches page titles, intros and the linked petition's name. Answers
+    503 when the search exceeds its latency budget.
+    """
+    try:
+        pages, has_next = search_petition_pages(
+            q, offset=(page - 1) * page_size, limit=page_size
+        )
+    except SearchTimeout:
+        raise HttpError(503, "Search is taking too long, please try again")
+
+    results = [
+        {
+            "id": result.id,
+            "title": result.title,
+            "url": result.get_url(request),
+            "petition_id": result.petition_id,
+            "petition_name": result.petition.name if result.petition else None,
+            "score": getattr(result, "score", None),
+        }
+        for result in pages
+    ]
+    return {
+        "results": results,
+        "page": page,
+        "page_size": page_size,
+        "has_next": has_next,
+    }
@@ -1,8 +1,27 @@
-from typing import List
+import datetime
+from typing import List, Literal, Optional
 from ninja import Router
+from ninja.decorators import decorate_view
+from ninja.errors import HttpError
+from ninja.security import django_auth
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-
+from django.utils.http import parse_etags
+
+from src.api.caching import (
+    LIST_SURROGATE_KEY,
+    conditional,
+    etag_version,
+    petition_detail_etag,
+    petition_etag,
+    petition_list_etag,
+    petition_surrogate_key,
+    petition_widget_etag,
+)
+from src.api.idempotency import idempotent
+from src.api.throttling import client_ip, email_hash, path_param, throttle
 from src.api.schemas.petitions import (
     PetitionCreate,
     PetitionUpdate,
@@ -10,20 +29,38 @@ from src.api.schemas.petitions import (
     PetitionDetailResponse,
     PetitionSignatureCreate,
     PetitionSignatureResponse,
+    PetitionWidgetResponse,
+    SignatureExportQueuedResponse,
+)
+from src.petitions.exports import (
+    export_filename,
+    filter_signatures,
+    stream_signatures_csv,
 )
+from src.observability.metrics import record_signatures
+from src.petitions import services
 from src.petitions.models import Petition, PetitionSignature
+from src.petitions.services import increment_signature_count
 
 # Create a router for petition endpoints
 router = Router()
 
 
 @router.get("/", response=List[PetitionResponse])
+@decorate_view(
+    conditional(
+        petition_list_etag,
+        settings.PETITION_LIST_CACHE_CONTROL,
+        surrogate_keys=lambda: [LIST_SURROGATE_KEY],
+    )
+)
 def list_petitions(request):
     """Get a list of all petitions"""
     return Petition.objects.all()
 
 
 @router.post("/", response=PetitionResponse)
+@decorate_view(idempotent("petitions"))
 def create_petition(request, payload: PetitionCreate):
     """Create a new petition"""
     petition = Petition.objects.create(
@@ -36,24 +73,63 @@ def create_petition(request, payload: PetitionCreate):
 
 
 @router.get("/{petition_id}", response=PetitionDetailResponse)
+# The signatures hold signers' contact details: browsers may keep the
+# response, but must revalidate it, and shared caches must not store it
+@decorate_view(conditional(petition_detail_etag, {"private": True, "no_cache": True}))
 def get_petition(request, petition_id: int):
     """Get details of a specific petition including signatures"""
     petition = get_object_or_404(Petition, id=petition_id)
     return petition
 
 
+@router.get("/{petition_id}/widget", response=PetitionWidgetResponse)
+@decorate_view(
+    conditional(
+        petition_widget_etag,
+        settings.PETITION_WIDGET_CACHE_CONTROL,
+        surrogate_keys=lambda petition_id: [petition_surrogate_key(petition_id)],
+    )
+)
+def petition_widget(request, response: HttpResponse, petition_id: int):
+    """Get the progress of a petition, for progress bars on partner sites"""
+    petition = get_object_or_404(
+        Petition.objects.only("name", "target", "signature_count"), id=petition_id
+    )
+    # Public data only, so any site may fetch it
+    response["Access-Control-Allow-Origin"] = "*"
+    return petition
+
+
 @router.put("/{petition_id}", response=PetitionResponse)
-def update_petition(request, petition_id: int, payload: PetitionUpdate):
-    """Update a petition"""
+def update_petition(
+    request, response: HttpResponse, petition_id: int, payload: PetitionUpdate
+):
+    """
+    Update a petition
+
+    Send the ETag of the petition as If-Match to have the update refused with
+    a 412 if someone else edited the petition in the meantime. New signatures
+    do not count as edits.
+    """
     petition = get_object_or_404(Petition, id=petition_id)
 
-    # Update only the fields that are provided
-    update_data = payload.dict(exclude_unset=True)
-
-    for key, value in update_data.items():
-        setattr(petition, key, value)
+    expected_version = None
+    if_match = request.headers.get("If-Match")
+    if if_match and if_match.strip() != "*":
+        versions = {etag_version(etag) for etag in parse_etags(if_match)}
+        if petition.version not in versions:
+            raise HttpError(412, "The petition has changed, fetch it again")
+        expected_version = petition.version
 
-    petition.save()
+    # Update only the fields that are provided
+    try:
+        services.update_petition(
+            petition, payload.dict(exclude_unset=True), expected_version
+        )
+    except services.StaleVersion:
+        raise HttpError(412, "The petition has changed, fetch it again")
+
+    response["ETag"] = petition_etag(petition)
     return petition
 
 
@@ -66,6 +142,18 @@ def delete_petition(request, petition_id: int):
 
 
 @router.post("/{petition_id}/signatures", response=PetitionSignatureResponse)
+@decorate_view(
+    # Checked before the payload is parsed, so floods never reach validation,
+    # the database or the broker
+    throttle(
+        "signatures",
+        ip=client_ip,
+        petition=path_param("petition_id"),
+        email=email_hash,
+    ),
+    # Outermost: retries are replayed before they count against the limits
+    idempotent("signatures"),
+)
 @transaction.atomic
 def create_signature(request, petition_id: int, payload: PetitionSignatureCreate):
     """Add a signature to a petition"""
@@ -82,9 +170,10 @@ def create_signature(request, petition_id: int, payload: PetitionSignatureCreate
         phone_consent=payload.phone_consent,
     )
 
-    # Increment the signature count
-    petition.signature_count += 1
-    petition.save()
+    # Increment the signature count without saving the petition, so the
+    # cached petition pages are not invalidated by every signature
+    increment_signature_count(petition.id)
+    record_signatures()
 
     # Send confirmation email using Celery task
     from src.tasks.tasks import send_petition_confirmation_email
@@ -99,3 +188,57 @@ def list_signatures(request, petition_id: int):
     """Get all signatures for a petition"""
     petition = get_object_or_404(Petition, id=petition_id)
     return petition.signatures.all()
+
+
+@router.get(
+    "/{petition_id}/signatures/export",
+    response={202: SignatureExportQueuedResponse},
+    auth=django_auth,
+)
+def export_signatures(
+    request,
+    petition_id: int,
+    format: Literal["csv", "xlsx"] = "csv",
+    email_consent: Optional[bool] = None,
+    phone_consent: Optional[bool] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    background: bool = False,
+):
+    """
+    Export the signatures of a petition (staff only).
+
+    CSV exports are streamed directly. XLSX exports, and any export requested
+    with ``background=true``, are written to media storage by a Celery task
+    and the requesting user is emailed a link when the file is ready.
+    """
+    if not request.user.is_staff:
+        raise HttpError(403, "Only staff members can export signatures")
+
+    petition = get_object_or_404(Petition, id=petition_id)
+
+    if format == "csv" and not background:
+        queryset = filter_signatures(
+            petition.signatures.all(),
+            email_consent=email_consent,
+            phone_consent=phone_consent,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        return stream_signatures_csv(queryset, export_filename(petition, "csv"))
+
+    from src.tasks.tasks import export_petition_signatures
+
+    result = export_petition_signatures.delay(
+        petition.id,
+        file_format=format,
+        filters={
+            "email_consent": email_consent,
+            "phone_consent": phone_consent,
+            "date_from": date_from.isoformat() if date_from else None,
+            "date_to": date_to.isoformat() if date_to else None,
+        },
+        notify_email=request.user.email or None,
+        base_url=request.build_absolute_uri("/"),
+    )
+    return 202, {"task_id": result.id}
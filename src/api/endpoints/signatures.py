@@ -0,0 +1,43 @@
+from typing import Optional
+
+from ninja import Query, Router
+from ninja.errors import HttpError
+from ninja.security import django_auth
+
+from src.api.schemas.signatures import SignatureSearchResponse
+from src.petitions.models import PetitionSignature
+from src.petitions.pagination import keyset_page
+from src.petitions.search import MIN_TERM_LENGTH, search_signatures
+
+# Create a router for signature endpoints
+router = Router()
+
+
+@router.get("/search", response=SignatureSearchResponse, auth=django_auth)
+def search(
+    request,
+    q: str = Query(..., min_length=MIN_TERM_LENGTH),
+    petition_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, gt=0, le=200),
+):
+    """
+    Search signatures by name, email or phone (staff only).
+
+    Results are ordered newest first and paginated by keyset: pass the
+    returned ``next_cursor`` as ``cursor`` to fetch the following page.
+    """
+    if not request.user.is_staff:
+        raise HttpError(403, "Only staff members can search signatures")
+
+    queryset = PetitionSignature.objects.all()
+    if petition_id is not None:
+        queryset = queryset.filter(petition_id=petition_id)
+    queryset = search_signatures(queryset, q)
+
+    try:
+        results, next_cursor = keyset_page(queryset, cursor, limit)
+    except ValueError:
+        raise HttpError(400, "Invalid cursor")
+
+    return {"results": results, "next_cursor": next_cursor}
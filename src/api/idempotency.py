@@ -0,0 +1,164 @@
+"""
+Idempotency-Key support for Ninja operations that create things.
+
+A client that sends ``Idempotency-Key`` with a POST may retry it safely: the
+first response is stored in the default cache (Redis in production) for
+IDEMPOTENCY_TTL seconds and replayed for every retry with the same key,
+without running the view again. While the first request is still running,
+retries get a 409 with Retry-After instead of racing it or tying up a worker
+waiting for it.
+"""
+
+import functools
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse, JsonResponse
+
+from src.api.throttling import client_ip
+
+HEADER = "Idempotency-Key"
+# Headers not worth replaying; the middleware outside the view sets them again
+_SKIPPED_HEADERS = {"content-length", "vary"}
+# Answers that only describe the moment of the request: a retry should run
+# the view again rather than be told to wait for the rest of IDEMPOTENCY_TTL
+_TRANSIENT_STATUSES = {408, 409, 425, 429}
+
+# KEYS: the lock key. ARGV: the token it was taken with. Deletes the lock only
+# if it still holds the token, so a request whose lock expired can't release
+# the lock another request has taken since.
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _fingerprint(request):
+    digest = hashlib.sha256()
+    for part in (request.method, request.get_full_path(), request.body):
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _client(request):
+    """Who sent the request: keys are only shared by requests of one client."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{client_ip(request)}"
+
+
+def _keys(scope, client, key):
+    digest = hashlib.sha256(f"{client}\0{key}".encode()).hexdigest()
+    base = f"idempotency:{scope}:{digest}"
+    return f"{base}:response", f"{base}:lock"
+
+
+def _release(lock_key, token):
+    """Delete ``lock_key`` if it still holds ``token``."""
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        key = backend.make_and_validate_key(lock_key)
+        # Integer tokens are stored unpickled, so the script can compare them
+        client = backend._cache.get_client(key, write=True)
+        client.eval(RELEASE_SCRIPT, 1, key, token)
+    elif cache.get(lock_key) == token:
+        # Process-local caches (tests, development) have no other processes
+        # to race with
+        cache.delete(lock_key)
+
+
+def _replay(stored, fingerprint):
+    if stored["fingerprint"] != fingerprint:
+        return JsonResponse(
+            {"detail": f"{HEADER} was already used for a different request"},
+            status=422,
+        )
+    response = HttpResponse(stored["content"], status=stored["status"])
+    for header, value in stored["headers"]:
+        response[header] = value
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _store(response_key, response, fingerprint):
+    cache.set(
+        response_key,
+        {
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "headers": [
+                (header, value)
+                for header, value in response.items()
+                if header.lower() not in _SKIPPED_HEADERS
+            ],
+            "content": response.content,
+        },
+        settings.IDEMPOTENCY_TTL,
+    )
+
+
+def idempotent(scope):
+    """
+    Honour ``Idempotency-Key`` on a Ninja operation; use with ``decorate_view``.
+
+    Keys are scoped by ``scope`` and by client (user, or IP address for
+    anonymous requests), and must be reused only for the same method, path
+    and body, otherwise the retry is refused with a 422. Server errors and
+    transient refusals such as a 429 are not stored, so a retry after them
+    runs the view again. A retry that arrives while the first request is
+    still running gets a 409 with Retry-After.
+    """
+
+    def decorator(run):
+        @functools.wraps(run)
+        def wrapper(request, **kwargs):
+            key = request.headers.get(HEADER)
+            if key is None:
+                return run(request, **kwargs)
+            if not key or len(key) > 255:
+                return JsonResponse(
+                    {"detail": f"{HEADER} must be 1 to 255 characters"}, status=400
+                )
+
+            fingerprint = _fingerprint(request)
+            response_key, lock_key = _keys(scope, _client(request), key)
+            stored = cache.get(response_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            token = secrets.randbits(63)
+            if not cache.add(lock_key, token, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                # Another request with this key is running; don't hold a
+                # worker waiting for it
+                response = JsonResponse(
+                    {"detail": f"A request with this {HEADER} is in progress"},
+                    status=409,
+                )
+                response["Retry-After"] = "1"
+                return response
+            # The first request may have finished between the two lookups
+            stored = cache.get(response_key)
+            if stored is not None:
+                _release(lock_key, token)
+                return _replay(stored, fingerprint)
+
+            try:
+                response = run(request, **kwargs)
+                if (
+                    response.status_code < 500
+                    and response.status_code not in _TRANSIENT_STATUSES
+                ):
+                    _store(response_key, response, fingerprint)
+                return response
+            finally:
+                _release(lock_key, token)
+
+        return wrapper
+
+    return decorator
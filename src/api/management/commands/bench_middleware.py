@@ -0,0 +1,109 @@
+import json
+import os
+import platform
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# settings.MIDDLEWARE before the Lean* variants were introduced
+STOCK_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "wagtail.contrib.redirects.middleware.RedirectMiddleware",
+]
+
+# The same stack with the Lean* variants. Both are pinned here rather than
+# read from settings, so middleware added later doesn't skew the comparison.
+LEAN_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "src.mysite.middleware.LeanSessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "src.mysite.middleware.LeanAuthenticationMiddleware",
+    "src.mysite.middleware.LeanMessageMiddleware",
+    "src.mysite.middleware.LeanXFrameOptionsMiddleware",
+    "src.mysite.middleware.LeanWhiteNoiseMiddleware",
+    "src.mysite.middleware.LeanRedirectMiddleware",
+]
+
+
+def build_chain(middleware, view):
+    """Wrap ``view`` in the given middleware, outermost first."""
+    handler = view
+    for path in reversed(middleware):
+        handler = import_string(path)(handler)
+    return handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request middleware overhead of an anonymous API call "
+        "with the stock middleware stack and with its Lean* variants"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--path", default="/api/petitions/")
+        parser.add_argument(
+            "--output",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "middleware.json"),
+            help="Where to write the machine-readable results",
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        scenarios = {
+            "api_200": lambda request: HttpResponse(b"[]"),
+            # Wagtail's RedirectMiddleware looks up the redirect table on 404s
+            "api_404": lambda request: HttpResponseNotFound(),
+        }
+
+        results = {}
+        for scenario, view in scenarios.items():
+            for stack, middleware in (
+                ("stock", STOCK_MIDDLEWARE),
+                ("lean", LEAN_MIDDLEWARE),
+            ):
+                chain = build_chain(middleware, view)
+                timings = []
+                for _ in range(options["requests"]):
+                    request = factory.get(options["path"])
+                    start = time.perf_counter()
+                    chain(request)
+                    timings.append(time.perf_counter() - start)
+                results[f"{scenario}_{stack}_median_us"] = round(
+                    statistics.median(timings) * 1e6, 2
+                )
+            results[f"{scenario}_saved_us"] = round(
+                results[f"{scenario}_stock_median_us"]
+                - results[f"{scenario}_lean_median_us"],
+                2,
+            )
+
+        report = {
+            "recorded_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "path": options["path"],
+            "requests": options["requests"],
+            **results,
+        }
+
+        os.makedirs(os.path.dirname(options["output"]), exist_ok=True)
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2)
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:<28} {value}")
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
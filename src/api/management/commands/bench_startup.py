@@ -0,0 +1,188 @@
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.tasks.boot import measure_boot
+
+# GUNICORN_PRELOAD per serving mode (see src/mysite/gunicorn_conf.py)
+MODES = {"per_worker": "False", "preload": "True"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except FileNotFoundError:
+        children = []
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                            children.append(int(entry))
+                except (FileNotFoundError, ProcessLookupError):
+                    continue
+        return children
+
+
+def memory_kb(pid):
+    """RSS, PSS and USS (private pages) of a process, in KiB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[key] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def timed_get(url, timeout=30):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with and without preload and record time to the first "
+        "response, first and warm request latency and per-worker memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--path",
+            default="/api/openapi.json",
+            help="Request path; the default needs no database",
+        )
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument(
+            "--output",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "startup.json"),
+            help="Where to write the machine-readable results",
+        )
+
+    def run_mode(self, preload, options):
+        port = free_port()
+        url = f"http://127.0.0.1:{port}{options['path']}"
+        env = {
+            **os.environ,
+            "GUNICORN_PRELOAD": preload,
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "WEB_CONCURRENCY": str(options["workers"]),
+        }
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "-c",
+                "python:src.mysite.gunicorn_conf",
+                "src.mysite.wsgi:application",
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if server.poll() is not None:
+                    raise CommandError("gunicorn exited before answering")
+                if time.perf_counter() - start > options["timeout"]:
+                    raise CommandError(f"No response from {url}")
+                try:
+                    first_request = timed_get(url)
+                    break
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.05)
+            ready = time.perf_counter() - start
+
+            # Let every worker finish booting before measuring steady state
+            deadline = time.perf_counter() + options["timeout"]
+            while (
+                len(child_pids(server.pid)) < options["workers"]
+                and time.perf_counter() < deadline
+            ):
+                time.sleep(0.05)
+            warm = [timed_get(url) for _ in range(options["requests"])]
+
+            workers = [memory_kb(pid) for pid in child_pids(server.pid)]
+            return {
+                "ready_seconds": round(ready, 3),
+                "first_request_ms": round(first_request * 1000, 1),
+                "warm_request_median_ms": round(statistics.median(warm) * 1000, 2),
+                "master_rss_kb": memory_kb(server.pid)["rss"],
+                **{
+                    f"worker_{key}_kb": round(
+                        statistics.mean(worker[key] for worker in workers)
+                    )
+                    for key in ("rss", "pss", "uss")
+                },
+                "total_pss_kb": memory_kb(server.pid)["pss"]
+                + sum(worker["pss"] for worker in workers),
+            }
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def handle(self, *args, **options):
+        web_boot = measure_boot("web", os.environ["DJANGO_SETTINGS_MODULE"])
+        results = {
+            "import_seconds": round(web_boot["seconds"], 3),
+            "import_max_rss_kb": web_boot["max_rss_kb"],
+        }
+        for mode, preload in MODES.items():
+            results[mode] = self.run_mode(preload, options)
+
+        report = {
+            "recorded_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "path": options["path"],
+            "workers": options["workers"],
+            "requests": options["requests"],
+            **results,
+        }
+
+        os.makedirs(os.path.dirname(options["output"]), exist_ok=True)
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2)
+
+        self.stdout.write(
+            f"{'import':<12} {results['import_seconds']:.3f}s "
+            f"{results['import_max_rss_kb'] / 1024:.1f} MiB"
+        )
+        for mode in MODES:
+            result = results[mode]
+            self.stdout.write(
+                f"{mode:<12} ready {result['ready_seconds']:.3f}s, "
+                f"first {result['first_request_ms']}ms, "
+                f"warm {result['warm_request_median_ms']}ms, "
+                f"worker PSS {result['worker_pss_kb'] / 1024:.1f} MiB, "
+                f"USS {result['worker_uss_kb'] / 1024:.1f} MiB"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
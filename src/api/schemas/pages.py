@@ -0,0 +1,19 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PageSearchResult(BaseModel):
+    id: int
+    title: str
+    url: Optional[str] = None
+    petition_id: Optional[int] = None
+    petition_name: Optional[str] = None
+    score: Optional[float] = None
+
+
+class PageSearchResponse(BaseModel):
+    results: List[PageSearchResult]
+    page: int
+    page_size: int
+    has_next: bool
@@ -2,19 +2,29 @@ from typing import List, Optional
 from pydantic import BaseModel, Field, EmailStr, field_validator
 import re
 
+from src.petitions.validation import (
+    NAME_MAX_LENGTH,
+    NAME_MIN_LENGTH,
+    PHONE_NUMBER_MAX_LENGTH,
+    PHONE_NUMBER_MIN_LENGTH,
+    PHONE_NUMBER_REGEX,
+)
+
 
 class PetitionSignatureBase(BaseModel):
-    first_name: str = Field(..., min_length=1, max_length=100)
-    last_name: str = Field(..., min_length=1, max_length=100)
+    first_name: str = Field(..., min_length=NAME_MIN_LENGTH, max_length=NAME_MAX_LENGTH)
+    last_name: str = Field(..., min_length=NAME_MIN_LENGTH, max_length=NAME_MAX_LENGTH)
     email: EmailStr
-    phone_number: str = Field(..., min_length=5, max_length=20)
+    phone_number: str = Field(
+        ..., min_length=PHONE_NUMBER_MIN_LENGTH, max_length=PHONE_NUMBER_MAX_LENGTH
+    )
     email_consent: bool = False
     phone_consent: bool = False
 
     @field_validator("phone_number")
     def validate_phone_number(cls, v):
         # Simple validation for phone number with country code
-        if not re.match(r"^\+?[0-9]{5,20}$", v):
+        if not re.match(PHONE_NUMBER_REGEX, v):
             raise ValueError(
                 "Invalid phone number format. Must include country code (e.g., +1234567890)"
             )
@@ -47,7 +57,6 @@ class PetitionCreate(PetitionBase):
 class PetitionUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=3, max_length=255)
     target: Optional[int] = Field(None, gt=0)
-    signature_count: Optional[int] = Field(None, ge=0)
     email_subject: Optional[str] = Field(None, min_length=3, max_length=255)
     email_content: Optional[str] = Field(None, min_length=10)
 
@@ -55,6 +64,7 @@ class PetitionUpdate(BaseModel):
 class PetitionResponse(PetitionBase):
     id: int
     signature_count: int
+    version: int
     created_at: str
     updated_at: str
 
@@ -67,3 +77,18 @@ class PetitionDetailResponse(PetitionResponse):
 
     class Config:
         from_attributes = True
+
+
+class PetitionWidgetResponse(BaseModel):
+    id: int
+    name: str
+    target: int
+    signature_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class SignatureExportQueuedResponse(BaseModel):
+    task_id: str
+    status: str = "queued"
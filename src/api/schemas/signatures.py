@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SignatureSearchResult(BaseModel):
+    id: int
+    petition_id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: str
+    email_consent: bool
+    phone_consent: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SignatureSearchResponse(BaseModel):
+    results: List[SignatureSearchResult]
+    next_cursor: Optional[str] = None
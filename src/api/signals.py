@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.petitions.models import Petition
+
+
+@receiver(post_save, sender=Petition)
+@receiver(post_delete, sender=Petition)
+def purge_petition_responses(sender, instance, **kwargs):
+    from src.tasks.tasks import purge_petition_cache
+
+    if settings.CDN_PURGE_URL:
+        # Deleting clears instance.pk before the transaction commits
+        petition_id = instance.pk
+        transaction.on_commit(lambda: purge_petition_cache.delay(petition_id))
@@ -1,4 +1,8 @@
+import time
+from unittest.mock import patch
+
 import pytest
+from django.db import transaction
 from django.urls import reverse
 
 from src.petitions.models import Petition, PetitionSignature
@@ -90,3 +94,576 @@ class TestAPISchemas:
                 email="john.doe@example.com",
                 phone_number="123",  # Too short (min_length=5)
             )
+
+
+@pytest.mark.django_db
+class TestLeanMiddleware:
+    """Tests for the trimmed middleware pipeline of anonymous API requests"""
+
+    def test_anonymous_api_request_skips_session_and_frame_options(self, client):
+        """Test anonymous API calls bypass the page-oriented middleware"""
+        response = client.get("/api/petitions/")
+        assert response.status_code == 200
+        assert "X-Frame-Options" not in response
+        assert "sessionid" not in response.cookies
+
+    def test_api_request_with_session_gets_full_stack(self, admin_client):
+        """Test requests carrying a session cookie keep the full middleware"""
+        response = admin_client.get("/api/petitions/")
+        assert response.status_code == 200
+        assert response["X-Frame-Options"] == "DENY"
+
+    def test_staff_endpoints_still_authenticate(self, admin_client, client):
+        """Test session auth works for staff and anonymous calls are refused"""
+        petition = Petition.objects.create(
+            name="Test Petition",
+            target=100,
+            email_subject="Thank you for signing",
+            email_content="Thank you for supporting our cause.",
+        )
+        url = f"/api/petitions/{petition.id}/signatures/export"
+        assert admin_client.get(url).status_code == 200
+        assert client.get(url).status_code == 401
+
+    def test_anonymous_api_404_skips_redirect_lookup(self, client):
+        """Test Wagtail redirects are not looked up for anonymous API 404s"""
+        from wagtail.contrib.redirects.models import Redirect
+
+        Redirect.objects.create(old_path="/api/petitions/999999", redirect_link="/")
+        response = client.get("/api/petitions/999999")
+        assert response.status_code == 404
+
+    def test_admin_keeps_full_stack(self, client):
+        """Test non-API paths are unaffected"""
+        response = client.get("/admin/login/")
+        assert response["X-Frame-Options"] == "DENY"
+
+
+class TestWarmUp:
+    """Tests for the pre-fork warm-up"""
+
+    def test_warm_up_leaves_no_connections_open(self):
+        """Test every step runs and no connection is inherited by workers"""
+        from django.db import connection
+
+        from src.mysite.warmup import warm_up
+
+        timings = warm_up()
+
+        assert set(timings) == {
+            "warm_url_resolvers",
+            "warm_api_schemas",
+            "warm_templates",
+            "warm_wagtail",
+        }
+        assert connection.connection is None
+
+    def test_templates_are_compiled_once(self, settings):
+        """Test warmed templates come from the cached loader afterwards"""
+        from django.template import engines
+
+        from src.mysite.warmup import warm_templates
+
+        warm_templates()
+        loader = engines["django"].engine.template_loaders[0]
+        assert set(settings.WARMUP_TEMPLATES) <= set(loader.get_template_cache)
+
+
+@pytest.mark.django_db
+class TestAdmissionControl:
+    """Tests for priority-based load shedding"""
+
+    @pytest.fixture(autouse=True)
+    def load(self):
+        from src.mysite import admission
+
+        admission.signals.reset()
+        yield admission
+        admission.signals.reset()
+
+    def test_signatures_are_shed_before_reads(
+        self, client, petition, load, sign_petition
+    ):
+        """Test a full in-flight budget sheds signing but keeps reads"""
+        from django.core.cache import cache
+
+        cache.set(load.IN_FLIGHT_KEY, 40)
+
+        response = sign_petition(client, petition)
+        assert response.status_code == 503
+        assert response["Retry-After"] == "5"
+        assert not PetitionSignature.objects.exists()
+        assert client.get(f"/api/petitions/{petition.id}").status_code == 200
+
+    def test_slow_database_sheds_signatures(
+        self, client, petition, load, sign_petition
+    ):
+        """Test sustained query latency sheds the low priority route only"""
+        for _ in range(50):
+            load.signals.db_latency_ms.observe(120)
+
+        assert sign_petition(client, petition).status_code == 503
+        assert client.get("/api/petitions/").status_code == 200
+
+    def test_slow_broker_sheds_signatures(self, client, petition, load, sign_petition):
+        """Test slow task publishing sheds signing"""
+        for _ in range(50):
+            load.signals.broker_latency_ms.observe(500)
+
+        assert sign_petition(client, petition).status_code == 503
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_admitted_requests_are_counted(
+        self, delay, client, petition, load, sign_petition
+    ):
+        """Test the in-flight counter is released and decisions are exported"""
+        from django.core.cache import cache
+
+        from src.observability.metrics import ADMISSION_DECISIONS
+
+        labels = {
+            "route": "api-1.0.0:create_signature",
+            "priority": "low",
+            "decision": "admitted",
+            "reason": "",
+        }
+        before = ADMISSION_DECISIONS.labels(**labels)._value.get()
+
+        assert sign_petition(client, petition).status_code == 200
+        assert cache.get(load.IN_FLIGHT_KEY) == 0
+        assert ADMISSION_DECISIONS.labels(**labels)._value.get() == before + 1
+
+    def test_in_flight_counter_expiry_is_refreshed(self, load):
+        """Test every admitted request pushes back the counter's expiry"""
+        from django.core.cache import cache
+
+        load._enter()
+        with patch.object(cache, "touch", wraps=cache.touch) as touch:
+            load._enter()
+        touch.assert_called_once_with(load.IN_FLIGHT_KEY, 60)
+        assert cache.get(load.IN_FLIGHT_KEY) == 2
+
+    def test_latency_signal_decays(self, load):
+        """Test the signals fall back once observations stop"""
+        average = load.DecayingAverage(half_life=0.01)
+        for _ in range(50):
+            average.observe(100)
+        assert average.value > 90
+        time.sleep(0.1)
+        assert average.value < 1
+
+
+@pytest.mark.django_db
+class TestSignatureRateLimits:
+    """Tests for sliding-window rate limiting of signature submissions"""
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_repeated_email_is_rejected(
+        self, delay, client, petition, settings, sign_petition
+    ):
+        """Test the email rule matches addresses case-insensitively"""
+        settings.RATE_LIMITS = {"signatures": {"email": {"limit": 1, "window": 3600}}}
+
+        assert sign_petition(client, petition, "jane@example.com").status_code == 200
+        response = sign_petition(client, petition, "JANE@example.com")
+
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+        assert PetitionSignature.objects.count() == 1
+        delay.assert_called_once()
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_ip_rule_is_per_client(
+        self, delay, client, petition, settings, sign_petition
+    ):
+        """Test one client is limited while another still gets through"""
+        settings.RATE_LIMITS = {"signatures": {"ip": {"limit": 2, "window": 60}}}
+
+        for i in range(2):
+            assert (
+                sign_petition(client, petition, f"jane{i}@example.com").status_code
+                == 200
+            )
+        assert sign_petition(client, petition, "jane3@example.com").status_code == 429
+        response = sign_petition(
+            client, petition, "john@example.com", REMOTE_ADDR="10.0.0.2"
+        )
+        assert response.status_code == 200
+
+    def test_rejected_before_validation(self, client, petition, settings):
+        """Test a throttled request never reaches payload validation"""
+        settings.RATE_LIMITS = {"signatures": {"ip": {"limit": 0, "window": 60}}}
+
+        response = client.post(
+            f"/api/petitions/{petition.id}/signatures",
+            "not json",
+            content_type="application/json",
+        )
+        assert response.status_code == 429
+
+    def test_rejections_are_counted(self, client, petition, settings, sign_petition):
+        """Test the removed load is visible in the metrics"""
+        from src.observability.metrics import RATE_LIMIT_DECISIONS
+
+        settings.RATE_LIMITS = {"signatures": {"ip": {"limit": 0, "window": 60}}}
+        labels = {"scope": "signatures", "decision": "rejected", "rule": "ip"}
+        before = RATE_LIMIT_DECISIONS.labels(**labels)._value.get()
+
+        sign_petition(client, petition, "jane@example.com")
+
+        assert RATE_LIMIT_DECISIONS.labels(**labels)._value.get() == before + 1
+
+    def test_window_slides(self, settings):
+        """Test the previous window still counts in proportion to its overlap"""
+        from src.api.throttling import Throttled, check
+
+        settings.RATE_LIMITS = {"test": {"ip": {"limit": 2, "window": 10}}}
+        check("test", {"ip": "10.0.0.1"}, now=1000)
+        check("test", {"ip": "10.0.0.1"}, now=1001)
+        with pytest.raises(Throttled):
+            check("test", {"ip": "10.0.0.1"}, now=1002)
+        # 95% of the previous window still overlaps: 1.9 + 1 > 2
+        with pytest.raises(Throttled):
+            check("test", {"ip": "10.0.0.1"}, now=1010.5)
+        # 10% overlaps: 0.2 + 1 <= 2
+        check("test", {"ip": "10.0.0.1"}, now=1019)
+
+    def test_falls_back_to_process_memory(self, settings):
+        """Test an unreachable Redis does not disable limiting"""
+        from src.api import throttling
+
+        class DownRedis:
+            errors = (ConnectionError,)
+
+            def hit(self, now_ms, checks):
+                raise ConnectionError
+
+        settings.RATE_LIMITS = {"test": {"ip": {"limit": 1, "window": 10}}}
+        with patch.object(
+            throttling, "get_backends", return_value=(DownRedis(), throttling._local)
+        ):
+            throttling.check("test", {"ip": "10.0.0.1"})
+            with pytest.raises(throttling.Throttled):
+                throttling.check("test", {"ip": "10.0.0.1"})
+
+
+@pytest.mark.django_db
+class TestIdempotencyKeys:
+    """Tests for Idempotency-Key handling on create endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_retry_is_replayed(self, delay, client, petition, sign_petition):
+        """Test a retried signature is stored, counted and emailed once"""
+        first = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+        retry = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first
+        assert PetitionSignature.objects.count() == 1
+        delay.assert_called_once()
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_key_reused_for_another_body(self, delay, client, petition, sign_petition):
+        """Test a key cannot be reused for a different request"""
+        sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+        response = sign_petition(
+            client, petition, email="john@example.com", HTTP_IDEMPOTENCY_KEY="key-1"
+        )
+
+        assert response.status_code == 422
+        assert PetitionSignature.objects.count() == 1
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_without_key_nothing_is_stored(self, delay, client, petition):
+        """Test requests without the header run the view every time"""
+        for email in ("jane@example.com", "john@example.com"):
+            response = client.post(
+                f"/api/petitions/{petition.id}/signatures",
+                {
+                    "first_name": "Jane",
+                    "last_name": "Doe",
+                    "email": email,
+                    "phone_number": "+48123456789",
+                },
+                content_type="application/json",
+            )
+            assert "Idempotent-Replayed" not in response
+        assert PetitionSignature.objects.count() == 2
+
+    def test_concurrent_retry_gets_conflict(self, client, petition, sign_petition):
+        """Test a retry during the first request gets a 409 without waiting"""
+        from django.core.cache import cache
+        from src.api.idempotency import _keys
+
+        cache.add(_keys("signatures", "ip:127.0.0.1", "key-1")[1], 1, 30)
+
+        response = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert response.status_code == 409
+        assert response["Retry-After"] == "1"
+        assert not PetitionSignature.objects.exists()
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_keys_are_scoped_to_the_client(
+        self, delay, client, petition, sign_petition
+    ):
+        """Test two clients sending the same key don't see each other's response"""
+        first = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+        other = sign_petition(
+            client,
+            petition,
+            email="john@example.com",
+            HTTP_IDEMPOTENCY_KEY="key-1",
+            REMOTE_ADDR="10.0.0.2",
+        )
+
+        assert first.status_code == other.status_code == 200
+        assert "Idempotent-Replayed" not in other
+        assert PetitionSignature.objects.count() == 2
+
+    def test_lock_taken_by_another_request_is_kept(self):
+        """Test releasing an expired lock leaves the next holder's lock alone"""
+        from django.core.cache import cache
+        from src.api.idempotency import _release
+
+        cache.set("lock", 2, 30)
+        _release("lock", 1)
+
+        assert cache.get("lock") == 2
+
+    def test_server_errors_are_not_stored(self, client, petition, sign_petition):
+        """Test a retry after a 5xx runs the view again"""
+        with patch(
+            "src.tasks.tasks.send_petition_confirmation_email.delay",
+            side_effect=RuntimeError,
+        ):
+            with pytest.raises(RuntimeError):
+                sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+
+        with patch("src.tasks.tasks.send_petition_confirmation_email.delay"):
+            response = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert response.status_code == 200
+        assert "Idempotent-Replayed" not in response
+        assert PetitionSignature.objects.count() == 1
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_throttled_requests_are_not_stored(
+        self, delay, client, petition, settings, sign_petition
+    ):
+        """Test a retry after a 429 runs the view again once the limit clears"""
+        settings.RATE_LIMITS = {"signatures": {"ip": {"limit": 0, "window": 60}}}
+        assert (
+            sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1").status_code
+            == 429
+        )
+
+        settings.RATE_LIMITS = {"signatures": {}}
+        response = sign_petition(client, petition, HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert response.status_code == 200
+        assert "Idempotent-Replayed" not in response
+        assert PetitionSignature.objects.count() == 1
+
+    def test_petition_creation_is_replayed(self, client):
+        """Test a retried petition POST creates one petition"""
+        payload = {
+            "name": "Test Petition",
+            "target": 100,
+            "email_subject": "Thank you for signing",
+            "email_content": "Thank you for supporting our cause.",
+        }
+        for _ in range(2):
+            response = client.post(
+                "/api/petitions/",
+                payload,
+                content_type="application/json",
+                HTTP_IDEMPOTENCY_KEY="key-1",
+            )
+            assert response.status_code == 200
+        assert Petition.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestPetitionConditionalUpdate:
+    """Tests for If-Match handling on petition updates"""
+
+    def put(self, client, petition, payload, **extra):
+        return client.put(
+            f"/api/petitions/{petition.id}",
+            payload,
+            content_type="application/json",
+            **extra,
+        )
+
+    def test_update_with_current_etag(self, client, petition):
+        """Test an update with a matching If-Match succeeds and bumps the ETag"""
+        etag = client.get(f"/api/petitions/{petition.id}")["ETag"]
+
+        response = self.put(client, petition, {"target": 200}, HTTP_IF_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response["ETag"] != etag
+
+    def test_update_with_stale_etag(self, client, petition):
+        """Test an update based on an old ETag gets a 412"""
+        etag = client.get(f"/api/petitions/{petition.id}")["ETag"]
+        self.put(client, petition, {"target": 200})
+
+        response = self.put(client, petition, {"name": "Renamed"}, HTTP_IF_MATCH=etag)
+
+        assert response.status_code == 412
+        petition.refresh_from_db()
+        assert petition.name == "Test Petition"
+
+    def test_signature_count_is_ignored(self, client, petition):
+        """Test clients cannot overwrite the signature counter"""
+        from src.petitions.services import increment_signature_count
+
+        increment_signature_count(petition.id, by=7)
+        response = self.put(client, petition, {"signature_count": 0})
+
+        assert response.status_code == 200
+        petition.refresh_from_db()
+        assert petition.signature_count == 7
+
+
+@pytest.mark.django_db
+class TestHTTPCaching:
+    """Tests for conditional GETs and the cacheable widget"""
+
+    def test_list_not_modified(self, client, petition):
+        """Test the list answers a matching If-None-Match with a 304"""
+        response = client.get("/api/petitions/")
+        assert response["Cache-Control"] == "public, max-age=10"
+        assert response["Surrogate-Key"] == "petition-list"
+
+        cached = client.get("/api/petitions/", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert cached.status_code == 304
+        assert cached["ETag"] == response["ETag"]
+        assert cached["Cache-Control"] == "public, max-age=10"
+
+    def test_etag_follows_signatures(self, client, petition):
+        """Test a new signature changes the ETag of the list and the petition"""
+        from src.petitions.services import increment_signature_count
+
+        list_etag = client.get("/api/petitions/")["ETag"]
+        detail_etag = client.get(f"/api/petitions/{petition.id}")["ETag"]
+        increment_signature_count(petition.id)
+
+        response = client.get("/api/petitions/", HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == 200
+        response = client.get(
+            f"/api/petitions/{petition.id}", HTTP_IF_NONE_MATCH=detail_etag
+        )
+        assert response.status_code == 200
+        assert response.json()["signature_count"] == 1
+
+    def test_detail_etag_follows_signature_changes(self, client, petition):
+        """Test editing or deleting a signature changes the detail ETag"""
+        signature = PetitionSignature.objects.create(
+            petition=petition,
+            first_name="Jane",
+            last_name="Doe",
+            email="jane@example.com",
+            phone_number="+48123456789",
+        )
+        etag = client.get(f"/api/petitions/{petition.id}")["ETag"]
+
+        signature.last_name = "Roe"
+        signature.save()
+        response = client.get(f"/api/petitions/{petition.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["signatures"][0]["last_name"] == "Roe"
+
+        etag = response["ETag"]
+        signature.delete()
+        response = client.get(f"/api/petitions/{petition.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["signatures"] == []
+
+    def test_not_modified_skips_the_view(
+        self, client, petition, django_assert_num_queries
+    ):
+        """Test a 304 costs only the ETag queries"""
+        etag = client.get(f"/api/petitions/{petition.id}")["ETag"]
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                f"/api/petitions/{petition.id}", HTTP_IF_NONE_MATCH=etag
+            )
+
+        assert response.status_code == 304
+        assert response["Cache-Control"] == "private, no-cache"
+
+    def test_missing_petition(self, client):
+        """Test unknown petitions still get a 404"""
+        assert client.get("/api/petitions/0").status_code == 404
+        assert client.get("/api/petitions/0/widget").status_code == 404
+
+    def test_widget(self, client, petition):
+        """Test the widget payload and its CDN headers"""
+        response = client.get(f"/api/petitions/{petition.id}/widget")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": petition.id,
+            "name": "Test Petition",
+            "target": 100,
+            "signature_count": 0,
+        }
+        assert "stale-while-revalidate=300" in response["Cache-Control"]
+        assert response["Surrogate-Key"] == f"petition-{petition.id}"
+        assert response["Access-Control-Allow-Origin"] == "*"
+
+    @patch("src.tasks.tasks.purge_petition_cache.delay")
+    def test_edit_purges_cdn(
+        self, delay, petition, settings, django_capture_on_commit_callbacks
+    ):
+        """Test saving a petition purges its cached responses after commit"""
+        settings.CDN_PURGE_URL = "https://cdn.example.com/purge"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            petition.save()
+
+        delay.assert_called_once_with(petition.id)
+
+    @patch("src.tasks.tasks.purge_petition_cache.delay")
+    def test_delete_purges_cdn(
+        self, delay, petition, settings, django_capture_on_commit_callbacks
+    ):
+        """Test deleting a petition purges it by the ID it had"""
+        settings.CDN_PURGE_URL = "https://cdn.example.com/purge"
+        petition_id = petition.id
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                petition.delete()
+
+        delay.assert_called_once_with(petition_id)
+
+    def test_purge_request(self, settings):
+        """Test the purge hook posts the petition's surrogate keys"""
+        import json
+
+        from src.api.caching import purge_petition
+
+        settings.CDN_PURGE_URL = "https://cdn.example.com/purge"
+        with patch("urllib.request.urlopen") as urlopen:
+            urlopen.return_value.__enter__.return_value.status = 200
+            assert purge_petition(5)
+
+        request = urlopen.call_args.args[0]
+        assert json.loads(request.data) == {
+            "surrogate_keys": ["petition-5", "petition-list"]
+        }
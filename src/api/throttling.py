@@ -0,0 +1,259 @@
+"""
+Sliding-window rate limiting for Ninja operations.
+
+Applied with ``decorate_view``, so it wraps the operation before Ninja parses
+or validates anything: a rejected request costs one Redis round trip and
+never reaches Pydantic, the database or the broker.
+
+Each rule counts requests per key (client IP, petition, email hash...) in
+fixed windows and estimates the sliding window as the current window's count
+plus the previous window's, weighted by how much of it still overlaps. All
+rules of a request are checked and recorded by one Lua script, atomically.
+Without Redis, or while it is unreachable, the same algorithm runs in
+process memory, which limits each web worker separately.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from src.petitions.normalization import normalize_email
+
+logger = logging.getLogger(__name__)
+
+# KEYS: current and previous window key per rule. ARGV: now (ms), then the
+# limit, window (ms) and window start (ms) per rule. Returns 0 and records
+# the request when every rule admits it, otherwise the 1-based number of the
+# first rule that rejects it, without recording anything.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rules = #KEYS / 2
+for i = 1, rules do
+    local limit = tonumber(ARGV[3 * i - 1])
+    local window = tonumber(ARGV[3 * i])
+    local start = tonumber(ARGV[3 * i + 1])
+    local current = tonumber(redis.call("GET", KEYS[2 * i - 1]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[2 * i]) or "0")
+    local overlap = (window - (now - start)) / window
+    if current + previous * overlap + 1 > limit then
+        return i
+    end
+end
+for i = 1, rules do
+    local window = tonumber(ARGV[3 * i])
+    redis.call("INCR", KEYS[2 * i - 1])
+    redis.call("PEXPIRE", KEYS[2 * i - 1], 2 * window)
+end
+return 0
+"""
+
+
+class Throttled(Exception):
+    def __init__(self, rule, retry_after):
+        self.rule = rule
+        self.retry_after = retry_after
+
+
+def _windows(now_ms, window_ms):
+    index = now_ms // window_ms
+    return index, index * window_ms
+
+
+class InProcessBackend:
+    """The sliding-window algorithm over a dict, for one process."""
+
+    def __init__(self, max_keys=10000):
+        self.counts = {}
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+
+    def hit(self, now_ms, checks):
+        """``checks`` is ``[(current key, previous key, limit, window, start)]``."""
+        with self.lock:
+            for number, (current, previous, limit, window, start) in enumerate(
+                checks, 1
+            ):
+                overlap = (window - (now_ms - start)) / window
+                estimate = self.counts.get(current, 0) + (
+                    self.counts.get(previous, 0) * overlap
+                )
+                if estimate + 1 > limit:
+                    return number
+            for current, *_ in checks:
+                self.counts[current] = self.counts.get(current, 0) + 1
+            if len(self.counts) > self.max_keys:
+                self.counts = {
+                    key: count
+                    for key, count in self.counts.items()
+                    if not _expired(key, now_ms)
+                }
+            return 0
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+
+def _expired(key, now_ms):
+    """Whether the window of ``key`` can no longer overlap the current one."""
+    _, window_ms, index = key.rsplit(":", 2)
+    return int(index) < now_ms // int(window_ms) - 1
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis
+
+        self.errors = (redis.RedisError,)
+        self.client = redis.Redis.from_url(url, socket_timeout=0.1)
+        self.script = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, now_ms, checks):
+        keys = []
+        args = [now_ms]
+        for current, previous, limit, window, start in checks:
+            keys += [current, previous]
+            args += [limit, window, start]
+        return int(self.script(keys=keys, args=args))
+
+
+_local = InProcessBackend()
+_redis = None
+
+
+def get_backends():
+    """The Redis backend (if configured) and the in-process fallback."""
+    global _redis
+    if _redis is None and settings.RATE_LIMIT_REDIS_URL:
+        _redis = RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    return _redis, _local
+
+
+def reset():
+    """Forget the in-process counts (used between tests)."""
+    _local.reset()
+
+
+def check(scope, keys, now=None):
+    """
+    Count one request against the rules of ``scope``.
+
+    ``keys`` maps rule names in ``settings.RATE_LIMITS[scope]`` to the value
+    the rule counts by; rules with no value are skipped. Raises Throttled
+    when a rule's limit is reached.
+    """
+    rules = settings.RATE_LIMITS[scope]
+    now_ms = int((now if now is not None else time.time()) * 1000)
+    checks = []
+    names = []
+    for name, value in keys.items():
+        if value is None or name not in rules:
+            continue
+        limit = rules[name]["limit"]
+        window_ms = rules[name]["window"] * 1000
+        index, start = _windows(now_ms, window_ms)
+        prefix = f"rl:{scope}:{name}:{value}:{window_ms}"
+        checks.append(
+            (f"{prefix}:{index}", f"{prefix}:{index - 1}", limit, window_ms, start)
+        )
+        names.append(name)
+    if not checks:
+        return
+
+    redis_backend, local_backend = get_backends()
+    rejected = None
+    if redis_backend is not None:
+        try:
+            rejected = redis_backend.hit(now_ms, checks)
+        except redis_backend.errors:
+            logger.warning("Rate limiter falling back to process memory", exc_info=True)
+    if rejected is None:
+        rejected = local_backend.hit(now_ms, checks)
+
+    if rejected:
+        _, _, _, window_ms, start = checks[rejected - 1]
+        retry_after = math.ceil((start + window_ms - now_ms) / 1000)
+        raise Throttled(names[rejected - 1], max(retry_after, 1))
+
+
+def client_ip(request, params=None):
+    """
+    The client's address.
+
+    Behind a proxy set RATE_LIMIT_CLIENT_IP_HEADER to the header it appends
+    the client address to; the last entry is the one the proxy saw.
+    """
+    header = settings.RATE_LIMIT_CLIENT_IP_HEADER
+    if header:
+        forwarded = request.headers.get(header)
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR")
+
+
+def email_hash(request, params=None):
+    """A hash of the normalized email in a JSON body, or None."""
+    try:
+        email = json.loads(request.body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(email, str) or not email:
+        return None
+    return hashlib.sha256(normalize_email(email).encode()).hexdigest()[:32]
+
+
+def path_param(name):
+    """Count by the value of the path parameter ``name``."""
+
+    def key(request, params):
+        return params.get(name)
+
+    return key
+
+
+def _record(scope, decision, rule=""):
+    if settings.METRICS_ENABLED:
+        from src.observability import metrics
+
+        metrics.RATE_LIMIT_DECISIONS.labels(
+            scope=scope, decision=decision, rule=rule
+        ).inc()
+
+
+def throttle(scope, **key_funcs):
+    """
+    Rate limit a Ninja operation; use with ``decorate_view``.
+
+    Each keyword names a rule of ``settings.RATE_LIMITS[scope]`` and gives a
+    function of ``(request, path_params)`` returning the value to count by.
+    Rejected requests get a 429 with Retry-After.
+    """
+
+    def decorator(run):
+        @functools.wraps(run)
+        def wrapper(request, **kwargs):
+            if not settings.RATE_LIMIT_ENABLED:
+                return run(request, **kwargs)
+            keys = {name: func(request, kwargs) for name, func in key_funcs.items()}
+            try:
+                check(scope, keys)
+            except Throttled as e:
+                _record(scope, "rejected", e.rule)
+                response = JsonResponse(
+                    {"detail": "Too many requests, please retry later"}, status=429
+                )
+                response["Retry-After"] = str(e.retry_after)
+                return response
+            _record(scope, "allowed")
+            return run(request, **kwargs)
+
+        return wrapper
+
+    return decorator
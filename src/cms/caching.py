@@ -0,0 +1,152 @@
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from src.petitions.cache import get_cached_signature_counts
+
+# Rendered into cached HTML by {% signature_count %} and filled in per request
+COUNT_PLACEHOLDER = "<!--signature-count:{petition_id}-->"
+COUNT_PLACEHOLDER_RE = re.compile(rb"<!--signature-count:(\d+)-->")
+
+# Recomputed when the counts are filled in, or never replayed from the cache
+UNCACHED_HEADERS = {"content-length", "set-cookie"}
+
+
+def _url_key(request):
+    return f"petition_page:url:{request.get_host()}{request.path}"
+
+
+def _version_key(page_id):
+    return f"petition_page:{page_id}:version"
+
+
+def _urls_key(page_id):
+    return f"petition_page:{page_id}:urls"
+
+
+def _content_key(page_id, version, request):
+    return (
+        f"petition_page:{page_id}:v{version}:response:"
+        f"{request.get_host()}{request.path}"
+    )
+
+
+def is_cacheable(request):
+    """
+    Only anonymous GET/HEAD requests outside of previews are cached.
+
+    Requests with a query string bypass the cache, so arbitrary parameters
+    can't fill it with copies of the same page.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.META.get("QUERY_STRING")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not getattr(request, "is_preview", False)
+    )
+
+
+def invalidate_page(page_id):
+    """
+    Drop all cached renders of a page.
+
+    Cached content is keyed by a per-page version number, so every variant of
+    the page (one per host) goes stale by bumping a single value.
+    """
+    try:
+        cache.incr(_version_key(page_id))
+    except ValueError:
+        # The version was evicted; start from a value older renders never had
+        cache.set(_version_key(page_id), time.time_ns(), None)
+
+
+def forget_page(page_id):
+    """
+    Drop all cached renders of a page and the URLs that lead to it.
+
+    For pages that were deleted or moved: their old URLs must stop resolving
+    to the page before the URL keys expire.
+    """
+    invalidate_page(page_id)
+    urls_key = _urls_key(page_id)
+    cache.delete_many([*cache.get(urls_key, ()), urls_key])
+
+
+def fill_signature_counts(content):
+    """Replace signature count placeholders with the current (cached) counts."""
+    petition_ids = {int(pk) for pk in COUNT_PLACEHOLDER_RE.findall(content)}
+    if not petition_ids:
+        return content
+    counts = get_cached_signature_counts(petition_ids)
+    return COUNT_PLACEHOLDER_RE.sub(
+        lambda match: str(counts.get(int(match.group(1)), 0)).encode(), content
+    )
+
+
+def _build_response(content, headers, status):
+    response = HttpResponse(fill_signature_counts(content))
+    for name, value in headers:
+        response[name] = value
+    response["X-Page-Cache"] = status
+    return response
+
+
+def get_cached_response(request):
+    """
+    Return a cached page response for ``request`` or ``None``.
+
+    This runs before Wagtail routes the request, so a hit costs only cache
+    reads: no site lookup, no page tree walk and no petition query.
+    """
+    if not is_cacheable(request):
+        return None
+    page_id = cache.get(_url_key(request))
+    if page_id is None:
+        return None
+    version = cache.get(_version_key(page_id))
+    if version is None:
+        return None
+    cached = cache.get(_content_key(page_id, version, request))
+    if cached is None:
+        return None
+    content, headers = cached
+    return _build_response(content, headers, "hit")
+
+
+def cache_page_response(page, request, response):
+    """
+    Store a freshly rendered page response and fill in its signature count.
+
+    Only the HTML with count placeholders is cached, so new signatures never
+    invalidate the page itself.
+    """
+    if hasattr(response, "render"):
+        response.render()
+    if not is_cacheable(request) or response.status_code != 200 or response.cookies:
+        response.content = fill_signature_counts(response.content)
+        return response
+
+    headers = [
+        (name, value)
+        for name, value in response.items()
+        if name.lower() not in UNCACHED_HEADERS
+    ]
+    cache.add(_version_key(page.pk), time.time_ns(), None)
+    version = cache.get(_version_key(page.pk))
+    timeout = settings.PETITION_PAGE_CACHE_TIMEOUT
+    url_key = _url_key(request)
+    # Remember the URL keys of each page, so forget_page() can find them
+    url_keys = cache.get(_urls_key(page.pk), set())
+    if url_key not in url_keys:
+        cache.set(_urls_key(page.pk), url_keys | {url_key}, None)
+    cache.set_many(
+        {
+            url_key: page.pk,
+            _content_key(page.pk, version, request): (response.content, headers),
+        },
+        timeout,
+    )
+    return _build_response(response.content, headers, "miss")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from src.cms.renditions import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how many renditions were pre-generated and how many were still "
+        "generated during a request (misses), per filter"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters afterwards"
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        self.stdout.write(
+            f"{'filter':<16} {'pregenerated':>12} {'miss':>8} {'miss %':>8}"
+        )
+        for filter_spec, counts in stats.items():
+            total = counts["pregenerated"] + counts["miss"]
+            miss_rate = f"{counts['miss'] / total:.1%}" if total else "-"
+            self.stdout.write(
+                f"{filter_spec:<16} {counts['pregenerated']:>12} "
+                f"{counts['miss']:>8} {miss_rate:>8}"
+            )
+        if options["reset"]:
+            reset_stats()
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.cms.revalidate_stub import RevalidationStub
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in for the Next.js revalidation webhook and print "
+        "the paths it is asked to revalidate"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=3001)
+        parser.add_argument("--token", default="")
+
+    def handle(self, *args, **options):
+        with RevalidationStub(
+            host=options["host"], port=options["port"], token=options["token"]
+        ) as stub:
+            self.stdout.write(f"Listening on {stub.url}; set NEXTJS_REVALIDATE_URL")
+            seen = 0
+            try:
+                while True:
+                    time.sleep(0.5)
+                    paths = stub.paths
+                    for path in paths[seen:]:
+                        self.stdout.write(f"revalidate {path}")
+                    seen = len(paths)
+            except KeyboardInterrupt:
+                pass
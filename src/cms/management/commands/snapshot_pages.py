@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from src.cms.models import PetitionPage
+from src.cms.snapshots import notify_revalidate, write_page_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Write static snapshots of all live petition pages, e.g. after a "
+        "deploy that changed templates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--revalidate",
+            action="store_true",
+            help="Also call the Next.js revalidation webhook for every page",
+        )
+
+    def handle(self, *args, **options):
+        paths = []
+        for page in PetitionPage.objects.live().select_related("petition"):
+            paths.extend(write_page_snapshot(page))
+        if options["revalidate"]:
+            notify_revalidate(paths)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(paths)} snapshot(s)"))
@@ -0,0 +1,61 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+
+def snapshot_file(request):
+    """
+    The file under SNAPSHOT_ROOT that would answer ``request``, or ``None``.
+
+    Only anonymous GET/HEAD requests without a query string are answered from
+    snapshots. Paths ending in a slash map to their ``index.html``.
+    """
+    if (
+        request.method not in ("GET", "HEAD")
+        or request.META.get("QUERY_STRING")
+        or settings.SESSION_COOKIE_NAME in request.COOKIES
+        or not request.path_info.startswith(settings.SNAPSHOT_URL)
+    ):
+        return None
+    relative = request.path_info[len(settings.SNAPSHOT_URL) :]
+    if relative == "" or relative.endswith("/"):
+        relative += "index.html"
+    # Skips the temporary files snapshots are written to
+    if any(part.startswith(".") for part in relative.split("/")):
+        return None
+    try:
+        return safe_join(settings.SNAPSHOT_ROOT, relative)
+    except SuspiciousFileOperation:
+        return None
+
+
+class SnapshotMiddleware:
+    """
+    Serve the static snapshots in SNAPSHOT_ROOT in front of Django.
+
+    Files are looked up on every request, so snapshots the Celery workers
+    write or remove after startup are picked up straight away. Requests
+    without a snapshot fall through to the rest of the stack.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SNAPSHOT_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = snapshot_file(request)
+        if path is None:
+            return self.get_response(request)
+        try:
+            f = open(path, "rb")
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return self.get_response(request)
+        response = FileResponse(f)
+        response["Last-Modified"] = http_date(os.fstat(f.fileno()).st_mtime)
+        response["X-Page-Cache"] = "snapshot"
+        return response
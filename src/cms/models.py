@@ -3,7 +3,10 @@ from wagtail.models import Page
 from wagtail.fields import RichTextField
 from wagtail.admin.panels import FieldPanel
 from wagtail.api import APIField
+from wagtail.search import index
 
+from src.cms.caching import cache_page_response
+from src.cms.serializers import PetitionSummarySerializer
 # Import the Petition model from your petitions app
 from src.petitions.models import Petition
 from wagtail.admin.panels import FieldPanel
@@ -55,11 +58,22 @@ class PetitionPage(Page):
         # Add panels for other CMS fields here
     ]
 
-    # API configuration (optional)
-    # api_fields = [
-    #     APIField('intro'),
-    #     APIField('petition'), # You might need a custom serializer for the Petition object
-    # ]
+    # API configuration; the petition is embedded so headless clients do not
+    # need a second request per page
+    api_fields = [
+        APIField('intro'),
+        APIField('petition', serializer=PetitionSummarySerializer()),
+    ]
+
+    # Search configuration. The index is updated by a Celery task on publish
+    # (see src.cms.signals) instead of during the admin request.
+    search_fields = Page.search_fields + [
+        index.SearchField('intro'),
+        index.RelatedFields('petition', [
+            index.SearchField('name', boost=2),
+        ]),
+    ]
+    search_auto_update = False
 
     # Parent page / subpage type rules
     # Only allow creating PetitionPage under HomePage
@@ -85,6 +99,11 @@ class PetitionPage(Page):
         # context['signature_form'] = form
         return context
 
+    def serve(self, request, *args, **kwargs):
+        """Serve the page and store the rendered HTML in the page cache."""
+        response = super().serve(request, *args, **kwargs)
+        return cache_page_response(self, request, response)
+
     class Meta:
         verbose_name = "Strony Petycji"
         verbose_name = "Strona Petycji"
@@ -0,0 +1,163 @@
+import contextvars
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from wagtail.images import get_image_model
+from wagtail.models import ReferenceIndex
+
+logger = logging.getLogger(__name__)
+
+# True while renditions are generated ahead of time, so the rendition
+# post_save handler can tell pre-generation apart from request-time misses
+_pregenerating = contextvars.ContextVar("pregenerating_renditions", default=False)
+
+STATS_KEY = "renditions:stats:{outcome}:{filter_spec}"
+OUTCOMES = ("pregenerated", "miss")
+
+
+def _lock_key(image_id, filter_spec):
+    return f"renditions:lock:{image_id}:{filter_spec}"
+
+
+def _incr(key):
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def record(outcome, filter_spec):
+    _incr(STATS_KEY.format(outcome=outcome, filter_spec=filter_spec))
+
+
+def get_stats():
+    """
+    Return ``{filter_spec: {"pregenerated": n, "miss": n}}``.
+
+    Misses count renditions created lazily while serving a request, i.e.
+    a visitor paid for the resize. Filters outside
+    WAGTAIL_PREGENERATED_RENDITIONS are reported under ``"other"``.
+    """
+    filter_specs = list(settings.WAGTAIL_PREGENERATED_RENDITIONS) + ["other"]
+    keys = {
+        STATS_KEY.format(outcome=outcome, filter_spec=spec): (spec, outcome)
+        for spec in filter_specs
+        for outcome in OUTCOMES
+    }
+    values = cache.get_many(keys)
+    stats = {spec: dict.fromkeys(OUTCOMES, 0) for spec in filter_specs}
+    for key, value in values.items():
+        spec, outcome = keys[key]
+        stats[spec][outcome] = value
+    return stats
+
+
+def reset_stats():
+    cache.delete_many(
+        [
+            STATS_KEY.format(outcome=outcome, filter_spec=spec)
+            for spec in list(settings.WAGTAIL_PREGENERATED_RENDITIONS) + ["other"]
+            for outcome in OUTCOMES
+        ]
+    )
+
+
+def record_rendition_created(rendition):
+    """Count a newly stored rendition as pre-generated or as a request-time miss."""
+    outcome = "pregenerated" if _pregenerating.get() else "miss"
+    filter_spec = rendition.filter_spec
+    if filter_spec not in settings.WAGTAIL_PREGENERATED_RENDITIONS:
+        filter_spec = "other"
+    record(outcome, filter_spec)
+    if outcome == "miss":
+        logger.info(
+            "Rendition %s of image %s generated during a request",
+            rendition.filter_spec,
+            rendition.image_id,
+        )
+
+
+def generate_rendition(image_id, filter_spec):
+    """Create one rendition, releasing its in-flight lock afterwards."""
+    try:
+        image = get_image_model().objects.filter(pk=image_id).first()
+        if image is None:
+            return False
+        token = _pregenerating.set(True)
+        try:
+            image.get_rendition(filter_spec)
+        finally:
+            _pregenerating.reset(token)
+        return True
+    finally:
+        cache.delete(_lock_key(image_id, filter_spec))
+
+
+def _enqueue_renditions(pairs):
+    from src.tasks.tasks import generate_image_rendition
+
+    for image_id, filter_spec in pairs:
+        if cache.add(
+            _lock_key(image_id, filter_spec), 1, settings.RENDITION_LOCK_TIMEOUT
+        ):
+            generate_image_rendition.delay(image_id, filter_spec)
+
+
+def queue_renditions(image_ids, filter_specs=None):
+    """
+    Enqueue one Celery job per missing (image, filter) rendition.
+
+    Each job is independent so workers generate renditions in parallel.
+    A cache lock per image and filter keeps a burst of uploads and publishes
+    from queuing the same resize twice while a job is in flight. The locks
+    are taken once the transaction commits, so a rollback leaves none
+    behind. Returns the number of missing renditions.
+    """
+    image_ids = set(image_ids)
+    filter_specs = filter_specs or settings.WAGTAIL_PREGENERATED_RENDITIONS
+    if not image_ids or not filter_specs:
+        return 0
+
+    Rendition = get_image_model().get_rendition_model()
+    existing = set(
+        Rendition.objects.filter(
+            image_id__in=image_ids, filter_spec__in=filter_specs
+        ).values_list("image_id", "filter_spec")
+    )
+    missing = [
+        (image_id, filter_spec)
+        for image_id in sorted(image_ids)
+        for filter_spec in filter_specs
+        if (image_id, filter_spec) not in existing
+    ]
+    if missing:
+        transaction.on_commit(lambda: _enqueue_renditions(missing))
+    return len(missing)
+
+
+def page_image_ids(page):
+    """
+    IDs of the images a page uses.
+
+    Covers direct image foreign keys as well as images Wagtail's reference
+    index found in rich text and StreamField content.
+    """
+    Image = get_image_model()
+    page = page.specific
+    image_ids = {
+        getattr(page, field.attname)
+        for field in page._meta.get_fields()
+        if isinstance(field, models.ForeignKey)
+        and issubclass(field.related_model, Image)
+    }
+    image_ids.update(
+        int(object_id)
+        for object_id in ReferenceIndex.get_references_for_object(page)
+        .filter(to_content_type=ReferenceIndex._get_base_content_type(Image))
+        .values_list("to_object_id", flat=True)
+    )
+    image_ids.discard(None)
+    return image_ids
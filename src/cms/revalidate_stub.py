@@ -0,0 +1,63 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RevalidationStub:
+    """
+    Local stand-in for the Next.js on-demand revalidation webhook.
+
+    Records the paths of every accepted request. Requests without the
+    expected bearer token are answered with 401, like the real endpoint.
+
+        with RevalidationStub(token="secret") as stub:
+            ...
+            assert stub.paths == ["/save-the-park/"]
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, token=""):
+        self.token = token
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.headers.get("Authorization") != f"Bearer {stub.token}":
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append(payload)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b'{"revalidated": true}')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/revalidate"
+
+    @property
+    def paths(self):
+        with self._lock:
+            return [path for payload in self.requests for path in payload["paths"]]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
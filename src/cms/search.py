@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+from src.cms.models import PetitionPage
+
+
+class SearchTimeout(Exception):
+    """Raised when a page search exceeds PAGE_SEARCH_TIMEOUT_MS."""
+
+
+@contextmanager
+def statement_timeout(milliseconds):
+    """
+    Cap the duration of every query in the block on Postgres.
+
+    Runs the block in a transaction so ``SET LOCAL`` is reset on exit.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", [int(milliseconds)])
+        yield
+
+
+def search_petition_pages(query, offset=0, limit=20):
+    """
+    Full-text search over live, public petition pages, best match first.
+
+    Returns ``(pages, has_next)``. One extra row is fetched to tell whether
+    a next page exists without counting all matches. Raises SearchTimeout
+    when Postgres cancels the query for exceeding the latency budget.
+    """
+    queryset = PetitionPage.objects.live().public().select_related("petition")
+    results = queryset.search(query, operator="and").annotate_score("score")
+    try:
+        with statement_timeout(settings.PAGE_SEARCH_TIMEOUT_MS):
+            pages = list(results[offset : offset + limit + 1])
+    except OperationalError as exc:
+        raise SearchTimeout(str(exc)) from exc
+    return pages[:limit], len(pages) > limit
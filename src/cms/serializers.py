@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from src.petitions.models import Petition
+
+
+class PetitionSummarySerializer(serializers.ModelSerializer):
+    """Compact petition representation embedded in Wagtail API page responses."""
+
+    class Meta:
+        model = Petition
+        fields = ("id", "name", "target", "signature_count")
@@ -0,0 +1,138 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from wagtail.images import get_image_model
+from wagtail.search import index
+from wagtail.signals import (
+    page_published,
+    page_slug_changed,
+    page_unpublished,
+    post_page_move,
+)
+
+from src.cms import renditions
+from src.cms.caching import forget_page, invalidate_page
+from src.cms.models import PetitionPage
+from src.cms.snapshots import page_url
+from src.petitions.cache import signature_count_cache_key
+from src.petitions.models import Petition
+
+
+@receiver(page_published, sender=PetitionPage)
+@receiver(page_unpublished, sender=PetitionPage)
+def invalidate_petition_page(sender, instance, **kwargs):
+    invalidate_page(instance.pk)
+
+
+@receiver(post_save, sender=Petition)
+def invalidate_petition_pages(sender, instance, **kwargs):
+    cache.delete(signature_count_cache_key(instance.pk))
+    for page_id in PetitionPage.objects.filter(petition=instance).values_list(
+        "pk", flat=True
+    ):
+        invalidate_page(page_id)
+
+
+@receiver(page_published, sender=PetitionPage)
+@receiver(page_unpublished, sender=PetitionPage)
+def snapshot_published_petition_page(sender, instance, **kwargs):
+    from src.tasks.tasks import snapshot_petition_page
+
+    # Sent for every publish, not only the ones made in the admin
+    page_id = instance.pk
+    transaction.on_commit(lambda: snapshot_petition_page.delay(page_id))
+
+
+@receiver(post_save, sender=Petition)
+def snapshot_petition_pages(sender, instance, created, **kwargs):
+    from src.tasks.tasks import snapshot_petition
+
+    if not created:
+        transaction.on_commit(lambda: snapshot_petition.delay(instance.pk))
+
+
+@receiver(post_save, sender=get_image_model())
+def pregenerate_image_renditions(sender, instance, **kwargs):
+    renditions.queue_renditions([instance.pk])
+
+
+@receiver(page_published)
+def pregenerate_page_renditions(sender, instance, **kwargs):
+    # The reference index is updated after the page is saved, so collect the
+    # images once the publish has been committed
+    transaction.on_commit(
+        lambda: renditions.queue_renditions(renditions.page_image_ids(instance))
+    )
+
+
+@receiver(post_save, sender=get_image_model().get_rendition_model())
+def count_rendition(sender, instance, created, **kwargs):
+    if created:
+        renditions.record_rendition_created(instance)
+
+
+@receiver(page_published, sender=PetitionPage)
+@receiver(page_unpublished, sender=PetitionPage)
+def update_petition_page_search_index(sender, instance, **kwargs):
+    from src.tasks.tasks import update_page_search_index
+
+    transaction.on_commit(lambda: update_page_search_index.delay([instance.pk]))
+
+
+@receiver(post_save, sender=Petition)
+def update_petition_search_index(sender, instance, created, **kwargs):
+    from src.tasks.tasks import update_page_search_index
+
+    if created:
+        return
+    page_ids = list(
+        PetitionPage.objects.filter(petition=instance).values_list("pk", flat=True)
+    )
+    if page_ids:
+        transaction.on_commit(lambda: update_page_search_index.delay(page_ids))
+
+
+@receiver(post_delete, sender=PetitionPage)
+def remove_petition_page_from_search_index(sender, instance, **kwargs):
+    index.remove_object(instance)
+
+
+@receiver(pre_delete, sender=PetitionPage)
+def remember_petition_page_url(sender, instance, **kwargs):
+    # The URL can't be worked out once the page is gone
+    instance._snapshot_url = page_url(instance)
+
+
+@receiver(post_delete, sender=PetitionPage)
+def remove_deleted_petition_page_snapshot(sender, instance, **kwargs):
+    from src.tasks.tasks import remove_petition_page_snapshot
+
+    url = getattr(instance, "_snapshot_url", None)
+    page_id = instance.pk
+    forget_page(page_id)
+    if url is not None:
+        transaction.on_commit(lambda: remove_petition_page_snapshot.delay(url, page_id))
+
+
+def _queue_snapshot_move(page, old_url):
+    from src.tasks.tasks import remove_petition_page_snapshot, snapshot_petition_page
+
+    page_id = page.pk
+    if old_url is not None and old_url != page_url(page):
+        transaction.on_commit(lambda: remove_petition_page_snapshot.delay(old_url))
+    if page.live:
+        transaction.on_commit(lambda: snapshot_petition_page.delay(page_id))
+
+
+@receiver(page_slug_changed, sender=PetitionPage)
+def move_renamed_petition_page_snapshot(sender, instance, instance_before, **kwargs):
+    forget_page(instance.pk)
+    _queue_snapshot_move(instance, page_url(instance_before))
+
+
+@receiver(post_page_move, sender=PetitionPage)
+def move_moved_petition_page_snapshot(sender, instance, url_path_before, **kwargs):
+    forget_page(instance.pk)
+    page_before = PetitionPage(pk=instance.pk, url_path=url_path_before)
+    _queue_snapshot_move(instance, page_url(page_before))
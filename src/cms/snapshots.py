@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import tempfile
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _page_path(page):
+    """The page's path relative to its site root, e.g. ``save-the-park/``."""
+    url_parts = page.get_url_parts()
+    if url_parts is None:
+        return None
+    return url_parts[2].strip("/")
+
+
+def page_url(page):
+    """The page's public path, e.g. ``/save-the-park/``."""
+    page_path = _page_path(page)
+    if page_path is None:
+        return None
+    return f"/{page_path}/" if page_path else "/"
+
+
+def html_path(url):
+    """The snapshot file served for the public path ``url``."""
+    return os.path.join(settings.SNAPSHOT_ROOT, url.strip("/"), "index.html")
+
+
+def page_html_path(page):
+    url = page_url(page)
+    if url is None:
+        return None
+    return html_path(url)
+
+
+def json_path(page_id):
+    return os.path.join(settings.SNAPSHOT_ROOT, "api", "v2", "pages", f"{page_id}.json")
+
+
+def page_json_path(page):
+    return json_path(page.pk)
+
+
+def count_json_path(petition_id):
+    return os.path.join(
+        settings.SNAPSHOT_ROOT, "petitions", str(petition_id), "count.json"
+    )
+
+
+def count_json_url(petition_id):
+    return f"{settings.SNAPSHOT_URL}petitions/{petition_id}/count.json"
+
+
+def _write_atomic(path, content):
+    """Write ``content`` so readers never see a partially written file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _anonymous_request(page, path):
+    """A GET request for ``path`` as an anonymous visitor of the page's site."""
+    meta = page._get_dummy_headers()
+    meta["PATH_INFO"] = path
+    meta["QUERY_STRING"] = ""
+    request = WSGIRequest(meta)
+    request.user = AnonymousUser()
+    return request
+
+
+def render_page_html(page):
+    response = page.serve(_anonymous_request(page, page_url(page)))
+    if hasattr(response, "render"):
+        response.render()
+    return response.content
+
+
+def render_page_json(page):
+    """Render the page exactly as the Wagtail pages API detail view would."""
+    path = reverse("wagtailapi:pages:detail", args=(page.pk,))
+    match = resolve(path)
+    response = match.func(_anonymous_request(page, path), *match.args, **match.kwargs)
+    response.render()
+    return response.content
+
+
+def write_count_snapshot(petition_id, signature_count, target):
+    _write_atomic(
+        count_json_path(petition_id),
+        json.dumps(
+            {
+                "id": petition_id,
+                "signature_count": signature_count,
+                "target": target,
+                "updated_at": timezone.now().isoformat(),
+            }
+        ).encode(),
+    )
+
+
+def write_page_snapshot(page):
+    """
+    Pre-render a live PetitionPage to static files.
+
+    Writes the page HTML under its URL path (served as ``index.html``), the
+    headless JSON the Wagtail API would return, and the petition's
+    ``count.json`` fragment. Returns the public paths that changed.
+    """
+    html_path = page_html_path(page)
+    if html_path is None:
+        return []
+    _write_atomic(html_path, render_page_html(page))
+    _write_atomic(page_json_path(page), render_page_json(page))
+    if page.petition_id:
+        write_count_snapshot(
+            page.petition_id, page.petition.signature_count, page.petition.target
+        )
+    return [page_url(page)]
+
+
+def remove_page_snapshot(page):
+    url = page_url(page)
+    if url is not None:
+        _remove(html_path(url))
+    _remove(page_json_path(page))
+
+
+def remove_snapshot(url, page_id=None):
+    """
+    Remove the HTML snapshot served at ``url``.
+
+    Used once the page no longer lives there, so the path has to be captured
+    before the page is deleted or moved. The headless JSON is keyed by the
+    page ID and only removed when ``page_id`` is given.
+    """
+    _remove(html_path(url))
+    if page_id is not None:
+        _remove(json_path(page_id))
+
+
+def notify_revalidate(paths):
+    """
+    Ask the Next.js frontend to revalidate ``paths``.
+
+    Posts ``{"paths": [...]}`` to NEXTJS_REVALIDATE_URL with the shared token
+    as a bearer token. Does nothing when no webhook is configured. Returns
+    True when the frontend accepted the request.
+    """
+    if not settings.NEXTJS_REVALIDATE_URL or not paths:
+        return False
+    request = urllib.request.Request(
+        settings.NEXTJS_REVALIDATE_URL,
+        data=json.dumps({"paths": paths}).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {settings.NEXTJS_REVALIDATE_TOKEN}",
+        },
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(
+            request, timeout=settings.NEXTJS_REVALIDATE_TIMEOUT
+        ) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError) as exc:
+        logger.warning("Next.js revalidation failed for %s: %s", paths, exc)
+        return False
@@ -0,0 +1,27 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from src.cms.caching import COUNT_PLACEHOLDER
+from src.cms.snapshots import count_json_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def signature_count(petition):
+    """
+    Render a placeholder for the petition's signature count.
+
+    The placeholder survives in the cached page HTML and is replaced with the
+    current count from its own short-lived cache on every response. Static
+    snapshots refresh the number client-side from ``data-count-url``.
+    """
+    if petition is None:
+        return ""
+    return format_html(
+        '<span data-petition-count="{}" data-count-url="{}">{}</span>',
+        petition.pk,
+        count_json_url(petition.pk),
+        mark_safe(COUNT_PLACEHOLDER.format(petition_id=petition.pk)),
+    )
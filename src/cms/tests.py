@@ -1,3 +1,499 @@
-from django.test import TestCase
+import json
+from unittest.mock import patch
 
-# Create your tests here.
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page
+
+from src.petitions.cache import signature_count_cache_key
+from src.petitions.models import Petition
+from src.petitions.services import increment_signature_count
+
+from src.tasks.tasks import (
+    refresh_snapshot_counts,
+    remove_petition_page_snapshot,
+    snapshot_petition_page,
+    update_page_search_index,
+)
+
+from . import renditions
+from .middleware import SnapshotMiddleware
+from .models import PetitionPage
+from .search import SearchTimeout
+from .revalidate_stub import RevalidationStub
+
+
+@pytest.mark.django_db
+class TestPetitionPageCache:
+    """Tests for the cached PetitionPage rendering"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_second_request_is_served_from_cache_without_queries(
+        self, client, petition_page
+    ):
+        """Test a cache hit skips routing and the petition lookup entirely"""
+        first = client.get("/save-the-park/")
+        assert first.status_code == 200
+        assert first["X-Page-Cache"] == "miss"
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get("/save-the-park/")
+        assert second["X-Page-Cache"] == "hit"
+        assert second.content == first.content
+        assert len(ctx.captured_queries) == 0
+
+    def test_path_without_trailing_slash_redirects(self, client, petition_page):
+        """Test the page is only served and cached at its canonical URL"""
+        response = client.get("/save-the-park")
+
+        assert response.status_code == 301
+        assert response["Location"] == "/save-the-park/"
+
+    def test_query_strings_bypass_cache(self, client, petition_page):
+        """Test query strings neither read nor fill the page cache"""
+        client.get("/save-the-park/")
+
+        response = client.get("/save-the-park/?utm_source=newsletter")
+        assert response.status_code == 200
+        assert "X-Page-Cache" not in response
+        assert client.get("/save-the-park/")["X-Page-Cache"] == "hit"
+
+    def test_cached_response_keeps_headers(self, client, petition_page):
+        """Test a hit replays all headers of the rendered response"""
+        serve = Page.serve
+
+        def serve_with_header(self, request, *args, **kwargs):
+            response = serve(self, request, *args, **kwargs)
+            response["Content-Language"] = "pl"
+            return response
+
+        with patch.object(Page, "serve", serve_with_header):
+            first = client.get("/save-the-park/")
+        second = client.get("/save-the-park/")
+
+        assert second["X-Page-Cache"] == "hit"
+        assert second["Content-Language"] == "pl"
+        assert second["Content-Type"] == first["Content-Type"]
+
+    def test_signature_count_is_a_separate_fragment(
+        self, client, petition_page, petition
+    ):
+        """Test new signatures show up without invalidating the cached page"""
+        response = client.get("/save-the-park/")
+        assert b'data-petition-count="%d">0<' % petition.pk in response.content
+
+        increment_signature_count(petition.pk, by=5)
+        # Simulate the short count TTL expiring
+        cache.delete(signature_count_cache_key(petition.pk))
+
+        response = client.get("/save-the-park/")
+        assert response["X-Page-Cache"] == "hit"
+        assert b'data-petition-count="%d">5<' % petition.pk in response.content
+
+    def test_publish_invalidates_page(self, client, petition_page):
+        """Test publishing a new revision drops the cached render"""
+        client.get("/save-the-park/")
+        petition_page.title = "Save the big park"
+        petition_page.save_revision().publish()
+
+        response = client.get("/save-the-park/")
+        assert response["X-Page-Cache"] == "miss"
+        assert b"Save the big park" in response.content
+
+    def test_petition_save_invalidates_page(self, client, petition_page, petition):
+        """Test saving the linked petition drops the cached render"""
+        client.get("/save-the-park/")
+        petition.target = 500
+        petition.save()
+
+        response = client.get("/save-the-park/")
+        assert response["X-Page-Cache"] == "miss"
+        assert b"/ 500" in response.content
+
+    def test_delete_drops_page_url(self, client, petition_page):
+        """Test a deleted page is no longer served from its old URL"""
+        client.get("/save-the-park/")
+        petition_page.delete()
+
+        assert client.get("/save-the-park/").status_code == 404
+
+    def test_slug_change_drops_old_url(self, client, petition_page):
+        """Test a renamed page is no longer served from its old URL"""
+        client.get("/save-the-park/")
+        petition_page.slug = "save-the-forest"
+        petition_page.save_revision().publish()
+
+        assert client.get("/save-the-park/").status_code == 404
+        assert client.get("/save-the-forest/")["X-Page-Cache"] == "miss"
+
+    def test_logged_in_requests_bypass_cache(self, admin_client, petition_page):
+        """Test requests carrying a session are never cached"""
+        admin_client.get("/save-the-park/")
+        response = admin_client.get("/save-the-park/")
+        assert "X-Page-Cache" not in response
+
+
+@pytest.mark.django_db
+class TestPetitionPageAPI:
+    """Tests for petition data in the Wagtail pages API"""
+
+    def add_pages(self, home_page, count, start=0):
+        for i in range(start, start + count):
+            petition = Petition.objects.create(
+                name=f"Petition {i}",
+                target=100,
+                email_subject="Thank you for signing",
+                email_content="Thank you for supporting our cause.",
+                signature_count=i,
+            )
+            page = home_page.add_child(
+                instance=PetitionPage(
+                    title=f"Petition page {i}",
+                    slug=f"petition-page-{i}",
+                    petition=petition,
+                )
+            )
+            page.save_revision().publish()
+
+    def list_pages(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(
+                "/api/v2/pages/",
+                {"type": "cms.PetitionPage", "fields": "petition", "limit": 50},
+            )
+        assert response.status_code == 200
+        return response.json(), len(ctx.captured_queries)
+
+    def test_listing_embeds_petition(self, client, home_page):
+        """Test each page carries a compact petition object"""
+        self.add_pages(home_page, 1)
+        data, _ = self.list_pages(client)
+        assert data["items"][0]["petition"] == {
+            "id": Petition.objects.get().pk,
+            "name": "Petition 0",
+            "target": 100,
+            "signature_count": 0,
+        }
+
+    def test_listing_query_count_does_not_grow_with_page_size(self, client, home_page):
+        """Test the petition is joined rather than fetched per page"""
+        self.add_pages(home_page, 1)
+        _, single = self.list_pages(client)
+
+        self.add_pages(home_page, 10, start=1)
+        data, many = self.list_pages(client)
+
+        assert data["meta"]["total_count"] == 11
+        assert many == single
+
+
+@pytest.mark.django_db
+class TestPetitionPageSnapshots:
+    """Tests for the static snapshots of petition pages"""
+
+    @pytest.fixture
+    def stub(self, settings, tmp_path):
+        """Point snapshots at a temp dir and revalidation at a local stub"""
+        settings.SNAPSHOT_ROOT = str(tmp_path)
+        settings.NEXTJS_REVALIDATE_TOKEN = "secret"
+        with RevalidationStub(token="secret") as stub:
+            settings.NEXTJS_REVALIDATE_URL = stub.url
+            yield stub
+
+    def read_json(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def test_snapshot_writes_html_json_and_revalidates(
+        self, stub, tmp_path, petition_page, petition
+    ):
+        """Test publishing output lands on disk and the frontend is notified"""
+        snapshot_petition_page(petition_page.pk)
+
+        html = (tmp_path / "save-the-park" / "index.html").read_text()
+        assert "Save the park" in html
+        assert f'data-count-url="/petitions/{petition.pk}/count.json"' in html
+
+        data = self.read_json(
+            tmp_path / "api" / "v2" / "pages" / f"{petition_page.pk}.json"
+        )
+        assert data["petition"]["name"] == "Test Petition"
+
+        count = self.read_json(tmp_path / "petitions" / str(petition.pk) / "count.json")
+        assert count["signature_count"] == 0
+        assert stub.paths == ["/save-the-park/"]
+
+    def test_unpublish_removes_snapshot(self, stub, tmp_path, petition_page):
+        """Test unpublished pages are no longer served statically"""
+        snapshot_petition_page(petition_page.pk)
+        petition_page.unpublish()
+        snapshot_petition_page(petition_page.pk)
+
+        assert not (tmp_path / "save-the-park" / "index.html").exists()
+        assert stub.paths == ["/save-the-park/", "/save-the-park/"]
+
+    def test_publish_queues_snapshot(
+        self, petition_page, django_capture_on_commit_callbacks
+    ):
+        """Test publishing outside the admin also refreshes the snapshot"""
+        with patch("src.tasks.tasks.snapshot_petition_page.delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                petition_page.save_revision().publish()
+            with django_capture_on_commit_callbacks(execute=True):
+                petition_page.unpublish()
+        assert [call.args for call in delay.call_args_list] == [
+            (petition_page.pk,),
+            (petition_page.pk,),
+        ]
+
+    def test_delete_removes_snapshot(
+        self, stub, tmp_path, petition_page, django_capture_on_commit_callbacks
+    ):
+        """Test deleted pages stop being served from their old path"""
+        snapshot_petition_page(petition_page.pk)
+        page_id = petition_page.pk
+
+        with patch(
+            "src.tasks.tasks.remove_petition_page_snapshot.delay",
+            side_effect=remove_petition_page_snapshot,
+        ):
+            with django_capture_on_commit_callbacks(execute=True):
+                petition_page.delete()
+
+        assert not (tmp_path / "save-the-park" / "index.html").exists()
+        assert not (tmp_path / "api" / "v2" / "pages" / f"{page_id}.json").exists()
+        assert stub.paths == ["/save-the-park/", "/save-the-park/"]
+
+    def test_slug_change_moves_snapshot(
+        self, stub, tmp_path, petition_page, django_capture_on_commit_callbacks
+    ):
+        """Test a renamed page is no longer served at its old path"""
+        snapshot_petition_page(petition_page.pk)
+
+        with (
+            patch(
+                "src.tasks.tasks.remove_petition_page_snapshot.delay",
+                side_effect=remove_petition_page_snapshot,
+            ),
+            patch(
+                "src.tasks.tasks.snapshot_petition_page.delay",
+                side_effect=snapshot_petition_page,
+            ),
+        ):
+            with django_capture_on_commit_callbacks(execute=True):
+                petition_page.slug = "renamed"
+                petition_page.save_revision().publish()
+
+        assert not (tmp_path / "save-the-park" / "index.html").exists()
+        assert (tmp_path / "renamed" / "index.html").exists()
+        assert "/save-the-park/" in stub.paths[1:]
+
+    def test_count_refresh_leaves_page_snapshot_alone(
+        self, stub, tmp_path, petition_page, petition
+    ):
+        """Test the periodic job only rewrites the count fragment"""
+        snapshot_petition_page(petition_page.pk)
+        html_path = tmp_path / "save-the-park" / "index.html"
+        mtime = html_path.stat().st_mtime_ns
+
+        increment_signature_count(petition.pk, by=7)
+        refresh_snapshot_counts()
+
+        count = self.read_json(tmp_path / "petitions" / str(petition.pk) / "count.json")
+        assert count["signature_count"] == 7
+        assert html_path.stat().st_mtime_ns == mtime
+        assert stub.paths == ["/save-the-park/"]
+
+    def test_petition_save_queues_snapshot(
+        self, petition_page, petition, django_capture_on_commit_callbacks
+    ):
+        """Test editing the petition refreshes the pages showing it"""
+        with patch("src.tasks.tasks.snapshot_petition.delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                petition.name = "Renamed"
+                petition.save()
+        delay.assert_called_once_with(petition.pk)
+
+
+class TestSnapshotMiddleware:
+    """Tests for serving snapshots in front of Django"""
+
+    @pytest.fixture
+    def middleware(self, settings, tmp_path):
+        settings.SNAPSHOT_ROOT = str(tmp_path)
+        settings.SNAPSHOT_SERVE = True
+        return SnapshotMiddleware(lambda request: HttpResponse("django"))
+
+    def test_serves_snapshots_written_after_startup(self, middleware, rf, tmp_path):
+        """Test files are looked up per request, not at startup"""
+        assert middleware(rf.get("/snapshot/")).content == b"django"
+
+        (tmp_path / "snapshot").mkdir()
+        (tmp_path / "snapshot" / "index.html").write_text("<h1>Snapshot</h1>")
+        response = middleware(rf.get("/snapshot/"))
+
+        assert response["X-Page-Cache"] == "snapshot"
+        assert response["Content-Type"] == "text/html"
+        assert b"".join(response.streaming_content) == b"<h1>Snapshot</h1>"
+
+    def test_only_plain_anonymous_reads_are_served(self, middleware, rf, tmp_path):
+        """Test sessions, query strings, writes and traversal fall through"""
+        (tmp_path / "index.html").write_text("home")
+        (tmp_path / ".snapshot-tmp").write_text("partial")
+        session = rf.get("/")
+        session.COOKIES["sessionid"] = "abc"
+
+        for request in [
+            session,
+            rf.get("/", {"preview": "1"}),
+            rf.post("/"),
+            rf.get("/.snapshot-tmp"),
+            rf.get("/../etc/passwd"),
+        ]:
+            assert middleware(request).content == b"django"
+
+
+@pytest.mark.django_db
+class TestRenditionPregeneration:
+    """Tests for the background rendition pipeline"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, settings):
+        settings.WAGTAIL_PREGENERATED_RENDITIONS = ["max-165x165", "width-500"]
+        cache.clear()
+        yield
+        cache.clear()
+
+    def create_image(self):
+        return get_image_model().objects.create(
+            title="Test image", file=get_test_image_file()
+        )
+
+    def test_upload_queues_each_filter_once(self, django_capture_on_commit_callbacks):
+        """Test an upload queues one job per filter and dedupes in-flight jobs"""
+        with patch("src.tasks.tasks.generate_image_rendition.delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                image = self.create_image()
+            assert sorted(call.args for call in delay.call_args_list) == [
+                (image.pk, "max-165x165"),
+                (image.pk, "width-500"),
+            ]
+
+            with django_capture_on_commit_callbacks(execute=True):
+                renditions.queue_renditions([image.pk])
+            assert delay.call_count == 2
+
+    def test_rollback_leaves_no_lock(self):
+        """Test a rolled back upload doesn't block queuing its renditions"""
+        with patch("src.tasks.tasks.generate_image_rendition.delay") as delay:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    image = self.create_image()
+                    raise RuntimeError
+        delay.assert_not_called()
+        assert cache.get(renditions._lock_key(image.pk, "width-500")) is None
+
+    def test_existing_renditions_are_not_queued(self):
+        """Test renditions already on disk are skipped"""
+        with patch("src.tasks.tasks.generate_image_rendition.delay"):
+            image = self.create_image()
+        renditions.generate_rendition(image.pk, "width-500")
+        renditions.generate_rendition(image.pk, "max-165x165")
+        assert renditions.queue_renditions([image.pk]) == 0
+
+    def test_stats_separate_pregenerated_from_misses(self):
+        """Test renditions created while serving a request count as misses"""
+        with patch("src.tasks.tasks.generate_image_rendition.delay"):
+            image = self.create_image()
+        renditions.generate_rendition(image.pk, "width-500")
+        image.get_rendition("max-165x165")
+        image.get_rendition("fill-100x100")
+
+        stats = renditions.get_stats()
+        assert stats["width-500"] == {"pregenerated": 1, "miss": 0}
+        assert stats["max-165x165"] == {"pregenerated": 0, "miss": 1}
+        assert stats["other"] == {"pregenerated": 0, "miss": 1}
+
+
+@pytest.mark.django_db
+class TestPetitionPageSearch:
+    """Tests for the petition page search index and endpoint"""
+
+    @pytest.fixture
+    def pages(self, home_page):
+        """Publish two petition pages"""
+        pages = []
+        for title, name in (
+            ("Ratujmy park", "Park miejski zostaje"),
+            ("Nowe drzewa", "Posadzimy drzewa w parku"),
+        ):
+            petition = Petition.objects.create(
+                name=name,
+                target=100,
+                email_subject="Thank you for signing",
+                email_content="Thank you for supporting our cause.",
+            )
+            page = home_page.add_child(
+                instance=PetitionPage(
+                    title=title, slug=slugify(title), petition=petition
+                )
+            )
+            page.save_revision().publish()
+            pages.append(page)
+        return pages
+
+    def search(self, client, q, **params):
+        response = client.get("/api/pages/search", {"q": q, **params})
+        assert response.status_code == 200
+        return response.json()
+
+    def test_publish_does_not_index_during_request(self, client, pages):
+        """Test indexing waits for the Celery task"""
+        assert self.search(client, "drzewa")["results"] == []
+
+        update_page_search_index([page.pk for page in pages])
+        results = self.search(client, "drzewa")["results"]
+        assert [result["title"] for result in results] == ["Nowe drzewa"]
+
+    def test_petition_name_is_searchable(self, client, pages):
+        """Test the linked petition's name is part of the page's document"""
+        update_page_search_index([page.pk for page in pages])
+        results = self.search(client, "miejski")["results"]
+        assert [result["id"] for result in results] == [pages[0].pk]
+        assert results[0]["petition_name"] == "Park miejski zostaje"
+
+    def test_pagination(self, client, pages):
+        """Test page_size limits results and has_next reports more"""
+        for i in range(3):
+            pages[0].get_parent().add_child(
+                instance=PetitionPage(title=f"Petycja {i}", slug=f"petycja-{i}")
+            ).save_revision().publish()
+        update_page_search_index(
+            list(PetitionPage.objects.values_list("pk", flat=True))
+        )
+
+        first = self.search(client, "petycja", page_size=2)
+        second = self.search(client, "petycja", page_size=2, page=2)
+        assert first["has_next"] is True
+        assert second["has_next"] is False
+        assert len(first["results"]) + len(second["results"]) == 3
+
+    def test_timeout_returns_503(self, client):
+        """Test searches over the latency budget fail fast"""
+        with patch(
+            "src.api.endpoints.pages.search_petition_pages",
+            side_effect=SearchTimeout("canceling statement due to statement timeout"),
+        ):
+            response = client.get("/api/pages/search", {"q": "park"})
+        assert response.status_code == 503
@@ -1 +1,16 @@
-# Create your views here.
+from wagtail import views as wagtail_views
+
+from src.cms.caching import get_cached_response
+
+
+def serve(request, path):
+    """
+    Wagtail's page view, short-circuited by the PetitionPage render cache.
+
+    On a miss the request is routed by Wagtail as usual and
+    ``PetitionPage.serve`` populates the cache.
+    """
+    response = get_cached_response(request)
+    if response is not None:
+        return response
+    return wagtail_views.serve(request, path)
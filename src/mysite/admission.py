@@ -0,0 +1,219 @@
+"""
+Admission control: shed low-priority requests before the database drowns.
+
+Each route in ADMISSION_ROUTE_PRIORITIES gets a priority, and each priority
+in ADMISSION_LIMITS gets thresholds on three load signals:
+
+- ``max_in_flight``: admission-controlled requests in progress across all
+  web workers, counted in the default cache (Redis in production);
+- ``max_db_latency_ms``: the recent average query time. Django keeps no
+  connection pool to wait on, so a saturated Postgres shows up here, as
+  queries queue behind each other;
+- ``max_broker_latency_ms``: the recent average time to publish a Celery
+  task.
+
+A request whose priority's thresholds are exceeded is answered right away
+with a 503 and a Retry-After header. Signature writes are shed first, then
+API reads, and cached page views last, so the pages keep loading while a
+signature surge backs off. Both latency averages decay towards zero when
+nothing is observed, so shedding stops once the load is gone even if every
+request of a priority was being shed.
+"""
+
+import logging
+import time
+
+from celery.signals import after_task_publish, before_task_publish
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT_KEY = "admission:in_flight"
+
+
+class DecayingAverage:
+    """
+    An exponentially weighted moving average that fades when idle.
+
+    Each observation moves the average by ``alpha`` of the difference, so a
+    single slow request barely registers while a sustained change shows up
+    within a few dozen requests. Without observations the average halves
+    every ``half_life`` seconds.
+    """
+
+    def __init__(self, alpha=0.1, half_life=5):
+        self.alpha = alpha
+        self.half_life = half_life
+        self._value = 0.0
+        self._updated = time.monotonic()
+
+    @property
+    def value(self):
+        idle = time.monotonic() - self._updated
+        return self._value * 0.5 ** (idle / self.half_life)
+
+    def observe(self, value):
+        current = self.value
+        self._value = current + self.alpha * (value - current)
+        self._updated = time.monotonic()
+
+    def reset(self):
+        self._value = 0.0
+        self._updated = time.monotonic()
+
+
+class LoadSignals:
+    """The load signals of this process, fed by requests and task publishes."""
+
+    def __init__(self):
+        self.db_latency_ms = DecayingAverage()
+        self.broker_latency_ms = DecayingAverage()
+
+    def in_flight(self):
+        return max(cache.get(IN_FLIGHT_KEY, 0), 0)
+
+    def reset(self):
+        self.db_latency_ms.reset()
+        self.broker_latency_ms.reset()
+        cache.delete(IN_FLIGHT_KEY)
+
+
+signals = LoadSignals()
+
+
+def _enter():
+    try:
+        cache.incr(IN_FLIGHT_KEY)
+    except ValueError:
+        if not cache.add(IN_FLIGHT_KEY, 1, settings.ADMISSION_IN_FLIGHT_TTL):
+            cache.incr(IN_FLIGHT_KEY)
+        return
+    # incr keeps the expiry set when the key was created; push it back so the
+    # counter doesn't vanish under load and later decrs don't undercount.
+    # Counts leaked by killed workers are dropped once requests pause.
+    cache.touch(IN_FLIGHT_KEY, settings.ADMISSION_IN_FLIGHT_TTL)
+
+
+def _leave():
+    try:
+        cache.decr(IN_FLIGHT_KEY)
+    except ValueError:
+        pass
+
+
+def route_priority(request, route):
+    """The priority of ``route``; "METHOD route" entries take precedence."""
+    priorities = settings.ADMISSION_ROUTE_PRIORITIES
+    return priorities.get(f"{request.method} {route}", priorities.get(route))
+
+
+def shed_reason(priority):
+    """Which threshold of ``priority`` the current load exceeds, if any."""
+    limits = settings.ADMISSION_LIMITS.get(priority, {})
+    max_in_flight = limits.get("max_in_flight")
+    if max_in_flight is not None and signals.in_flight() >= max_in_flight:
+        return "in_flight"
+    max_db_latency_ms = limits.get("max_db_latency_ms")
+    if (
+        max_db_latency_ms is not None
+        and signals.db_latency_ms.value > max_db_latency_ms
+    ):
+        return "db_latency"
+    max_broker_latency_ms = limits.get("max_broker_latency_ms")
+    if (
+        max_broker_latency_ms is not None
+        and signals.broker_latency_ms.value > max_broker_latency_ms
+    ):
+        return "broker_latency"
+    return None
+
+
+def overloaded_response(request):
+    retry_after = str(settings.ADMISSION_RETRY_AFTER)
+    if request.path_info.startswith("/api/"):
+        response = JsonResponse(
+            {"detail": "Service overloaded, please retry later"}, status=503
+        )
+    else:
+        response = HttpResponse(
+            "Service overloaded, please retry later",
+            status=503,
+            content_type="text/plain",
+        )
+    response["Retry-After"] = retry_after
+    return response
+
+
+def _record(route, priority, decision, reason=""):
+    if settings.METRICS_ENABLED:
+        from src.observability import metrics
+
+        metrics.ADMISSION_DECISIONS.labels(
+            route=route, priority=priority, decision=decision, reason=reason
+        ).inc()
+
+
+class AdmissionControlMiddleware:
+    """
+    Admit or shed requests to the routes in ADMISSION_ROUTE_PRIORITIES.
+
+    Sits outside QueryBudgetMiddleware and feeds the DB latency signal from
+    the query stats it attaches to responses. Other routes pass through
+    untouched.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.get_response(request)
+        route = match.view_name or match.route
+        priority = route_priority(request, route)
+        if priority is None:
+            return self.get_response(request)
+
+        reason = shed_reason(priority)
+        if reason is not None:
+            # Lets the metrics and tracing middleware label the response
+            request.resolver_match = match
+            _record(route, priority, "shed", reason)
+            logger.debug("Shedding %s %s (%s)", request.method, route, reason)
+            return overloaded_response(request)
+
+        _record(route, priority, "admitted")
+        _enter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _leave()
+
+        stats = getattr(response, "query_stats", None)
+        if stats is not None and stats.count:
+            signals.db_latency_ms.observe(stats.duration_ms / stats.count)
+        return response
+
+
+# Publish start times by task id
+_publishing = {}
+
+
+@before_task_publish.connect
+def start_publish_timer(headers=None, **kwargs):
+    if settings.ADMISSION_CONTROL_ENABLED and headers is not None:
+        _publishing[headers.get("id")] = time.perf_counter()
+
+
+@after_task_publish.connect
+def record_publish_latency(headers=None, **kwargs):
+    started = _publishing.pop((headers or {}).get("id"), None)
+    if started is not None:
+        signals.broker_latency_ms.observe((time.perf_counter() - started) * 1000)
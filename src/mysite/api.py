@@ -3,10 +3,29 @@ from wagtail.api.v2.views import PagesAPIViewSet
 from wagtail.images.api.v2.views import ImagesAPIViewSet
 from wagtail.documents.api.v2.views import DocumentsAPIViewSet
 
+from src.cms.models import PetitionPage
+
+
+class PetitionAwarePagesAPIViewSet(PagesAPIViewSet):
+    """
+    Pages endpoint that joins the petition when listing PetitionPages.
+
+    With ``?type=cms.PetitionPage`` the embedded petition is loaded in the
+    same query as the pages, so the listing costs a fixed number of queries
+    regardless of the page size.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if issubclass(queryset.model, PetitionPage):
+            queryset = queryset.select_related('petition')
+        return queryset
+
+
 # Create the router. "wagtailapi" is the URL namespace
 api_router = WagtailAPIRouter('wagtailapi')
 
 # Register the default endpoints
-api_router.register_endpoint('pages', PagesAPIViewSet)
+api_router.register_endpoint('pages', PetitionAwarePagesAPIViewSet)
 api_router.register_endpoint('images', ImagesAPIViewSet)
-api_router.register_endpoint('documents', DocumentsAPIViewSet)
\ No newline at end of file
+api_router.register_endpoint('documents', DocumentsAPIViewSet)
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for the web container.
+
+    gunicorn -c python:src.mysite.gunicorn_conf src.mysite.wsgi:application
+
+By default the app is preloaded: the master imports Django, runs the
+warm-up in src/mysite/warmup.py and freezes the heap, then forks workers
+that share all of it copy-on-write and answer their first request without
+paying for imports. Set GUNICORN_PRELOAD=False to load the app in every
+worker instead (e.g. to reload code with HUP); the warm-up then runs in
+each worker after it boots.
+"""
+
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+# Gunicorn's own default: one worker unless WEB_CONCURRENCY says otherwise
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+# Keep the worker heartbeat file off the container's overlay filesystem
+worker_tmp_dir = os.environ.get("GUNICORN_WORKER_TMP_DIR", "/dev/shm")
+if not os.path.isdir(worker_tmp_dir):
+    worker_tmp_dir = None
+accesslog = "-"
+
+
+def when_ready(server):
+    # Runs in the master before the first workers are forked
+    if server.cfg.preload_app:
+        from src.mysite.warmup import warm_up
+
+        warm_up(freeze=True)
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from src.mysite.warmup import warm_up
+
+        warm_up()
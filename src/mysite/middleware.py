@@ -0,0 +1,91 @@
+"""
+Middleware variants that step aside for anonymous API requests.
+
+Each class behaves exactly like the stock middleware it extends, except for
+requests to LEAN_MIDDLEWARE_PATH_PREFIXES that carry no session cookie. Those
+are public API calls: they have no session to load, no user to look up, no
+flash messages and no use for static file or redirect lookups, so the
+middleware is skipped and only the cheap defaults (an anonymous user, an
+empty session) are attached. Requests with a session cookie, e.g. staff
+calling the export endpoints, and all admin and page views get the full
+stack.
+"""
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from wagtail.contrib.redirects.middleware import RedirectMiddleware
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+def is_lean_request(request):
+    """Whether ``request`` is an anonymous call to an API path."""
+    lean = getattr(request, "_lean_middleware", None)
+    if lean is None:
+        lean = (
+            request.path_info.startswith(tuple(settings.LEAN_MIDDLEWARE_PATH_PREFIXES))
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+        request._lean_middleware = lean
+    return lean
+
+
+class LeanMiddlewareMixin:
+    """Skip ``process_request``/``process_response`` for lean requests."""
+
+    def lean_request(self, request):
+        """Attach whatever later code may expect in place of the real work."""
+
+    def process_request(self, request):
+        if is_lean_request(request):
+            return self.lean_request(request)
+        process_request = getattr(super(), "process_request", None)
+        if process_request is not None:
+            return process_request(request)
+
+    def process_response(self, request, response):
+        if is_lean_request(request):
+            return response
+        process_response = getattr(super(), "process_response", None)
+        if process_response is not None:
+            return process_response(request, response)
+        return response
+
+
+class LeanSessionMiddleware(LeanMiddlewareMixin, SessionMiddleware):
+    def lean_request(self, request):
+        # An unsaved, empty session: reading it costs nothing and nothing
+        # written to it is persisted
+        request.session = self.SessionStore(None)
+
+
+class LeanAuthenticationMiddleware(LeanMiddlewareMixin, AuthenticationMiddleware):
+    def lean_request(self, request):
+        request.user = AnonymousUser()
+
+        async def auser():
+            return request.user
+
+        request.auser = auser
+
+
+class LeanMessageMiddleware(LeanMiddlewareMixin, MessageMiddleware):
+    pass
+
+
+class LeanXFrameOptionsMiddleware(LeanMiddlewareMixin, XFrameOptionsMiddleware):
+    pass
+
+
+class LeanRedirectMiddleware(LeanMiddlewareMixin, RedirectMiddleware):
+    """Skips the redirect table lookup Wagtail does for every API 404."""
+
+
+class LeanWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    def __call__(self, request):
+        if is_lean_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
@@ -41,11 +41,13 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres", # Trigram search and GIN indexes
 
     # Project apps
     "src.cms", # App for Wagtail models (Moved before wagtail.admin for template overrides)
     "src.petitions",
     "src.api",
+    "src.observability",
     "src.tasks",
 
     # Wagtail core
@@ -65,24 +67,142 @@ INSTALLED_APPS = [
     # Third-party apps required by Wagtail
     "modelcluster",
     "taggit",
+    "rest_framework", # Serializers and browsable renderer for the Wagtail API
     "wagtail_headless_preview", # Headless preview support
     "wagtail_modeladmin",
     "django_celery_beat", # Moved here as it's third-party related
 ]
 
+# The Lean* classes are the stock middleware, skipped for anonymous requests
+# to LEAN_MIDDLEWARE_PATH_PREFIXES (see src/mysite/middleware.py)
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "src.observability.middleware.TracingMiddleware",
+    "src.observability.middleware.MetricsMiddleware",
+    "src.mysite.admission.AdmissionControlMiddleware",
+    "src.observability.middleware.ProfilingMiddleware",
+    "src.observability.middleware.QueryBudgetMiddleware",
+    "src.cms.middleware.SnapshotMiddleware",
+    "src.mysite.middleware.LeanSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "src.mysite.middleware.LeanAuthenticationMiddleware",
+    "src.mysite.middleware.LeanMessageMiddleware",
+    "src.mysite.middleware.LeanXFrameOptionsMiddleware",
+    "src.mysite.middleware.LeanWhiteNoiseMiddleware",
     # Wagtail middleware
-    "wagtail.contrib.redirects.middleware.RedirectMiddleware",
+    "src.mysite.middleware.LeanRedirectMiddleware",
 ]
 
+LEAN_MIDDLEWARE_PATH_PREFIXES = ["/api/", "/metrics"]
+
+# Admission control (src/mysite/admission.py). Requests to the routes below
+# are shed with a 503 and Retry-After while their priority's thresholds are
+# exceeded; other routes are not controlled. Keys are URL names, optionally
+# prefixed with the method. Decisions are counted in admission_decisions_total.
+ADMISSION_CONTROL_ENABLED = (
+    os.environ.get("ADMISSION_CONTROL_ENABLED", "True") == "True"
+)
+ADMISSION_ROUTE_PRIORITIES = {
+    "POST api-1.0.0:create_signature": "low",
+    "GET api-1.0.0:list_petitions": "normal",
+    "GET api-1.0.0:get_petition": "normal",
+    "GET api-1.0.0:search": "normal",
+    # One row, embedded on partner sites and mostly answered by the CDN
+    "GET api-1.0.0:petition_widget": "high",
+    # Wagtail pages, answered from the page cache when possible
+    "src.cms.views.serve": "high",
+}
+ADMISSION_LIMITS = {
+    "low": {
+        "max_in_flight": 40,
+        "max_db_latency_ms": 50,
+        "max_broker_latency_ms": 200,
+    },
+    "normal": {"max_in_flight": 80, "max_db_latency_ms": 200},
+    "high": {"max_in_flight": 160},
+}
+ADMISSION_RETRY_AFTER = 5
+# The shared in-flight counter expires this long after the last admitted
+# request, so counts leaked by killed workers do not accumulate
+ADMISSION_IN_FLIGHT_TTL = 60
+
+# Sliding-window rate limits (src/api/throttling.py), per scope and rule:
+# at most "limit" requests per "window" seconds for each value of the rule's
+# key. Counted in Redis with one Lua call per request; without REDIS_URL, or
+# while Redis is down, each process counts on its own. Rejections are
+# counted in rate_limit_decisions_total.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "True") == "True"
+RATE_LIMIT_REDIS_URL = os.environ.get("REDIS_URL", "")
+# Header the reverse proxy appends the client address to, e.g.
+# "X-Forwarded-For"; REMOTE_ADDR is used when empty
+RATE_LIMIT_CLIENT_IP_HEADER = os.environ.get("RATE_LIMIT_CLIENT_IP_HEADER", "")
+RATE_LIMITS = {
+    "signatures": {
+        "ip": {"limit": 20, "window": 60},
+        "petition": {"limit": 1200, "window": 60},
+        "email": {"limit": 3, "window": 60 * 60},
+    },
+}
+
+# Idempotency-Key support on create endpoints (src/api/idempotency.py). The
+# first response per key is kept in the default cache this long and replayed
+# to retries; retries while it is still running get a 409 straight away.
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+# Prometheus metrics, scraped from /metrics on web processes. Celery workers
+# write to PROMETHEUS_MULTIPROC_DIR (also needed with several gunicorn
+# workers) and are scraped through the metrics_exporter command.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+# Scrapes must send "Authorization: Bearer <token>"; without a token /metrics
+# is only served with DEBUG on
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Broker queues whose depth the exporter reports
+METRICS_QUEUES = ["celery"]
+
+# OpenTelemetry tracing of requests, queries, Celery publish/run and SMTP.
+# Spans go to stdout ("console") or are appended as JSON lines to
+# TRACING_FILE ("file"); no collector is needed.
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "False") == "True"
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "console")
+TRACING_FILE = os.environ.get("TRACING_FILE", os.path.join(BASE_DIR, "traces.jsonl"))
+TRACING_SERVICE_NAME = os.environ.get("TRACING_SERVICE_NAME", "habitat")
+
+# Sampled call-stack profiling (src/observability/profiling.py). A fraction
+# of requests and Celery tasks is profiled; a single request can also be
+# profiled on demand by sending PROFILING_HEADER with PROFILING_HEADER_TOKEN.
+# Profiles are browsable under "Profile żądań" in the Wagtail admin; only the
+# newest PROFILING_MAX_STORED are kept. With both rates at 0 and no token the
+# middleware is removed from the stack and tasks only do one settings check.
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_TASK_SAMPLE_RATE = float(os.environ.get("PROFILING_TASK_SAMPLE_RATE", "0"))
+PROFILING_HEADER = "X-Profile"
+PROFILING_HEADER_TOKEN = os.environ.get("PROFILING_HEADER_TOKEN", "")
+PROFILING_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", "0.005"))
+PROFILING_MAX_STORED = int(os.environ.get("PROFILING_MAX_STORED", "200"))
+
+# Query instrumentation (src/observability). Every request and Celery task
+# has its queries counted and timed and checked against a budget, keyed by
+# URL name ("api-1.0.0:create_signature", "wagtailadmin_home") or by
+# "task:<task name>". Entries are merged over "default". max_duplicates is
+# how often one statement may repeat before it is reported as a likely N+1.
+# Ninja names each path after its first operation, so "get_petition" also
+# covers PUT/DELETE and "create_signature" also covers listing signatures.
+QUERY_INSTRUMENTATION_ENABLED = (
+    os.environ.get("QUERY_INSTRUMENTATION_ENABLED", "True") == "True"
+)
+QUERY_INSTRUMENTATION_HEADERS = DEBUG
+# "log" to warn, "raise" to fail the request (useful in development and CI)
+QUERY_BUDGET_ACTION = os.environ.get("QUERY_BUDGET_ACTION", "log")
+QUERY_BUDGETS = {
+    "default": {"max_queries": 50, "max_duplicates": 10},
+    "api-1.0.0:list_petitions": {"max_queries": 2},
+    "api-1.0.0:get_petition": {"max_queries": 3},
+    "api-1.0.0:create_signature": {"max_queries": 8, "max_duplicates": 1},
+    "task:src.tasks.tasks.send_petition_confirmation_email": {"max_queries": 2},
+}
+
 ROOT_URLCONF = "src.mysite.urls"
 
 TEMPLATES = [
@@ -101,6 +221,9 @@ TEMPLATES = [
     },
 ]
 
+# Compiled before gunicorn forks its workers (src/mysite/warmup.py)
+WARMUP_TEMPLATES = ["base.html", "cms/petition_page.html"]
+
 WSGI_APPLICATION = "src.mysite.wsgi.application"
 
 HEADLESS_PREVIEW_CLIENT_URLS = {
@@ -172,19 +295,128 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache (Redis when available, in-process memory otherwise, e.g. for tests)
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+# Rendered PetitionPage HTML is cached until the page or its petition changes
+PETITION_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+# The signature count fragment is cached separately and refreshed this often
+SIGNATURE_COUNT_CACHE_TIMEOUT = 15
+
+# Static snapshots of published petition pages (HTML, headless JSON and a
+# count.json per petition). Serve SNAPSHOT_ROOT from the CDN at SNAPSHOT_URL,
+# or set SNAPSHOT_SERVE to let src.cms.middleware.SnapshotMiddleware serve it
+# in front of Django.
+SNAPSHOT_ROOT = os.environ.get("SNAPSHOT_ROOT", os.path.join(BASE_DIR, "snapshots"))
+SNAPSHOT_URL = os.environ.get("SNAPSHOT_URL", "/")
+SNAPSHOT_SERVE = os.environ.get("SNAPSHOT_SERVE", "False") == "True"
+# How often the count.json fragments are refreshed, in seconds
+SNAPSHOT_COUNT_REFRESH_INTERVAL = 30
+# On-demand revalidation webhook of the Next.js frontend (disabled when empty)
+NEXTJS_REVALIDATE_URL = os.environ.get("NEXTJS_REVALIDATE_URL", "")
+NEXTJS_REVALIDATE_TOKEN = os.environ.get("NEXTJS_REVALIDATE_TOKEN", "")
+NEXTJS_REVALIDATE_TIMEOUT = 5
+
+# HTTP caching of public petition reads (src/api/caching.py). Widget and list
+# responses are tagged with surrogate keys in SURROGATE_KEY_HEADER ("Cache-Tag"
+# on Cloudflare), purged through CDN_PURGE_URL when a petition is edited or
+# deleted (disabled when empty). New signatures are picked up as the cached
+# responses expire.
+PETITION_LIST_CACHE_CONTROL = {"public": True, "max_age": 10}
+PETITION_WIDGET_CACHE_CONTROL = {
+    "public": True,
+    "max_age": 30,
+    "stale_while_revalidate": 300,
+    "stale_if_error": 60 * 60 * 24,
+}
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+CDN_PURGE_URL = os.environ.get("CDN_PURGE_URL", "")
+CDN_PURGE_TOKEN = os.environ.get("CDN_PURGE_TOKEN", "")
+CDN_PURGE_TIMEOUT = 5
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-snapshot-counts": {
+        "task": "src.tasks.tasks.refresh_snapshot_counts",
+        "schedule": SNAPSHOT_COUNT_REFRESH_INTERVAL,
+    },
+}
+
+# Percentages of a petition's target recorded as milestones when crossed, and
+# the Celery tasks called with the id of every new PetitionMilestone
+PETITION_MILESTONES = (25, 50, 75, 100)
+PETITION_MILESTONE_SUBSCRIBERS = [
+    "src.tasks.tasks.notify_staff_of_milestone",
+    "src.tasks.tasks.refresh_petition_after_milestone",
+]
+
 # Email settings
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"  # For development
+# Console backend for development. In production set EMAIL_BACKEND to
+# "src.tasks.backends.PooledSMTPEmailBackend" so workers reuse SMTP connections.
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
 DEFAULT_FROM_EMAIL = "petitions@example.com"
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "False") == "True"
+EMAIL_TIMEOUT = 10
+# Persistent SMTP connections kept by each worker process
+EMAIL_POOL_SIZE = int(os.environ.get("EMAIL_POOL_SIZE", 8))
+# Idle connections older than this (seconds) are checked with NOOP before reuse
+EMAIL_POOL_HEALTH_CHECK_INTERVAL = 30
 
 # Wagtail settings
 WAGTAIL_SITE_NAME = "Habitat"
 
+# Wagtail search. On Postgres the database backend uses full-text search with
+# ranking. "simple" avoids English stemming of our Polish content.
+WAGTAILSEARCH_BACKENDS = {
+    "default": {
+        "BACKEND": "wagtail.search.backends.database",
+        "SEARCH_CONFIG": "simple",
+    }
+}
+# Public page search gives up after this many milliseconds
+PAGE_SEARCH_TIMEOUT_MS = 300
+
+# Image renditions generated by Celery when an image is uploaded or a page
+# using it is published, so visitors never wait for Pillow. Keep this in sync
+# with the {% image %} filters in templates and the renditions the API serves
+# (max-165x165 and max-800x600 are used by the Wagtail admin).
+WAGTAIL_PREGENERATED_RENDITIONS = ["max-165x165", "max-800x600", "width-500"]
+# How long an (image, filter) pair is considered in flight, in seconds
+RENDITION_LOCK_TIMEOUT = 300
+
 # Base URL to serve media files uploaded by users
 MEDIA_URL = "/media/"
 
 # Path where media is stored
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Background signature exports, import uploads and import reports. Kept outside
+# MEDIA_ROOT: they are only served through the staff-only
+# petitions_download_export admin view.
+EXPORTS_ROOT = os.environ.get("EXPORTS_ROOT", os.path.join(BASE_DIR, "exports"))
+
+# Public URL of the Wagtail admin, for links in emails. Export and import tasks
+# link to the site they were requested on and only fall back to this, since
+# Celery workers usually run without it set
+WAGTAILADMIN_BASE_URL = os.environ.get(
+    "WAGTAILADMIN_BASE_URL", "http://localhost:8000"
+)
+
 # Wagtail Headless Preview configuration
 WAGTAIL_HEADLESS_PREVIEW = {
     "CLIENT_URLS": {
@@ -193,3 +425,11 @@ WAGTAIL_HEADLESS_PREVIEW = {
     "SERVER_URL": None, # Optional: If your Wagtail admin is not on the same domain
     "REDIRECT_ON_PREVIEW": False, # Keep False for headless
 }
+
+# Admin listings switch from COUNT(*) to planner estimates above this many rows
+ADMIN_EXACT_COUNT_THRESHOLD = 10000
+
+# Phone number normalization (E.164). Numbers with at most this many digits
+# and no international prefix are treated as national numbers.
+PHONE_DEFAULT_COUNTRY_CODE = "48"
+PHONE_NATIONAL_NUMBER_LENGTH = 9
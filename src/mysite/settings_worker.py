@@ -0,0 +1,49 @@
+"""
+Settings for Celery workers.
+
+The full web settings minus what only serves HTTP: the Django and Wagtail
+admin UIs, modeladmin, headless preview, form pages, redirects, static file
+handling, the beat scheduler models, middleware and the Ninja API URLs.
+Tasks still render PetitionPages and their Wagtail API JSON (snapshots), so
+Wagtail core, images, documents, embeds, snippets, search and the Wagtail
+API stay installed; src/mysite/urls_worker.py routes just those.
+
+Used by default by src/tasks/celery.py. Celery beat needs the
+django_celery_beat models and runs with src.mysite.settings.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, TEMPLATES
+
+# Apps that only back HTTP views, admin screens or the beat scheduler
+WEB_ONLY_APPS = [
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "wagtail.contrib.forms",
+    "wagtail.contrib.redirects",
+    "wagtail_headless_preview",
+    "wagtail_modeladmin",
+    "django_celery_beat",
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+
+# Workers serve no requests
+MIDDLEWARE = []
+
+ROOT_URLCONF = "src.mysite.urls_worker"
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                processor
+                for processor in TEMPLATES[0]["OPTIONS"]["context_processors"]
+                if processor != "django.contrib.messages.context_processors.messages"
+            ],
+        },
+    }
+]
@@ -17,11 +17,13 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from wagtail import urls as wagtail_urls
 from wagtail.admin import urls as wagtailadmin_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
+from src.cms import views as cms_views
+from src.observability import views as observability_views
 from src.api.api import api  # Existing Django Ninja API
 from src.mysite.api import api_router  # Import the router from our project's api.py
 
@@ -31,6 +33,7 @@ urlpatterns = [
     path("documents/", include(wagtaildocs_urls)),
     path("api/", api.urls),  # Existing Django Ninja API
     path("api/v2/", api_router.urls), # Use the imported api_router
+    path("metrics", observability_views.metrics, name="metrics"),
 ] 
 
 if settings.DEBUG:
@@ -41,6 +44,8 @@ if settings.DEBUG:
 urlpatterns = urlpatterns + [
     # For anything not caught by a more specific rule above, hand over to
     # Wagtail's page serving mechanism. This should be the last pattern.
+    # Cached PetitionPages are answered before Wagtail routes the request.
+    re_path(r"^(?!_util/)((?:[\w\-]+/)*)$", cms_views.serve),
     path("", include(wagtail_urls)),
     # Alternatively, if you want Wagtail pages to be served from a subpath
     # of your site, rather than the site root:
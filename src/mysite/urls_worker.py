@@ -0,0 +1,23 @@
+"""
+URL configuration for Celery workers.
+
+Only what tasks reverse or resolve: the Wagtail API (snapshots render its
+page detail JSON), Wagtail page serving and the export download linked from
+export emails, at the same path as in the web URL conf.
+"""
+
+from django.urls import include, path
+from wagtail import urls as wagtail_urls
+
+from src.mysite.api import api_router
+from src.petitions.exports import download_export
+
+urlpatterns = [
+    path("api/v2/", api_router.urls),
+    path(
+        "admin/petitions/exports/<str:name>",
+        download_export,
+        name="petitions_download_export",
+    ),
+    path("", include(wagtail_urls)),
+]
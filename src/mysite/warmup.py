@@ -0,0 +1,91 @@
+"""
+Do the work every web process repeats on its first requests, ahead of time.
+
+With gunicorn's ``preload_app`` (see src/mysite/gunicorn_conf.py) this runs
+once in the master before it forks, so the workers share the loaded modules,
+compiled URL patterns, templates and schemas copy-on-write instead of each
+building their own.
+"""
+
+import gc
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_url_resolvers():
+    """Import every URL conf and compile the reverse lookup tables."""
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    # Populating the reverse dicts walks and compiles every pattern, including
+    # Wagtail's admin, the Wagtail API router and the Ninja API
+    resolver.reverse_dict
+    for namespace in resolver.namespace_dict:
+        resolver.namespace_dict[namespace][1].reverse_dict
+
+
+def warm_api_schemas():
+    """
+    Build the Ninja OpenAPI schema once.
+
+    The endpoint models are created when src/api/api.py is imported; this
+    also loads pydantic's JSON schema generation, which is otherwise imported
+    on the first /api/openapi.json or /api/docs request.
+    """
+    from src.api.api import api
+
+    api.get_openapi_schema()
+
+
+def warm_templates():
+    """Compile WARMUP_TEMPLATES into the cached template loader."""
+    from django.template.loader import get_template
+
+    for name in settings.WARMUP_TEMPLATES:
+        get_template(name)
+
+
+def warm_wagtail():
+    """Import every wagtail_hooks module and build the rich text features."""
+    from wagtail import hooks
+    from wagtail.rich_text import features
+
+    hooks.search_for_hooks()
+    features.get_default_features()
+
+
+def warm_up(freeze=False):
+    """
+    Run every warm-up step and return how long each took, in seconds.
+
+    Connections opened on the way are closed so forked workers never share a
+    socket. With ``freeze`` the objects created so far are moved out of the
+    garbage collector's reach, so collections in the workers do not touch
+    (and copy) the pages they live on.
+    """
+    timings = {}
+    for step in (warm_url_resolvers, warm_api_schemas, warm_templates, warm_wagtail):
+        start = time.perf_counter()
+        step()
+        timings[step.__name__] = time.perf_counter() - start
+
+    connections.close_all()
+    caches.close_all()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    logger.info(
+        "Warm-up done: %s",
+        ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items()
+        ),
+    )
+    return timings
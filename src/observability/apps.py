@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class ObservabilityConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "src.observability"
+
+    def ready(self):
+        from django.conf import settings
+
+        from src.observability import signals  # noqa: F401
+
+        if settings.TRACING_ENABLED:
+            from src.observability.tracing import configure_tracing
+
+            configure_tracing()
@@ -0,0 +1,35 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from prometheus_client import start_http_server
+
+from src.observability.metrics import build_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the metrics Celery workers write to PROMETHEUS_MULTIPROC_DIR, "
+        "plus broker queue depth, for Prometheus to scrape. Run it as a "
+        "sidecar next to the workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--addr", default="0.0.0.0")
+        parser.add_argument("--port", type=int, default=9808)
+
+    def handle(self, *args, **options):
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            raise CommandError(
+                "Set PROMETHEUS_MULTIPROC_DIR to the directory the workers share"
+            )
+        start_http_server(
+            options["port"],
+            addr=options["addr"],
+            registry=build_registry(include_queue_depth=True),
+        )
+        self.stdout.write(
+            f"Serving worker metrics on {options['addr']}:{options['port']}"
+        )
+        while True:
+            time.sleep(3600)
@@ -0,0 +1,142 @@
+"""
+Prometheus metrics for web and worker processes.
+
+Web processes expose them on /metrics. Celery worker children write them
+to PROMETHEUS_MULTIPROC_DIR and the ``metrics_exporter`` sidecar serves the
+aggregate. Updating a metric is an in-memory increment (or an mmap write in
+multiprocess mode), cheap enough for the signature hot path.
+"""
+
+import os
+
+from django.conf import settings
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ["route", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries per request by route",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf")),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request by route",
+    ["route"],
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a task and a worker starting it",
+    ["task"],
+)
+TASK_RUNTIME = Histogram(
+    "celery_task_runtime_seconds",
+    "Task execution time",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf")),
+)
+SIGNATURES_INGESTED = Counter(
+    "petition_signatures_ingested_total",
+    # Per-petition totals are Petition.signature_count; a petition label
+    # would add series for every petition ever created
+    "Signatures stored, by source",
+    ["source"],
+)
+EMAILS_SENT = Counter(
+    "confirmation_emails_total",
+    "Confirmation emails by result",
+    ["result"],
+)
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Requests admitted or shed by admission control",
+    ["route", "priority", "decision", "reason"],
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Requests allowed or rejected by rate limiting, by scope and rule",
+    ["scope", "decision", "rule"],
+)
+
+
+def record_signatures(count=1, source="api"):
+    if count:
+        SIGNATURES_INGESTED.labels(source=source).inc(count)
+
+
+def record_emails(sent=0, failed=0):
+    if sent:
+        EMAILS_SENT.labels(result="success").inc(sent)
+    if failed:
+        EMAILS_SENT.labels(result="failure").inc(failed)
+
+
+class QueueDepthCollector:
+    """Report the number of messages waiting in each Celery queue on Redis."""
+
+    def __init__(self, broker_url, queues):
+        self.broker_url = broker_url
+        self.queues = queues
+
+    def collect(self):
+        import redis
+
+        gauge = GaugeMetricFamily(
+            "celery_queue_depth", "Messages waiting in the broker", labels=["queue"]
+        )
+        try:
+            client = redis.Redis.from_url(self.broker_url, socket_timeout=1)
+            for queue in self.queues:
+                gauge.add_metric([queue], client.llen(queue))
+        except redis.RedisError:
+            return
+        yield gauge
+
+
+def build_registry(include_queue_depth=False):
+    """
+    Return the registry to scrape.
+
+    In multiprocess mode (PROMETHEUS_MULTIPROC_DIR set) the values written by
+    all processes are aggregated; otherwise this process' metrics are used.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY
+
+        if not include_queue_depth:
+            return REGISTRY
+        registry = CollectorRegistry()
+        registry.register(_ProcessMetrics(REGISTRY))
+    if include_queue_depth:
+        registry.register(
+            QueueDepthCollector(settings.CELERY_BROKER_URL, settings.METRICS_QUEUES)
+        )
+    return registry
+
+
+class _ProcessMetrics:
+    """Expose another registry's metrics through a new registry."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def collect(self):
+        return self.registry.collect()
+
+
+def render_metrics(include_queue_depth=False):
+    return generate_latest(build_registry(include_queue_depth))
@@ -0,0 +1,158 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from src.observability.queries import enforce_budget, track_queries
+
+
+def route_name(request):
+    """The URL name of the matched route, e.g. ``api-1.0.0:get_petition``."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match.route
+
+
+class QueryBudgetMiddleware:
+    """
+    Count and time the queries of each request and check the route's budget.
+
+    The stats are attached to the response as ``query_stats`` (tests use
+    them) and, with QUERY_INSTRUMENTATION_HEADERS, reported in a
+    ``Server-Timing`` header.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_queries() as stats:
+            response = self.get_response(request)
+
+        route = route_name(request)
+        response.query_stats = stats
+        response.query_route = route
+        if settings.QUERY_INSTRUMENTATION_HEADERS:
+            response["Server-Timing"] = (
+                f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'
+            )
+        enforce_budget(route, stats)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and per-request query metrics by route.
+
+    Sits outside QueryBudgetMiddleware and reuses the query stats it
+    attaches to the response.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        from src.observability import metrics
+
+        self.metrics = metrics
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        route = route_name(request)
+        self.metrics.REQUEST_LATENCY.labels(
+            route=route, method=request.method, status=response.status_code
+        ).observe(duration)
+        stats = getattr(response, "query_stats", None)
+        if stats is not None:
+            self.metrics.REQUEST_DB_QUERIES.labels(route=route).observe(stats.count)
+            self.metrics.REQUEST_DB_DURATION.labels(route=route).observe(stats.duration)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile sampled or explicitly requested requests and store the result.
+
+    Sits outside QueryBudgetMiddleware so the stored profile can reuse its
+    query stats. Removed from the stack when profiling is switched off.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.PROFILING_SAMPLE_RATE or settings.PROFILING_HEADER_TOKEN):
+            raise MiddlewareNotUsed
+        from src.observability import profiling
+
+        self.profiling = profiling
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = self.profiling.should_profile_request(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = self.profiling.SamplingProfiler(settings.PROFILING_INTERVAL)
+        start = time.perf_counter()
+        with track_queries() as own_stats:
+            profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+        duration = time.perf_counter() - start
+
+        stats = getattr(response, "query_stats", None) or own_stats
+        profile = self.profiling.store_profile(
+            profiler,
+            kind="request",
+            trigger=trigger,
+            route=route_name(request),
+            method=request.method,
+            path=request.get_full_path()[:2048],
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            query_count=stats.count,
+            query_duration_ms=stats.duration_ms,
+        )
+        if trigger == "header":
+            response["X-Profile-Id"] = str(profile.pk)
+        return response
+
+
+class TracingMiddleware:
+    """Wrap each request in a server span, continuing an incoming trace."""
+
+    def __init__(self, get_response):
+        if not settings.TRACING_ENABLED:
+            raise MiddlewareNotUsed
+        from opentelemetry import propagate, trace
+
+        from src.observability.tracing import get_tracer
+
+        self.propagate = propagate
+        self.trace = trace
+        self.get_tracer = get_tracer
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # HttpHeaders looks names up case-insensitively, a plain dict would not
+        ctx = self.propagate.extract(request.headers)
+        with self.get_tracer().start_as_current_span(
+            request.method,
+            context=ctx,
+            kind=self.trace.SpanKind.SERVER,
+            attributes={"http.method": request.method, "http.target": request.path},
+        ) as span:
+            response = self.get_response(request)
+            route = route_name(request)
+            span.update_name(f"{request.method} {route}")
+            span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status(self.trace.Status(self.trace.StatusCode.ERROR))
+        return response
@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("request", "Żądanie HTTP"),
+                            ("task", "Zadanie Celery"),
+                        ],
+                        default="request",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("sampled", "Losowa próbka"),
+                            ("header", "Nagłówek"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("route", models.CharField(db_index=True, max_length=255)),
+                ("method", models.CharField(blank=True, max_length=10)),
+                ("path", models.CharField(blank=True, max_length=2048)),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("duration_ms", models.FloatField()),
+                ("query_count", models.PositiveIntegerField(default=0)),
+                ("query_duration_ms", models.FloatField(default=0)),
+                ("sample_count", models.PositiveIntegerField(default=0)),
+                ("sample_interval_ms", models.FloatField()),
+                (
+                    "top_functions",
+                    models.TextField(
+                        blank=True, help_text="Samples (total, self) per function"
+                    ),
+                ),
+                (
+                    "stacks",
+                    models.TextField(
+                        blank=True,
+                        help_text="Collapsed stacks, readable by flame graph tools",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Profil żądania",
+                "verbose_name_plural": "Profile żądań",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
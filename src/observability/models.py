@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """A sampled call-stack profile of one request or Celery task."""
+
+    KIND_CHOICES = [
+        ("request", "Żądanie HTTP"),
+        ("task", "Zadanie Celery"),
+    ]
+    TRIGGER_CHOICES = [
+        ("sampled", "Losowa próbka"),
+        ("header", "Nagłówek"),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default="request")
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    route = models.CharField(max_length=255, db_index=True)
+    method = models.CharField(max_length=10, blank=True)
+    path = models.CharField(max_length=2048, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    query_duration_ms = models.FloatField(default=0)
+    sample_count = models.PositiveIntegerField(default=0)
+    sample_interval_ms = models.FloatField()
+    top_functions = models.TextField(
+        blank=True, help_text="Samples (total, self) per function"
+    )
+    stacks = models.TextField(
+        blank=True, help_text="Collapsed stacks, readable by flame graph tools"
+    )
+
+    def __str__(self):
+        return f"{self.route} ({self.duration_ms:.0f} ms)"
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Profil żądania"
+        verbose_name_plural = "Profile żądań"
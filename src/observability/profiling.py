@@ -0,0 +1,138 @@
+import os
+import random
+import sys
+import sysconfig
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+_PATH_PREFIXES = sorted(
+    {
+        sysconfig.get_paths()["purelib"] + os.sep,
+        sysconfig.get_paths()["stdlib"] + os.sep,
+        str(settings.BASE_DIR) + os.sep,
+    },
+    key=len,
+    reverse=True,
+)
+
+
+def _short_filename(filename):
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix) :]
+    return filename
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread, built on ``sys._current_frames``.
+
+    A background thread captures the target thread's call stack every
+    ``interval`` seconds. Stacks are kept in collapsed form
+    (``outer;inner;leaf count``), which flame graph tools read directly.
+    The profiled code is never instrumented, so the cost is the sampling
+    thread's work, independent of how many calls the request makes.
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._sampler.join()
+        return self
+
+    def _run(self):
+        own_frame_codes = {SamplingProfiler._run.__code__}
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                if code not in own_frame_codes:
+                    stack.append(
+                        f"{code.co_name} ({_short_filename(code.co_filename)}:"
+                        f"{code.co_firstlineno})"
+                    )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def sample_count(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        )
+
+    def top_functions(self, limit=25):
+        """``[(function, self samples, total samples)]``, by total samples."""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+        return [
+            (function, own[function], samples)
+            for function, samples in total.most_common(limit)
+        ]
+
+
+def should_profile_request(request):
+    """
+    Return the trigger for profiling ``request``, or None.
+
+    A request is profiled when it carries PROFILING_HEADER with the
+    PROFILING_HEADER_TOKEN value, or at random at PROFILING_SAMPLE_RATE.
+    """
+    token = settings.PROFILING_HEADER_TOKEN
+    if token:
+        value = request.headers.get(settings.PROFILING_HEADER)
+        if value is not None and constant_time_compare(value, token):
+            return "header"
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sampled"
+    return None
+
+
+def store_profile(profiler, **fields):
+    """Save a profile and trim the store to PROFILING_MAX_STORED entries."""
+    from src.observability.models import RequestProfile
+
+    report = "\n".join(
+        f"{samples:>6} {own:>6}  {function}"
+        for function, own, samples in profiler.top_functions()
+    )
+    profile = RequestProfile.objects.create(
+        sample_count=profiler.sample_count,
+        sample_interval_ms=profiler.interval * 1000,
+        top_functions=report,
+        stacks=profiler.collapsed(),
+        **fields,
+    )
+    stale = RequestProfile.objects.order_by("-created_at", "-id").values_list(
+        "id", flat=True
+    )[settings.PROFILING_MAX_STORED :]
+    RequestProfile.objects.filter(id__in=list(stale)).delete()
+    return profile
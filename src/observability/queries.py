@@ -0,0 +1,114 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when QUERY_BUDGET_ACTION is "raise" and a budget is exceeded."""
+
+
+class QueryStats:
+    """
+    Count, time and group the queries run while it is installed.
+
+    Queries are grouped by their SQL with placeholders (parameters are passed
+    separately), so the same statement run for every row of a loop shows up
+    as one entry with a high count: the signature of an N+1.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self._installed = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def start(self):
+        """Install on every database connection of the current thread."""
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+            self._installed.append(connection)
+        return self
+
+    def stop(self):
+        for connection in self._installed:
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+        self._installed = []
+        return self
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    @property
+    def duplicates(self):
+        """``[(sql, count)]`` of statements run more than once, worst first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > 1]
+
+    def violations(self, budget):
+        """Describe every way these stats exceed ``budget``."""
+        problems = []
+        max_queries = budget.get("max_queries")
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries (budget {max_queries})")
+        max_duplicates = budget.get("max_duplicates")
+        if max_duplicates is not None:
+            for sql, n in self.duplicates:
+                if n - 1 > max_duplicates:
+                    problems.append(
+                        f"possible N+1: ran {n} times (budget {max_duplicates} "
+                        f"repeats): {sql[:300]}"
+                    )
+        max_duration_ms = budget.get("max_duration_ms")
+        if max_duration_ms is not None and self.duration_ms > max_duration_ms:
+            problems.append(
+                f"{self.duration_ms:.1f}ms in queries (budget {max_duration_ms}ms)"
+            )
+        return problems
+
+
+@contextmanager
+def track_queries():
+    stats = QueryStats().start()
+    try:
+        yield stats
+    finally:
+        stats.stop()
+
+
+def get_budget(key):
+    """
+    Return the budget for a route or task name.
+
+    Route keys are URL names such as ``api-1.0.0:create_signature``; task
+    keys are ``task:<task name>``. Budgets are merged over
+    ``QUERY_BUDGETS["default"]``.
+    """
+    budgets = settings.QUERY_BUDGETS
+    return {**budgets.get("default", {}), **budgets.get(key, {})}
+
+
+def enforce_budget(key, stats):
+    """Log or raise, per QUERY_BUDGET_ACTION, when ``stats`` exceed the budget."""
+    problems = stats.violations(get_budget(key))
+    if not problems:
+        return
+    message = f"Query budget exceeded for {key}: " + "; ".join(problems)
+    if settings.QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
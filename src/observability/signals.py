@@ -0,0 +1,192 @@
+import time
+
+from celery.signals import (
+    after_task_publish,
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+)
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from src.observability.queries import QueryStats, enforce_budget
+
+# Stats of the tasks running in this worker, by task id
+_task_stats = {}
+
+
+@task_prerun.connect
+def start_task_query_tracking(task_id, task, **kwargs):
+    if settings.QUERY_INSTRUMENTATION_ENABLED:
+        _task_stats[task_id] = QueryStats().start()
+
+
+@task_postrun.connect
+def check_task_query_budget(task_id, task, **kwargs):
+    stats = _task_stats.pop(task_id, None)
+    if stats is None:
+        return
+    stats.stop()
+    enforce_budget(f"task:{task.name}", stats)
+
+
+# Start times of the tasks running in this worker, by task id
+_task_started = {}
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if settings.METRICS_ENABLED and headers is not None:
+        headers["published_at"] = time.time()
+
+
+@task_prerun.connect
+def record_task_queue_wait(task_id, task, **kwargs):
+    if not settings.METRICS_ENABLED:
+        return
+    from src.observability import metrics
+
+    started = time.time()
+    _task_started[task_id] = started
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        published_at = (task.request.headers or {}).get("published_at")
+    if published_at is not None:
+        metrics.TASK_QUEUE_WAIT.labels(task=task.name).observe(
+            max(started - published_at, 0)
+        )
+
+
+@task_postrun.connect
+def record_task_runtime(task_id, task, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    from src.observability import metrics
+
+    metrics.TASK_RUNTIME.labels(task=task.name, state=state or "UNKNOWN").observe(
+        time.time() - started
+    )
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    """Drop a finished worker child's live gauges from the multiprocess files."""
+    import os
+
+    if settings.METRICS_ENABLED and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+# Open publish spans by task id, and run spans with their context tokens
+_publish_spans = {}
+_run_spans = {}
+
+
+@receiver(connection_created)
+def install_query_tracing(sender, connection, **kwargs):
+    from src.observability.tracing import trace_query
+
+    if settings.TRACING_ENABLED and trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_query)
+
+
+@before_task_publish.connect
+def start_publish_span(sender=None, headers=None, **kwargs):
+    if not settings.TRACING_ENABLED or headers is None:
+        return
+    from opentelemetry import trace
+
+    from src.observability.tracing import get_tracer, inject_headers
+
+    span = get_tracer().start_span(
+        f"celery.publish {sender}",
+        kind=trace.SpanKind.PRODUCER,
+        attributes={"messaging.system": "celery", "celery.task_name": sender},
+    )
+    # The worker's span becomes a child of the publish span
+    inject_headers(headers, span)
+    _publish_spans[headers.get("id")] = span
+
+
+@after_task_publish.connect
+def end_publish_span(headers=None, **kwargs):
+    span = _publish_spans.pop((headers or {}).get("id"), None)
+    if span is not None:
+        span.end()
+
+
+@task_prerun.connect
+def start_task_span(task_id, task, **kwargs):
+    if not settings.TRACING_ENABLED:
+        return
+    from opentelemetry import trace
+
+    from src.observability.tracing import attach, extract_task_context, get_tracer
+
+    span = get_tracer().start_span(
+        f"celery.run {task.name}",
+        context=extract_task_context(task.request),
+        kind=trace.SpanKind.CONSUMER,
+        attributes={"celery.task_name": task.name, "celery.task_id": task_id},
+    )
+    _run_spans[task_id] = (span, attach(trace.set_span_in_context(span)))
+
+
+@task_postrun.connect
+def end_task_span(task_id, task, state=None, **kwargs):
+    entry = _run_spans.pop(task_id, None)
+    if entry is None:
+        return
+    from src.observability.tracing import detach
+
+    span, token = entry
+    span.set_attribute("celery.state", state or "UNKNOWN")
+    span.end()
+    detach(token)
+
+
+# Profilers of the sampled tasks running in this worker, by task id
+_task_profiles = {}
+
+
+@task_prerun.connect
+def start_task_profile(task_id, task, **kwargs):
+    rate = settings.PROFILING_TASK_SAMPLE_RATE
+    if not rate:
+        return
+    import random
+
+    if random.random() >= rate:
+        return
+    from src.observability.profiling import SamplingProfiler
+
+    stats = QueryStats().start()
+    profiler = SamplingProfiler(settings.PROFILING_INTERVAL).start()
+    _task_profiles[task_id] = (profiler, stats, time.perf_counter())
+
+
+@task_postrun.connect
+def store_task_profile(task_id, task, state=None, **kwargs):
+    entry = _task_profiles.pop(task_id, None)
+    if entry is None:
+        return
+    from src.observability.profiling import store_profile
+
+    profiler, stats, started = entry
+    profiler.stop()
+    stats.stop()
+    store_profile(
+        profiler,
+        kind="task",
+        trigger="sampled",
+        route=f"task:{task.name}",
+        status_code=None,
+        duration_ms=(time.perf_counter() - started) * 1000,
+        query_count=stats.count,
+        query_duration_ms=stats.duration_ms,
+    )
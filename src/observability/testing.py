@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+from src.observability.queries import get_budget, track_queries
+
+
+class QueryBudget:
+    """
+    Assert query budgets in tests.
+
+    Use it as a context manager with explicit limits::
+
+        with query_budget(max_queries=3, max_duplicates=0):
+            client.get("/api/petitions/")
+
+    or check a response against the budget configured for its route in
+    QUERY_BUDGETS::
+
+        query_budget.check(client.get("/api/petitions/"))
+    """
+
+    @contextmanager
+    def __call__(self, max_queries=None, max_duplicates=None, max_duration_ms=None):
+        budget = {
+            "max_queries": max_queries,
+            "max_duplicates": max_duplicates,
+            "max_duration_ms": max_duration_ms,
+        }
+        with track_queries() as stats:
+            yield stats
+        self._assert(stats, budget, "block")
+
+    def check(self, response, **overrides):
+        """Assert the request behind ``response`` stayed within its route budget."""
+        stats = response.query_stats
+        budget = {**get_budget(response.query_route), **overrides}
+        self._assert(stats, budget, response.query_route)
+        return stats
+
+    def _assert(self, stats, budget, label):
+        problems = stats.violations(budget)
+        if problems:
+            queries = "\n".join(
+                f"  {n}x {sql}" for sql, n in stats.statements.most_common()
+            )
+            raise AssertionError(
+                f"Query budget exceeded for {label}: "
+                + "; ".join(problems)
+                + f"\nQueries:\n{queries}"
+            )
@@ -0,0 +1,382 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from django.http import HttpResponse
+
+from src.petitions.models import PetitionSignature
+from src.tasks.tasks import send_petition_confirmation_email
+
+from .queries import QueryBudgetExceeded, track_queries
+
+
+@pytest.fixture
+def petition(petition, signatures):
+    """The shared petition with a few signatures"""
+    return petition
+
+
+@pytest.mark.django_db
+class TestQueryStats:
+    """Tests for query counting and N+1 detection"""
+
+    @pytest.mark.parametrize("signatures", [2, 5], indirect=True)
+    def test_repeated_statement_is_reported(self, signatures):
+        """Test a per-row lookup shows up as a duplicate statement"""
+        with track_queries() as stats:
+            for signature in PetitionSignature.objects.all():
+                str(signature)
+
+        assert stats.count == len(signatures) + 1
+        [(sql, repeats)] = stats.duplicates
+        assert repeats == len(signatures)
+        assert stats.violations({"max_duplicates": 1})
+
+    def test_select_related_stays_within_budget(self, petition, query_budget):
+        """Test the fixture passes when the loop is fixed"""
+        with query_budget(max_queries=1, max_duplicates=0):
+            for signature in PetitionSignature.objects.select_related("petition"):
+                str(signature)
+
+    def test_fixture_reports_the_queries(self, petition, query_budget):
+        """Test a blown budget fails with the offending SQL"""
+        with pytest.raises(AssertionError, match="possible N\\+1"):
+            with query_budget(max_duplicates=0):
+                for signature in PetitionSignature.objects.all():
+                    str(signature)
+
+
+@pytest.mark.django_db
+class TestRouteBudgets:
+    """Tests for per-route budgets of the Ninja endpoints and admin views"""
+
+    @pytest.mark.parametrize(
+        "method, path",
+        [
+            ("get", "/api/petitions/"),
+            ("get", "/api/petitions/{id}"),
+            ("get", "/api/petitions/{id}/signatures"),
+            ("get", "/api/pages/search?q=park"),
+        ],
+    )
+    def test_public_endpoints(self, client, petition, query_budget, method, path):
+        """Test public endpoints stay within their configured budgets"""
+        response = getattr(client, method)(path.format(id=petition.id))
+        assert response.status_code == 200
+        query_budget.check(response)
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_create_signature(self, delay, client, petition, query_budget):
+        """Test signing stays within its budget"""
+        response = client.post(
+            f"/api/petitions/{petition.id}/signatures",
+            {
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "phone_number": "+48123456789",
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.query_route == "api-1.0.0:create_signature"
+        query_budget.check(response)
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/admin/",
+            "/admin/petitions/petition/",
+            "/admin/petitions/petitionsignature/",
+        ],
+    )
+    def test_admin_views(self, admin_client, petition, query_budget, path):
+        """Test Wagtail admin views stay within the default budget"""
+        response = admin_client.get(path)
+        assert response.status_code == 200
+        query_budget.check(response)
+
+    def test_raise_mode(self, client, petition, settings):
+        """Test QUERY_BUDGET_ACTION=raise fails the request"""
+        settings.QUERY_BUDGET_ACTION = "raise"
+        settings.QUERY_BUDGETS = {"default": {"max_queries": 0}}
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/api/petitions/")
+
+    def test_server_timing_header(self, client, settings):
+        """Test query time is reported when headers are enabled"""
+        settings.QUERY_INSTRUMENTATION_HEADERS = True
+        response = client.get("/api/petitions/")
+        assert response["Server-Timing"].startswith("db;dur=")
+
+
+@pytest.mark.django_db
+class TestTaskBudgets:
+    """Tests for per-task query budgets"""
+
+    def test_task_over_budget_is_logged(self, petition, settings, caplog):
+        """Test Celery tasks are checked against task:<name> budgets"""
+        settings.QUERY_BUDGETS = {
+            "default": {},
+            "task:src.tasks.tasks.send_petition_confirmation_email": {"max_queries": 0},
+        }
+        signature = petition.signatures.first()
+        with caplog.at_level(logging.WARNING, logger="src.observability.queries"):
+            send_petition_confirmation_email.apply((signature.id,))
+        assert "task:src.tasks.tasks.send_petition_confirmation_email" in caplog.text
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Tests for the Prometheus metrics"""
+
+    def sample(self, name, **labels):
+        from prometheus_client import REGISTRY
+
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_scrape_endpoint(self, client, settings):
+        """Test request latency shows up per route"""
+        settings.METRICS_TOKEN = "secret"
+        client.get("/api/petitions/")
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert (
+            'http_request_duration_seconds_count{route="api-1.0.0:list_petitions",'
+            'method="GET",status="200"}' in body
+        )
+        assert "http_request_db_queries_bucket" in body
+
+    def test_scrape_token(self, client, settings):
+        """Test METRICS_TOKEN protects the endpoint"""
+        settings.METRICS_TOKEN = "secret"
+        assert client.get("/metrics").status_code == 403
+        response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+
+    def test_scrape_without_token_requires_debug(self, client, settings):
+        """Test /metrics isn't public when no METRICS_TOKEN is configured"""
+        settings.METRICS_TOKEN = ""
+        settings.DEBUG = False
+        assert client.get("/metrics").status_code == 403
+        settings.DEBUG = True
+        assert client.get("/metrics").status_code == 200
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_signature_ingest_rate(self, delay, client, petition):
+        """Test signing counts towards the ingest counter"""
+        labels = {"source": "api"}
+        before = self.sample("petition_signatures_ingested_total", **labels)
+        client.post(
+            f"/api/petitions/{petition.id}/signatures",
+            {
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "phone_number": "+48123456789",
+            },
+            content_type="application/json",
+        )
+        after = self.sample("petition_signatures_ingested_total", **labels)
+        assert after == before + 1
+
+    def test_email_results_and_task_runtime(self, petition):
+        """Test confirmation emails and task runtimes are recorded"""
+        task = "src.tasks.tasks.send_petition_confirmation_email"
+        sent_before = self.sample("confirmation_emails_total", result="success")
+        runs_before = self.sample(
+            "celery_task_runtime_seconds_count", task=task, state="SUCCESS"
+        )
+        send_petition_confirmation_email.apply((petition.signatures.first().id,))
+        assert self.sample("confirmation_emails_total", result="success") == (
+            sent_before + 1
+        )
+        assert self.sample(
+            "celery_task_runtime_seconds_count", task=task, state="SUCCESS"
+        ) == (runs_before + 1)
+
+
+@pytest.mark.django_db
+class TestTracing:
+    """Tests for end-to-end tracing"""
+
+    @pytest.fixture
+    def spans(self, settings):
+        """Collect finished spans in memory, tracing DB statements too"""
+        from django.db import connection
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter,
+        )
+
+        from .tracing import configure_tracing, trace_query
+
+        settings.TRACING_ENABLED = True
+        exporter = InMemorySpanExporter()
+        configure_tracing(SimpleSpanProcessor(exporter))
+        connection.execute_wrappers.append(trace_query)
+        yield exporter
+        connection.execute_wrappers.remove(trace_query)
+
+    def by_name(self, exporter):
+        return {span.name: span for span in exporter.get_finished_spans()}
+
+    @patch("src.tasks.tasks.send_petition_confirmation_email.delay")
+    def test_request_continues_incoming_trace(self, delay, client, petition, spans):
+        """Test the request span joins the caller's trace and wraps DB spans"""
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        client.post(
+            f"/api/petitions/{petition.id}/signatures",
+            {
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "phone_number": "+48123456789",
+            },
+            content_type="application/json",
+            HTTP_TRACEPARENT=f"00-{trace_id}-00f067aa0ba902b7-01",
+        )
+
+        finished = spans.get_finished_spans()
+        request_span = self.by_name(spans)["POST api-1.0.0:create_signature"]
+        assert format(request_span.context.trace_id, "032x") == trace_id
+        db_spans = [span for span in finished if span.name == "db.query"]
+        assert db_spans
+        assert all(
+            span.parent.span_id == request_span.context.span_id for span in db_spans
+        )
+
+    def test_incoming_trace_header_is_case_insensitive(self, rf, spans):
+        """Test the traceparent header is found whatever its capitalization"""
+        from opentelemetry import trace
+
+        from .middleware import TracingMiddleware
+
+        trace_ids = []
+
+        def view(request):
+            span = trace.get_current_span()
+            trace_ids.append(format(span.get_span_context().trace_id, "032x"))
+            return HttpResponse()
+
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        TracingMiddleware(view)(
+            rf.get("/", HTTP_TRACEPARENT=f"00-{trace_id}-00f067aa0ba902b7-01")
+        )
+        assert trace_ids == [trace_id]
+
+    def test_context_propagates_through_task_headers(self, petition, spans):
+        """Test the worker span and SMTP span belong to the publisher's trace"""
+        from .signals import end_publish_span, start_publish_span
+        from .tracing import get_tracer
+
+        task = "src.tasks.tasks.send_petition_confirmation_email"
+        headers = {"id": "task-1"}
+        with get_tracer().start_as_current_span("POST create_signature"):
+            start_publish_span(sender=task, headers=headers)
+            end_publish_span(headers=headers)
+        assert "traceparent" in headers
+
+        send_petition_confirmation_email.apply(
+            (petition.signatures.first().id,), headers=headers
+        )
+
+        named = self.by_name(spans)
+        publish = named[f"celery.publish {task}"]
+        run = named[f"celery.run {task}"]
+        email = named["email.send"]
+        assert run.context.trace_id == publish.context.trace_id
+        assert run.parent.span_id == publish.context.span_id
+        assert email.parent.span_id == run.context.span_id
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    """Tests for sampled and on-demand profiling"""
+
+    @pytest.fixture
+    def profiling(self, settings):
+        settings.PROFILING_HEADER_TOKEN = "secret"
+        settings.PROFILING_INTERVAL = 0.001
+        return settings
+
+    def test_profiler_samples_the_calling_thread(self):
+        """Test the busy function shows up in the collected stacks"""
+        import time
+
+        from .profiling import SamplingProfiler
+
+        def busy_loop():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+
+        profiler = SamplingProfiler(interval=0.001).start()
+        busy_loop()
+        profiler.stop()
+
+        assert profiler.sample_count > 0
+        functions = [function for function, _, _ in profiler.top_functions()]
+        assert any("busy_loop" in function for function in functions)
+        assert "busy_loop" in profiler.collapsed()
+
+    def test_trusted_header_profiles_the_request(self, client, petition, profiling):
+        """Test a request with the token is profiled and stored"""
+        from .models import RequestProfile
+
+        response = client.get(f"/api/petitions/{petition.id}", HTTP_X_PROFILE="secret")
+
+        profile = RequestProfile.objects.get()
+        assert response["X-Profile-Id"] == str(profile.pk)
+        assert profile.trigger == "header"
+        assert profile.route == "api-1.0.0:get_petition"
+        assert profile.status_code == 200
+        assert profile.query_count >= 1
+        assert profile.duration_ms > 0
+
+    def test_wrong_token_is_ignored(self, client, petition, profiling):
+        """Test an untrusted header does not trigger profiling"""
+        from .models import RequestProfile
+
+        response = client.get(f"/api/petitions/{petition.id}", HTTP_X_PROFILE="guess")
+
+        assert "X-Profile-Id" not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_store_is_bounded(self, client, petition, profiling):
+        """Test only the newest PROFILING_MAX_STORED profiles are kept"""
+        from .models import RequestProfile
+
+        profiling.PROFILING_SAMPLE_RATE = 1
+        profiling.PROFILING_MAX_STORED = 2
+        for _ in range(3):
+            client.get("/api/petitions/")
+
+        assert RequestProfile.objects.count() == 2
+        assert set(RequestProfile.objects.values_list("trigger", flat=True)) == {
+            "sampled"
+        }
+
+    def test_disabled_middleware_leaves_the_stack(self, settings):
+        """Test nothing runs per request when profiling is off"""
+        from django.core.exceptions import MiddlewareNotUsed
+
+        from .middleware import ProfilingMiddleware
+
+        settings.PROFILING_SAMPLE_RATE = 0
+        settings.PROFILING_HEADER_TOKEN = ""
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_sampled_task_is_stored(self, petition, settings):
+        """Test a sampled Celery task is profiled with its query count"""
+        from .models import RequestProfile
+
+        settings.PROFILING_TASK_SAMPLE_RATE = 1
+        send_petition_confirmation_email.apply((petition.signatures.first().id,))
+
+        profile = RequestProfile.objects.get()
+        assert profile.kind == "task"
+        assert profile.route == "task:src.tasks.tasks.send_petition_confirmation_email"
+        assert profile.query_count >= 1
@@ -0,0 +1,103 @@
+"""
+OpenTelemetry tracing of the signature -> confirmation email path.
+
+Spans cover the HTTP request, every DB statement, the Celery publish, the
+worker's task run and the SMTP exchange. Trace context travels from the web
+process to the worker in the task message headers (W3C ``traceparent``).
+Spans are exported to the console or a JSON-lines file, so no collector is
+needed. With TRACING_ENABLED off the OpenTelemetry API is a no-op.
+"""
+
+import sys
+
+from django.conf import settings
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+_provider = None
+
+
+def configure_tracing(span_processor=None):
+    """
+    Set up the tracer provider for this process.
+
+    Without ``span_processor`` spans are batched to the exporter chosen by
+    TRACING_EXPORTER: "console" (stdout) or "file" (JSON lines appended to
+    TRACING_FILE).
+    """
+    global _provider
+    if span_processor is None:
+        if settings.TRACING_EXPORTER == "file":
+            exporter = ConsoleSpanExporter(
+                out=open(settings.TRACING_FILE, "a", buffering=1),
+                formatter=lambda span: span.to_json(indent=None) + "\n",
+            )
+        else:
+            exporter = ConsoleSpanExporter(out=sys.stdout)
+        span_processor = BatchSpanProcessor(exporter)
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME})
+    )
+    provider.add_span_processor(span_processor)
+    if _provider is None:
+        trace.set_tracer_provider(provider)
+    _provider = provider
+    return provider
+
+
+def get_tracer():
+    if _provider is None:
+        return trace.get_tracer("habitat")
+    return _provider.get_tracer("habitat")
+
+
+def trace_query(execute, sql, params, many, context_):
+    """Database execute wrapper that records a span per statement."""
+    if not trace.get_current_span().is_recording():
+        return execute(sql, params, many, context_)
+    connection = context_["connection"]
+    with get_tracer().start_as_current_span(
+        "db.query",
+        kind=trace.SpanKind.CLIENT,
+        attributes={
+            "db.system": connection.vendor,
+            "db.statement": sql[:1000],
+        },
+    ):
+        return execute(sql, params, many, context_)
+
+
+def inject_headers(headers, span=None):
+    """Add the trace context of ``span`` (or the current one) to ``headers``."""
+    ctx = trace.set_span_in_context(span) if span is not None else None
+    propagate.inject(headers, context=ctx)
+
+
+def extract_task_context(request):
+    """
+    Read the trace context a task was published with.
+
+    Custom message headers appear as attributes of the task request on
+    workers and under ``request.headers`` when a task is applied eagerly.
+    """
+    carrier = dict(request.headers or {})
+    for key in ("traceparent", "tracestate"):
+        value = getattr(request, key, None)
+        if value is not None:
+            carrier.setdefault(key, value)
+    return propagate.extract(carrier)
+
+
+def attach(ctx):
+    return context.attach(ctx)
+
+
+def detach(token):
+    context.detach(token)
+
+
+def current_context():
+    return context.get_current()
@@ -0,0 +1,56 @@
+from wagtail_modeladmin.helpers import PermissionHelper
+from wagtail_modeladmin.options import ModelAdmin, modeladmin_register
+
+from src.observability.models import RequestProfile
+
+
+class ReadOnlyPermissionHelper(PermissionHelper):
+    """Profiles are written by the profiler only: no adding or editing."""
+
+    def user_can_create(self, user):
+        return False
+
+    def user_can_edit_obj(self, user, obj):
+        return False
+
+
+class RequestProfileAdmin(ModelAdmin):
+    """Wagtail Admin interface for stored request and task profiles."""
+
+    model = RequestProfile
+    menu_label = "Profile żądań"  # Label in the Wagtail admin menu
+    menu_order = 900
+    menu_icon = "time"
+    add_to_settings_menu = True
+    list_display = (
+        "route",
+        "kind",
+        "duration_ms",
+        "query_count",
+        "sample_count",
+        "status_code",
+        "created_at",
+    )
+    list_filter = ("kind", "trigger", "created_at")
+    search_fields = ("route", "path")
+    permission_helper_class = ReadOnlyPermissionHelper
+    inspect_view_enabled = True
+    inspect_view_fields = (
+        "route",
+        "kind",
+        "trigger",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "query_duration_ms",
+        "sample_count",
+        "sample_interval_ms",
+        "created_at",
+        "top_functions",
+        "stacks",
+    )
+
+
+modeladmin_register(RequestProfileAdmin)
@@ -1,5 +1,9 @@
 from django.contrib import admin
+from .exports import stream_signatures_csv
+from .filters import PetitionListFilter
 from .models import Petition, PetitionSignature
+from .pagination import EstimatedCountPaginator
+from .search import search_signatures
 
 
 @admin.register(Petition)
@@ -22,5 +26,18 @@ class PetitionSignatureAdmin(admin.ModelAdmin):
         "created_at",
     )
     search_fields = ("first_name", "last_name", "email", "phone_number")
-    list_filter = ("petition", "email_consent", "phone_consent", "created_at")
+    list_filter = (PetitionListFilter, "email_consent", "phone_consent", "created_at")
+    list_select_related = ("petition",)
     readonly_fields = ("created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ("export_as_csv",)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_signatures(queryset, search_term), False
+
+    @admin.action(description="Export selected signatures as CSV")
+    def export_as_csv(self, request, queryset):
+        return stream_signatures_csv(queryset, "signatures.csv")
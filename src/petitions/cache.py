@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from src.petitions.models import Petition
+
+
+def signature_count_cache_key(petition_id):
+    return f"petition:{petition_id}:signature_count"
+
+
+def get_cached_signature_counts(petition_ids):
+    """
+    Return ``{petition_id: signature_count}`` using the short-lived count cache.
+
+    Counts missing from the cache are read in a single query and cached for
+    ``SIGNATURE_COUNT_CACHE_TIMEOUT`` seconds, so a burst of signatures costs
+    at most one count query per petition per timeout instead of invalidating
+    everything that displays the number.
+    """
+    petition_ids = set(petition_ids)
+    keys = {signature_count_cache_key(pk): pk for pk in petition_ids}
+    cached = cache.get_many(keys)
+    counts = {keys[key]: value for key, value in cached.items()}
+
+    missing = petition_ids - counts.keys()
+    if missing:
+        fresh = dict(
+            Petition.objects.filter(pk__in=missing).values_list("pk", "signature_count")
+        )
+        cache.set_many(
+            {signature_count_cache_key(pk): count for pk, count in fresh.items()},
+            settings.SIGNATURE_COUNT_CACHE_TIMEOUT,
+        )
+        counts.update(fresh)
+    return counts
@@ -0,0 +1,187 @@
+import csv
+import datetime
+import io
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import PermissionDenied
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.temp import NamedTemporaryFile
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+
+EXPORT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "email_consent",
+    "phone_consent",
+    "created_at",
+)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_storage():
+    """
+    Storage for background exports and signature imports, outside the public
+    media directory.
+
+    Files are only served by the staff-only ``download_export`` view.
+    """
+    return FileSystemStorage(location=settings.EXPORTS_ROOT)
+
+
+def escape_cell(value):
+    """Quote text that a spreadsheet app would otherwise run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def filter_signatures(
+    queryset, email_consent=None, phone_consent=None, date_from=None, date_to=None
+):
+    """
+    Apply the export filters to a signature queryset.
+
+    ``date_from`` and ``date_to`` are inclusive calendar dates in the current
+    time zone.
+    """
+    if email_consent is not None:
+        queryset = queryset.filter(email_consent=email_consent)
+    if phone_consent is not None:
+        queryset = queryset.filter(phone_consent=phone_consent)
+    if date_from is not None:
+        queryset = queryset.filter(created_at__gte=_start_of_day(date_from))
+    if date_to is not None:
+        queryset = queryset.filter(
+            created_at__lt=_start_of_day(date_to + datetime.timedelta(days=1))
+        )
+    return queryset
+
+
+def _start_of_day(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def iter_signature_rows(queryset):
+    """
+    Yield the header and then one tuple per signature.
+
+    Rows are read with ``.iterator()`` so Postgres streams them through a
+    server-side cursor instead of loading the whole petition into memory.
+    Text that looks like a formula is quoted (see ``escape_cell``).
+    """
+    yield EXPORT_FIELDS
+    rows = queryset.order_by("id").values_list(*EXPORT_FIELDS)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield tuple(
+            (
+                timezone.localtime(value).isoformat()
+                if isinstance(value, datetime.datetime)
+                else escape_cell(value)
+            )
+            for value in row
+        )
+
+
+class _Echo:
+    """File-like object that returns what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_signatures_csv(queryset, filename):
+    """Return a StreamingHttpResponse that writes the signatures as CSV."""
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in iter_signature_rows(queryset)),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_filename(petition, file_format):
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    return f"petition-{petition.pk}-signatures-{stamp}.{file_format}"
+
+
+def write_signatures_file(queryset, filename, file_format="csv"):
+    """
+    Write an export to ``export_storage()`` and return the stored file name.
+
+    Used by the background export task for petitions too large to stream
+    from a web worker. XLSX exports use openpyxl's write-only mode so rows are
+    flushed to disk as they are produced.
+    """
+    storage = export_storage()
+    # A random suffix keeps the names of files full of contact details
+    # unguessable
+    path = f"{filename.rsplit('.', 1)[0]}-{uuid.uuid4().hex}.{file_format}"
+    if file_format == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Signatures")
+        for row in iter_signature_rows(queryset):
+            sheet.append(row)
+        with NamedTemporaryFile(suffix=".xlsx") as tmp:
+            workbook.save(tmp.name)
+            tmp.seek(0)
+            return storage.save(path, File(tmp))
+
+    with NamedTemporaryFile(suffix=".csv") as tmp:
+        text = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        for row in iter_signature_rows(queryset):
+            writer.writerow(row)
+        text.flush()
+        tmp.seek(0)
+        stored = storage.save(path, File(tmp))
+        text.detach()
+        return stored
+
+
+def download_export(request, name):
+    """
+    Wagtail admin view serving a background export to users who may view
+    signatures.
+
+    Lives here rather than in views.py so the worker URL conf can route it
+    (tasks reverse it for the emailed link) without importing the admin.
+    """
+    from src.petitions.models import PetitionSignature
+
+    opts = PetitionSignature._meta
+    if not request.user.has_perm(
+        f"{opts.app_label}.{get_permission_codename('view', opts)}"
+    ):
+        raise PermissionDenied
+
+    storage = export_storage()
+    if "/" in name or "\\" in name or not storage.exists(name):
+        raise Http404
+    return FileResponse(storage.open(name, "rb"), as_attachment=True, filename=name)
+
+
+def download_url(name, base_url=None):
+    """
+    Absolute URL of ``download_export`` for a stored file, for emails.
+
+    ``base_url`` is the site the file was requested on. Tasks get it from the
+    view that queued them; WAGTAILADMIN_BASE_URL is only the fallback.
+    """
+    base_url = base_url or settings.WAGTAILADMIN_BASE_URL
+    return base_url.rstrip("/") + reverse("petitions_download_export", args=[name])
@@ -0,0 +1,38 @@
+from django.contrib import admin
+
+from src.petitions.models import Petition
+
+
+class PetitionListFilter(admin.SimpleListFilter):
+    """
+    Petition filter for signature listings that never loads every petition.
+
+    The sidebar only lists the most recent petitions plus the selected one;
+    any other petition is found through the autocomplete box, which queries
+    ``petitions_autocomplete`` as the user types.
+    """
+
+    title = "petycji"
+    parameter_name = "petition"
+    template = "petitions/admin/petition_filter.html"
+    recent_limit = 10
+
+    def lookups(self, request, model_admin):
+        petitions = list(
+            Petition.objects.order_by("-created_at").values_list("id", "name")[
+                : self.recent_limit
+            ]
+        )
+        selected = self.value()
+        if selected and selected.isdigit():
+            if not any(str(pk) == selected for pk, _ in petitions):
+                petitions += list(
+                    Petition.objects.filter(pk=selected).values_list("id", "name")
+                )
+        return [(str(pk), name) for pk, name in petitions]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(petition_id=value)
+        return queryset
@@ -0,0 +1,70 @@
+from django import forms
+from wagtail.admin.forms import WagtailAdminModelForm
+
+
+class ImportSignaturesForm(forms.Form):
+    file = forms.FileField(
+        label="Plik CSV",
+        help_text=(
+            "Kolumny: first_name, last_name, email, phone_number oraz opcjonalnie "
+            "email_consent, phone_consent."
+        ),
+    )
+    send_confirmations = forms.BooleanField(
+        label="Wyślij e-maile z potwierdzeniem", required=False
+    )
+
+
+class PetitionForm(WagtailAdminModelForm):
+    """
+    Petition edit form for the Wagtail admin.
+
+    Saves edits through services.update_petition, like the API, and refuses
+    them if the petition was edited since the form was opened. An edit that
+    lands between ``clean()`` and ``save()`` is caught by PetitionEditView.
+    """
+
+    STALE_VERSION_MESSAGE = (
+        "Ktoś w międzyczasie zmienił tę petycję. Otwórz ją ponownie "
+        "i wprowadź zmiany jeszcze raz."
+    )
+
+    # Not in any panel, so Wagtail renders it as a bare hidden input
+    expected_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.fields["expected_version"].initial = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        expected_version = cleaned_data.get("expected_version")
+        if self.instance.pk is not None and expected_version is not None:
+            current_version = (
+                type(self.instance)
+                .objects.filter(pk=self.instance.pk)
+                .values_list("version", flat=True)
+                .first()
+            )
+            if current_version != expected_version:
+                raise forms.ValidationError(self.STALE_VERSION_MESSAGE)
+        return cleaned_data
+
+    def save(self, commit=True):
+        if self.instance.pk is None:
+            return super().save(commit)
+
+        # Imported here: the model imports this form
+        from src.petitions.services import EDITABLE_FIELDS, update_petition
+
+        update_petition(
+            self.instance,
+            {
+                name: self.cleaned_data[name]
+                for name in EDITABLE_FIELDS
+                if name in self.cleaned_data
+            },
+            expected_version=self.cleaned_data.get("expected_version"),
+        )
+        return self.instance
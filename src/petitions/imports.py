@@ -0,0 +1,230 @@
+import csv
+import io
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+
+from src.petitions.models import PetitionSignature
+from src.petitions.normalization import (
+    build_search_document,
+    normalize_email,
+    normalize_phone,
+)
+from src.petitions.services import increment_signature_count
+from src.petitions.supporters import link_supporters
+from src.petitions.validation import (
+    EMAIL_MAX_LENGTH,
+    EMAIL_REGEX,
+    NAME_MAX_LENGTH,
+    NAME_MIN_LENGTH,
+    PHONE_NUMBER_REGEX,
+)
+
+REQUIRED_COLUMNS = ("first_name", "last_name", "email", "phone_number")
+OPTIONAL_COLUMNS = ("email_consent", "phone_consent")
+TRUE_VALUES = {"1", "true", "t", "yes", "y", "tak"}
+
+# Columns of the staging table, in COPY order
+STAGING_COLUMNS = (
+    "line_no",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "email_consent",
+    "phone_consent",
+    "email_normalized",
+    "phone_normalized",
+    "search_document",
+)
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    rejected: list = field(default_factory=list)
+    signature_ids: list = field(default_factory=list)
+
+    def write_rejected_csv(self, fileobj):
+        writer = csv.writer(fileobj)
+        writer.writerow(("line", "reason"))
+        writer.writerows(self.rejected)
+
+
+class _CopyBuffer(io.RawIOBase):
+    """Read-only file object that serves an iterator of text lines to COPY."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while len(self._pending) < len(buffer):
+            try:
+                self._pending += next(self._lines).encode("utf-8")
+            except StopIteration:
+                break
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _staging_lines(reader, report):
+    """Normalize CSV rows in Python and format them as COPY CSV lines."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for row in reader:
+        line_no = reader.line_num
+        report.total += 1
+        first_name = (row.get("first_name") or "").strip()
+        last_name = (row.get("last_name") or "").strip()
+        email = (row.get("email") or "").strip()
+        phone_number = (row.get("phone_number") or "").strip()
+        writer.writerow(
+            (
+                line_no,
+                first_name,
+                last_name,
+                email,
+                phone_number,
+                (row.get("email_consent") or "").strip().lower() in TRUE_VALUES,
+                (row.get("phone_consent") or "").strip().lower() in TRUE_VALUES,
+                normalize_email(email),
+                normalize_phone(phone_number),
+                build_search_document(first_name, last_name, email, phone_number),
+            )
+        )
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+
+
+def import_signatures_csv(petition, fileobj, send_confirmations=False, batch_size=500):
+    """
+    Bulk-load signatures for ``petition`` from a CSV file object.
+
+    Rows are streamed with ``COPY`` into a temporary staging table, validated
+    set-based with the same rules as ``PetitionSignatureBase`` and merged into
+    the signature table, skipping emails that already signed (compared on the
+    normalized address), and linked to their supporters. The signature
+    counter is updated once at the end.
+    Confirmation emails, if requested, are queued in batches after commit.
+    """
+    reader = csv.DictReader(fileobj)
+    missing = [
+        column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())
+    ]
+    if missing:
+        raise ValueError(f"Missing required CSV columns: {', '.join(missing)}")
+
+    report = ImportReport()
+    signature_table = connection.ops.quote_name(PetitionSignature._meta.db_table)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE signature_import (
+                line_no bigint,
+                first_name text,
+                last_name text,
+                email text,
+                phone_number text,
+                email_consent boolean,
+                phone_consent boolean,
+                email_normalized text,
+                phone_normalized text,
+                search_document text
+            ) ON COMMIT DROP
+            """
+        )
+        # FORCE_NOT_NULL keeps empty fields as '' so the checks below reject them
+        cursor.copy_expert(
+            f"COPY signature_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(STAGING_COLUMNS[1:5])}))",
+            io.BufferedReader(_CopyBuffer(_staging_lines(reader, report))),
+        )
+
+        cursor.execute(
+            """
+            SELECT line_no, reason FROM (
+                SELECT line_no, CASE
+                    WHEN char_length(first_name) NOT BETWEEN %(name_min)s AND %(name_max)s
+                        THEN 'invalid first_name'
+                    WHEN char_length(last_name) NOT BETWEEN %(name_min)s AND %(name_max)s
+                        THEN 'invalid last_name'
+                    WHEN char_length(email) > %(email_max)s OR email !~ %(email_re)s
+                        THEN 'invalid email'
+                    WHEN phone_number !~ %(phone_re)s
+                        THEN 'invalid phone_number'
+                END AS reason
+                FROM signature_import
+            ) checked
+            WHERE reason IS NOT NULL
+            ORDER BY line_no
+            """,
+            {
+                "name_min": NAME_MIN_LENGTH,
+                "name_max": NAME_MAX_LENGTH,
+                "email_max": EMAIL_MAX_LENGTH,
+                "email_re": EMAIL_REGEX,
+                "phone_re": PHONE_NUMBER_REGEX,
+            },
+        )
+        report.rejected = cursor.fetchall()
+        if report.rejected:
+            cursor.execute(
+                "DELETE FROM signature_import WHERE line_no = ANY(%s)",
+                [[line_no for line_no, _ in report.rejected]],
+            )
+
+        cursor.execute(
+            f"""
+            INSERT INTO {signature_table} (
+                petition_id, first_name, last_name, email, phone_number,
+                email_consent, phone_consent, created_at,
+                email_normalized, phone_normalized, search_document
+            )
+            SELECT DISTINCT ON (i.email_normalized)
+                %(petition_id)s, i.first_name, i.last_name, i.email, i.phone_number,
+                i.email_consent, i.phone_consent, now(),
+                i.email_normalized, i.phone_normalized, i.search_document
+            FROM signature_import i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {signature_table} s
+                WHERE s.petition_id = %(petition_id)s
+                  AND s.email_normalized = i.email_normalized
+            )
+            ORDER BY i.email_normalized, i.line_no
+            ON CONFLICT (petition_id, email) DO NOTHING
+            RETURNING id
+            """,
+            {"petition_id": petition.pk},
+        )
+        report.signature_ids = [row[0] for row in cursor.fetchall()]
+        report.imported = len(report.signature_ids)
+        report.duplicates = report.total - len(report.rejected) - report.imported
+
+        if report.signature_ids:
+            link_supporters(
+                cursor, min(report.signature_ids), max(report.signature_ids)
+            )
+
+        increment_signature_count(petition.pk, report.imported)
+
+        if send_confirmations and report.signature_ids:
+            from src.tasks.tasks import send_petition_confirmation_emails
+
+            ids = report.signature_ids
+            for start in range(0, len(ids), batch_size):
+                chunk = ids[start : start + batch_size]
+                transaction.on_commit(
+                    lambda chunk=chunk: send_petition_confirmation_emails.delay(chunk)
+                )
+
+    return report
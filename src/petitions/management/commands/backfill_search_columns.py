@@ -0,0 +1,52 @@
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+
+from src.petitions.search import fill_search_columns, unsearchable_id_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the normalized and search columns of existing signatures, one "
+        "short transaction per range of signature ids. Safe to stop and run "
+        "again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Signature ids per transaction",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Seconds to pause between batches, to leave room for signing",
+        )
+
+    def handle(self, *args, **options):
+        first_id, last_id = unsearchable_id_range()
+        if first_id is None:
+            self.stdout.write(self.style.SUCCESS("Every signature is searchable"))
+            return
+
+        start = time.perf_counter()
+        filled = 0
+        for batch_start in range(first_id, last_id + 1, options["batch_size"]):
+            batch_end = min(batch_start + options["batch_size"] - 1, last_id)
+            with transaction.atomic():
+                filled += fill_search_columns(batch_start, batch_end)
+            self.stdout.write(
+                f"Signatures {batch_start}-{batch_end}: {filled} filled so far"
+            )
+            if options["sleep"] and batch_end < last_id:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Filled {filled} signature(s) in {time.perf_counter() - start:.1f}s"
+            )
+        )
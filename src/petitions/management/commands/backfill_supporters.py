@@ -0,0 +1,51 @@
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+
+from src.petitions.supporters import link_supporters, unlinked_id_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Link existing signatures to supporters, one short transaction per "
+        "range of signature ids. Safe to stop and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Signature ids per transaction",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Seconds to pause between batches, to leave room for signing",
+        )
+
+    def handle(self, *args, **options):
+        first_id, last_id = unlinked_id_range()
+        if first_id is None:
+            self.stdout.write(self.style.SUCCESS("Every signature has a supporter"))
+            return
+
+        start = time.perf_counter()
+        linked = 0
+        for batch_start in range(first_id, last_id + 1, options["batch_size"]):
+            batch_end = min(batch_start + options["batch_size"] - 1, last_id)
+            with transaction.atomic(), connection.cursor() as cursor:
+                linked += link_supporters(cursor, batch_start, batch_end)
+            self.stdout.write(
+                f"Signatures {batch_start}-{batch_end}: {linked} linked so far"
+            )
+            if options["sleep"] and batch_end < last_id:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Linked {linked} signature(s) in {time.perf_counter() - start:.1f}s"
+            )
+        )
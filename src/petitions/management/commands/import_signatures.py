@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.petitions.imports import import_signatures_csv
+from src.petitions.models import Petition
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import offline signatures for a petition from a CSV file with "
+        "columns first_name, last_name, email, phone_number and optionally "
+        "email_consent, phone_consent"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("petition_id", type=int)
+        parser.add_argument("csv_path")
+        parser.add_argument(
+            "--send-confirmations",
+            action="store_true",
+            help="Queue confirmation emails for imported signatures",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Signatures per confirmation email task",
+        )
+        parser.add_argument(
+            "--report", help="Write rejected rows (line, reason) to this CSV file"
+        )
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        try:
+            petition = Petition.objects.get(pk=options["petition_id"])
+        except Petition.DoesNotExist:
+            raise CommandError(f"Petition {options['petition_id']} does not exist")
+
+        start = time.perf_counter()
+        with open(options["csv_path"], newline="", encoding=options["encoding"]) as f:
+            try:
+                report = import_signatures_csv(
+                    petition,
+                    f,
+                    send_confirmations=options["send_confirmations"],
+                    batch_size=options["batch_size"],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        if options["report"]:
+            with open(options["report"], "w", newline="") as f:
+                report.write_rejected_csv(f)
+
+        self.stdout.write(f"Rows read:   {report.total}")
+        self.stdout.write(f"Imported:    {report.imported}")
+        self.stdout.write(f"Duplicates:  {report.duplicates}")
+        self.stdout.write(f"Rejected:    {len(report.rejected)}")
+        for line_no, reason in report.rejected[:20]:
+            self.stdout.write(f"  line {line_no}: {reason}")
+        if len(report.rejected) > 20:
+            self.stdout.write(f"  ... {len(report.rejected) - 20} more")
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported into '{petition.name}' in {elapsed:.1f}s")
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:00
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Schema only, each column in its own short transaction: the new columns
+    # default to "" without rewriting the table. Existing signatures are
+    # filled in by the backfill_search_columns command
+    atomic = False
+
+    dependencies = [
+        ("petitions", "0003_alter_petition_email_content"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="petitionsignature",
+            name="email_normalized",
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name="petitionsignature",
+            name="phone_normalized",
+            field=models.CharField(blank=True, editable=False, max_length=21),
+        ),
+        migrations.AddField(
+            model_name="petitionsignature",
+            name="search_document",
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the signature table against writes
+    atomic = False
+
+    dependencies = [
+        ("petitions", "0004_petitionsignature_search_columns"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="petitionsignature",
+            index=models.Index(
+                fields=["email_normalized"], name="signature_email_norm_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="petitionsignature",
+            index=models.Index(
+                fields=["phone_normalized"], name="signature_phone_norm_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="petitionsignature",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"],
+                name="signature_search_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
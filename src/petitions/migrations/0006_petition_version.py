@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0005_petitionsignature_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="petition",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
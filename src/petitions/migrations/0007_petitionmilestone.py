@@ -0,0 +1,62 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0006_petition_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PetitionMilestone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "threshold",
+                    models.PositiveSmallIntegerField(help_text="Percent of the target"),
+                ),
+                (
+                    "signature_count",
+                    models.PositiveIntegerField(
+                        help_text="Signature count right after the threshold was crossed"
+                    ),
+                ),
+                (
+                    "target",
+                    models.PositiveIntegerField(help_text="Target at the time"),
+                ),
+                ("reached_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "petition",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="milestones",
+                        to="petitions.petition",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Kamień milowy petycji",
+                "verbose_name_plural": "Kamienie milowe petycji",
+                "ordering": ["-reached_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("petition", "threshold"),
+                        name="petition_milestone_unique",
+                    )
+                ],
+            },
+        ),
+    ]
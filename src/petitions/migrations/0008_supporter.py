@@ -0,0 +1,72 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0007_petitionmilestone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Supporter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254)),
+                (
+                    "email_normalized",
+                    models.CharField(editable=False, max_length=254, unique=True),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+                (
+                    "phone_number",
+                    models.CharField(
+                        help_text="Phone number with country code", max_length=20
+                    ),
+                ),
+                (
+                    "phone_normalized",
+                    models.CharField(blank=True, editable=False, max_length=21),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Osoba wspierająca",
+                "verbose_name_plural": "Osoby wspierające",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["phone_normalized"], name="supporter_phone_norm_idx"
+                    )
+                ],
+            },
+        ),
+        # Nullable and without an index: adding the column rewrites nothing and
+        # the foreign key has only NULLs to validate. The index follows in 0009
+        migrations.AddField(
+            model_name="petitionsignature",
+            name="supporter",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="signatures",
+                to="petitions.supporter",
+            ),
+        ),
+    ]
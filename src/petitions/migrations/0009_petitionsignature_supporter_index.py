@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the signature table against writes
+    atomic = False
+
+    dependencies = [
+        ("petitions", "0008_supporter"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="petitionsignature",
+            index=models.Index(
+                fields=["supporter", "petition"], name="signature_supporter_idx"
+            ),
+        ),
+    ]
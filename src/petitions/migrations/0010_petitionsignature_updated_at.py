@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0009_petitionsignature_supporter_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="petitionsignature",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0010_petitionsignature_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="petitionsignature",
+            name="supporter",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="signatures",
+                to="petitions.supporter",
+            ),
+        ),
+    ]
@@ -1,9 +1,17 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.core.validators import MinValueValidator
 from wagtail.admin.panels import FieldPanel
 from wagtail.fields import RichTextField # Import RichTextField
 from wagtail.snippets.models import register_snippet
 
+from src.petitions.forms import PetitionForm
+from src.petitions.normalization import (
+    build_search_document,
+    normalize_email,
+    normalize_phone,
+)
+
 
 @register_snippet
 class Petition(models.Model):
@@ -27,15 +35,20 @@ class Petition(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by every edit made through services.update_petition
+    version = models.PositiveIntegerField(default=1, editable=False)
     # Define panels for the Wagtail admin interface (used by SnippetViewSet)
     panels = [
         FieldPanel('name'),
         FieldPanel('target'),
-        FieldPanel('signature_count'), # Consider making this read-only in admin
+        # Only ever changed by signing, never by editing
+        FieldPanel('signature_count', read_only=True),
         FieldPanel('email_subject'),
         FieldPanel('email_content'),
         # created_at and updated_at are usually handled automatically
     ]
+    # Saves edits through the same partial, versioned update as the API
+    base_form_class = PetitionForm
 
     def __str__(self):
         return f"{self.name} ({self.signature_count}/{self.target})"
@@ -48,6 +61,38 @@ class Petition(models.Model):
 
 
 
+class Supporter(models.Model):
+    """
+    A person who signed one or more petitions, identified by normalized email.
+
+    Contact details are those of the person's latest signature. Consents are
+    given per petition and stay on the signatures.
+    """
+
+    email = models.EmailField()
+    email_normalized = models.CharField(max_length=254, unique=True, editable=False)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+    phone_number = models.CharField(
+        max_length=20, help_text="Phone number with country code"
+    )
+    phone_normalized = models.CharField(max_length=21, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name} <{self.email}>"
+
+    class Meta:
+        app_label = 'src.petitions' # Explicitly define the app label
+        ordering = ["-created_at"]
+        verbose_name = "Osoba wspierająca"
+        verbose_name_plural = "Osoby wspierające"
+        indexes = [
+            models.Index(fields=["phone_normalized"], name="supporter_phone_norm_idx"),
+        ]
+
+
 class PetitionSignature(models.Model):
     """
     Model representing a signature for a petition with contact information and consent flags.
@@ -56,6 +101,19 @@ class PetitionSignature(models.Model):
     petition = models.ForeignKey(
         Petition, on_delete=models.CASCADE, related_name="signatures"
     )
+    # Filled in on save and by the backfill_supporters command. The contact
+    # columns below stay until every reader has moved to the supporter.
+    supporter = models.ForeignKey(
+        Supporter,
+        # Signatures are the record of consent; never drop them with a supporter
+        on_delete=models.PROTECT,
+        related_name="signatures",
+        null=True,
+        blank=True,
+        editable=False,
+        # Covered by signature_supporter_idx, built concurrently
+        db_index=False,
+    )
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     email = models.EmailField()
@@ -69,6 +127,12 @@ class PetitionSignature(models.Model):
         default=False, help_text="Consent to receive phone calls or SMS"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Null for signatures not edited since the column was added
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    # Derived columns kept in sync on save, used for dedupe and indexed search
+    email_normalized = models.CharField(max_length=254, blank=True, editable=False)
+    phone_normalized = models.CharField(max_length=21, blank=True, editable=False)
+    search_document = models.TextField(blank=True, editable=False)
     # Define panels for the Wagtail admin interface
     panels = [
         FieldPanel('petition'),
@@ -78,15 +142,138 @@ class PetitionSignature(models.Model):
         FieldPanel('phone_number'),
         FieldPanel('email_consent'),
         FieldPanel('phone_consent'),
-        # created_at is usually handled automatically
+        # created_at and updated_at are usually handled automatically
     ]
+    # Fields copied to the supporter on save
+    CONTACT_FIELDS = {"first_name", "last_name", "email", "phone_number"}
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.petition.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_contact = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.CONTACT_FIELDS
+        }
+        return instance
+
+    def _contact_changed(self):
+        """Whether a contact field differs from the value loaded from the db."""
+        loaded = getattr(self, "_loaded_contact", {})
+        return any(
+            name in self.__dict__
+            and (name not in loaded or self.__dict__[name] != loaded[name])
+            for name in self.CONTACT_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email(self.email)
+        self.phone_normalized = normalize_phone(self.phone_number)
+        self.search_document = build_search_document(
+            self.first_name, self.last_name, self.email, self.phone_number
+        )
+        update_fields = kwargs.get("update_fields")
+        derived_fields = {
+            "email_normalized",
+            "phone_normalized",
+            "search_document",
+            "updated_at",
+        }
+        # The supporter is only upserted when there is something to copy, so
+        # saves that leave the contact details alone skip the extra query
+        if (
+            update_fields is None or self.CONTACT_FIELDS & set(update_fields)
+        ) and (
+            self._state.adding or self.supporter_id is None or self._contact_changed()
+        ):
+            self.supporter = self._upsert_supporter()
+            derived_fields.add("supporter")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | derived_fields
+        super().save(*args, **kwargs)
+        # Compare later saves against what is now stored
+        self._loaded_contact = {
+            name: self.__dict__[name]
+            for name in self.CONTACT_FIELDS
+            if name in self.__dict__
+        }
+
+    def _upsert_supporter(self):
+        """Create or update this signer's Supporter in a single query."""
+        supporter = Supporter(
+            email=self.email,
+            email_normalized=self.email_normalized,
+            first_name=self.first_name,
+            last_name=self.last_name,
+            phone_number=self.phone_number,
+            phone_normalized=self.phone_normalized,
+        )
+        Supporter.objects.bulk_create(
+            [supporter],
+            update_conflicts=True,
+            unique_fields=["email_normalized"],
+            update_fields=[
+                "email",
+                "first_name",
+                "last_name",
+                "phone_number",
+                "phone_normalized",
+                "updated_at",
+            ],
+        )
+        return supporter
+
     class Meta:
         app_label = 'src.petitions' # Explicitly define the app label
         ordering = ["-created_at"]
         unique_together = ["petition", "email"]  # Prevent duplicate signatures
         verbose_name = "Podpis Petycji"
         verbose_name_plural = "Podpisy Petycji"
+        indexes = [
+            models.Index(fields=["email_normalized"], name="signature_email_norm_idx"),
+            models.Index(fields=["phone_normalized"], name="signature_phone_norm_idx"),
+            GinIndex(
+                fields=["search_document"],
+                name="signature_search_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            models.Index(
+                fields=["supporter", "petition"], name="signature_supporter_idx"
+            ),
+        ]
+
+
+class PetitionMilestone(models.Model):
+    """
+    A share of a petition's target reached by its signatures.
+
+    Recorded once per threshold by services.increment_signature_count and
+    handed to the PETITION_MILESTONE_SUBSCRIBERS tasks.
+    """
+
+    petition = models.ForeignKey(
+        Petition, on_delete=models.CASCADE, related_name="milestones"
+    )
+    threshold = models.PositiveSmallIntegerField(help_text="Percent of the target")
+    signature_count = models.PositiveIntegerField(
+        help_text="Signature count right after the threshold was crossed"
+    )
+    target = models.PositiveIntegerField(help_text="Target at the time")
+    reached_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.petition.name}: {self.threshold}%"
+
+    class Meta:
+        app_label = 'src.petitions' # Explicitly define the app label
+        ordering = ["-reached_at"]
+        verbose_name = "Kamień milowy petycji"
+        verbose_name_plural = "Kamienie milowe petycji"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["petition", "threshold"], name="petition_milestone_unique"
+            ),
+        ]
@@ -0,0 +1,46 @@
+import re
+
+from django.conf import settings
+
+_PHONE_SEPARATORS = re.compile(r"[\s\-\.\(\)/]")
+
+
+def normalize_email(email):
+    """Lower-case and trim an email address for lookups and deduplication."""
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone_number):
+    """
+    Normalize a phone number to E.164 (``+`` followed by digits).
+
+    Separators are stripped, a ``00`` international prefix becomes ``+`` and
+    national numbers without a country code get ``PHONE_DEFAULT_COUNTRY_CODE``.
+    Returns an empty string when nothing usable is left.
+    """
+    number = _PHONE_SEPARATORS.sub("", phone_number or "")
+    if number.startswith("+"):
+        digits = number[1:]
+    elif number.startswith("00"):
+        digits = number[2:]
+    elif len(number) <= settings.PHONE_NATIONAL_NUMBER_LENGTH:
+        digits = settings.PHONE_DEFAULT_COUNTRY_CODE + number
+    else:
+        digits = number
+    if not digits.isdigit():
+        return ""
+    return f"+{digits}"
+
+
+def build_search_document(first_name, last_name, email, phone_number):
+    """Text indexed by the trigram search over signatures."""
+    return " ".join(
+        part
+        for part in (
+            (first_name or "").strip().lower(),
+            (last_name or "").strip().lower(),
+            normalize_email(email),
+            normalize_phone(phone_number),
+        )
+        if part
+    )
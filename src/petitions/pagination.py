@@ -0,0 +1,83 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def planner_row_estimate(queryset):
+    """
+    Return Postgres' planner estimate of the rows ``queryset`` would return.
+
+    Returns None on other database backends so callers can fall back to an
+    exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner's row estimate for large result sets.
+
+    An exact ``COUNT(*)`` is only run when the estimate is below
+    ``ADMIN_EXACT_COUNT_THRESHOLD``, so listing millions of signatures costs a
+    single ``EXPLAIN`` instead of a full scan. ``is_estimated`` tells templates
+    that the total is approximate.
+    """
+
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = planner_row_estimate(self.object_list)
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        self.is_estimated = True
+        return estimate
+
+
+def encode_cursor(signature):
+    """Opaque keyset cursor pointing just after ``signature``."""
+    raw = f"{signature.created_at.isoformat()}|{signature.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, pk)`` from a cursor, or raise ValueError."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(queryset, cursor=None, limit=50):
+    """
+    Return one page of ``queryset`` (newest first) and the next page's cursor.
+
+    Pages are addressed by the last ``(created_at, id)`` seen rather than an
+    offset, so deep pages cost the same as the first one.
+    """
+    queryset = queryset.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    rows = list(queryset[: limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,127 @@
+import re
+
+from django.conf import settings
+from django.db.models import Max, Min, Q
+from wagtail_modeladmin.helpers.search import BaseSearchHandler
+
+from src.petitions.models import Petition, PetitionSignature
+from src.petitions.normalization import (
+    build_search_document,
+    normalize_email,
+    normalize_phone,
+)
+
+# Shorter terms cannot use the trigram index and would scan the whole table
+MIN_TERM_LENGTH = 3
+
+# Petitions matched by name are applied as an IN list; keep it bounded
+MAX_MATCHING_PETITIONS = 50
+
+# Phone numbers as people type them: "+48 600-123-456", "0048 (600) 123456"
+_PHONE_LIKE = re.compile(r"(?:\+|\b)\d[\d\s\-\.\(\)/]{4,}\d\b")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _normalize_phones(query):
+    """
+    Rewrite phone numbers in ``query`` the way they are stored.
+
+    Complete numbers go through ``normalize_phone``, so national and 00
+    prefixed numbers match their E.164 form; partial ones just lose their
+    separators and still match as substrings.
+    """
+
+    def replace(match):
+        number = match.group()
+        digits = _NON_DIGITS.sub("", number)
+        if number.startswith("+") or len(digits) >= (
+            settings.PHONE_NATIONAL_NUMBER_LENGTH
+        ):
+            return normalize_phone(number) or digits
+        return digits
+
+    return _PHONE_LIKE.sub(replace, query)
+
+
+def search_terms(query):
+    """The terms of ``query`` long enough to use the trigram index."""
+    return [
+        term
+        for term in _normalize_phones(query).lower().split()
+        if len(term) >= MIN_TERM_LENGTH
+    ]
+
+
+def search_signatures(queryset, query, include_petition_name=False):
+    """
+    Filter signatures by every term in ``query``.
+
+    Each term is matched as a substring of ``search_document`` (names,
+    normalized email and E.164 phone), which is backed by a trigram GIN
+    index. With ``include_petition_name`` a term may also match the name of
+    the signed petition. A query without any term of MIN_TERM_LENGTH
+    characters matches nothing.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    for term in terms:
+        condition = Q(search_document__contains=term)
+        if include_petition_name:
+            petition_ids = list(
+                Petition.objects.filter(name__icontains=term).values_list(
+                    "id", flat=True
+                )[:MAX_MATCHING_PETITIONS]
+            )
+            if petition_ids:
+                condition |= Q(petition_id__in=petition_ids)
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def unsearchable_id_range():
+    """
+    The lowest and highest id of signatures without search columns, or
+    (None, None).
+    """
+    aggregates = PetitionSignature.objects.filter(search_document="").aggregate(
+        first_id=Min("id"), last_id=Max("id")
+    )
+    return aggregates["first_id"], aggregates["last_id"]
+
+
+def fill_search_columns(first_id, last_id):
+    """
+    Fill in the search columns of signatures with ids in ``first_id..last_id``.
+
+    Only signatures without a ``search_document`` are touched, so ranges can
+    be filled again after an interruption. Returns the number of signatures
+    updated.
+    """
+    signatures = list(
+        PetitionSignature.objects.filter(
+            pk__range=(first_id, last_id), search_document=""
+        ).only("first_name", "last_name", "email", "phone_number")
+    )
+    for signature in signatures:
+        signature.email_normalized = normalize_email(signature.email)
+        signature.phone_normalized = normalize_phone(signature.phone_number)
+        signature.search_document = build_search_document(
+            signature.first_name,
+            signature.last_name,
+            signature.email,
+            signature.phone_number,
+        )
+    PetitionSignature.objects.bulk_update(
+        signatures, ["email_normalized", "phone_normalized", "search_document"]
+    )
+    return len(signatures)
+
+
+class SignatureSearchHandler(BaseSearchHandler):
+    """modeladmin search handler that uses the indexed signature search."""
+
+    def search_queryset(self, queryset, search_term, **kwargs):
+        if not search_term:
+            return queryset
+        return search_signatures(queryset, search_term, include_petition_name=True)
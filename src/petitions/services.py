@@ -0,0 +1,124 @@
+from functools import partial
+
+from celery import signature
+from django.conf import settings
+from django.db import connection, transaction
+
+from src.petitions.models import Petition, PetitionMilestone
+
+# Fields a petition edit may change. The signature counter is left out: it is
+# only ever written by increment_signature_count, in SQL.
+EDITABLE_FIELDS = ("name", "target", "email_subject", "email_content")
+
+
+class StaleVersion(Exception):
+    """The petition was edited since the version an update was based on."""
+
+    def __init__(self, current_version):
+        super().__init__(f"The petition is at version {current_version}")
+        self.current_version = current_version
+
+
+def increment_signature_count(petition_id, by=1):
+    """
+    Atomically add ``by`` to a petition's signature counter.
+
+    The increment is done in SQL so concurrent signers and bulk imports
+    never overwrite each other's updates. The same statement returns the new
+    count and the target: each increment sees its own disjoint range of
+    counts, so every PETITION_MILESTONES threshold is crossed by exactly one
+    of them, and checking for that costs no extra query. Returns the
+    milestones recorded by this increment.
+    """
+    if not by:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {connection.ops.quote_name(Petition._meta.db_table)}
+            SET signature_count = signature_count + %s
+            WHERE id = %s
+            RETURNING signature_count, target
+            """,
+            [by, petition_id],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return []
+    signature_count, target = row
+    thresholds = crossed_thresholds(signature_count - by, signature_count, target)
+    if not thresholds:
+        return []
+    return record_milestones(petition_id, thresholds, signature_count, target)
+
+
+def crossed_thresholds(before, after, target):
+    """The PETITION_MILESTONES thresholds reached going from ``before`` to ``after``."""
+    crossed = []
+    for threshold in settings.PETITION_MILESTONES:
+        # Signatures needed, rounded up: 25% of 10 is reached at 3
+        needed = -(-target * threshold // 100)
+        if before < needed <= after:
+            crossed.append(threshold)
+    return crossed
+
+
+def record_milestones(petition_id, thresholds, signature_count, target):
+    """
+    Record milestones and queue their subscribers once the transaction commits.
+
+    A threshold already recorded, say before the target was changed, is not
+    recorded or published again.
+    """
+    milestones = []
+    for threshold in thresholds:
+        milestone, created = PetitionMilestone.objects.get_or_create(
+            petition_id=petition_id,
+            threshold=threshold,
+            defaults={"signature_count": signature_count, "target": target},
+        )
+        if created:
+            transaction.on_commit(partial(publish_milestone, milestone.pk))
+            milestones.append(milestone)
+    return milestones
+
+
+def publish_milestone(milestone_id):
+    """Queue every PETITION_MILESTONE_SUBSCRIBERS task for a milestone."""
+    for task_name in settings.PETITION_MILESTONE_SUBSCRIBERS:
+        signature(task_name, args=(milestone_id,)).delay()
+
+
+def update_petition(petition, changes, expected_version=None):
+    """
+    Apply ``changes`` (field name to value) to ``petition`` and save them.
+
+    Only the columns whose values actually change are written, together with
+    ``version`` and ``updated_at``, so an edit never rolls back a signature
+    count that moved since the petition was loaded. With ``expected_version``
+    the edit is refused with StaleVersion if someone else's edit got in first.
+    Returns the names of the changed fields.
+    """
+    not_editable = set(changes) - set(EDITABLE_FIELDS)
+    if not_editable:
+        raise ValueError(f"Not editable: {', '.join(sorted(not_editable))}")
+
+    with transaction.atomic():
+        current = (
+            Petition.objects.select_for_update()
+            .only("version", *EDITABLE_FIELDS)
+            .get(pk=petition.pk)
+        )
+        if expected_version is not None and current.version != expected_version:
+            raise StaleVersion(current.version)
+
+        changed = [
+            name for name, value in changes.items() if getattr(current, name) != value
+        ]
+        for name, value in changes.items():
+            setattr(petition, name, value)
+        petition.version = current.version
+        if changed:
+            petition.version += 1
+            petition.save(update_fields=[*changed, "version", "updated_at"])
+    return changed
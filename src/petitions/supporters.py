@@ -0,0 +1,78 @@
+"""
+Supporters: one row per person, shared by their signatures on every petition.
+
+New signatures are linked on save (see PetitionSignature.save) and by the
+COPY import; link_supporters links existing ones in id ranges, so the
+backfill_supporters command can walk the signature table in short
+transactions while signing goes on.
+"""
+
+from django.db import connection
+
+from src.petitions.models import PetitionSignature, Supporter
+
+
+def _tables():
+    quote = connection.ops.quote_name
+    return (
+        quote(PetitionSignature._meta.db_table),
+        quote(Supporter._meta.db_table),
+    )
+
+
+def link_supporters(cursor, first_id, last_id):
+    """
+    Link the unlinked signatures with ids in ``first_id..last_id``.
+
+    Missing supporters are created from the signature rows. A person's
+    details are taken from their latest signature, unless the supporter was
+    updated more recently than that. Returns the number of linked signatures.
+    """
+    signature_table, supporter_table = _tables()
+    cursor.execute(
+        f"""
+        INSERT INTO {supporter_table} (
+            email, email_normalized, first_name, last_name,
+            phone_number, phone_normalized, created_at, updated_at
+        )
+        SELECT DISTINCT ON (s.email_normalized)
+            s.email, s.email_normalized, s.first_name, s.last_name,
+            s.phone_number, s.phone_normalized, now(), s.created_at
+        FROM {signature_table} s
+        WHERE s.id BETWEEN %(first_id)s AND %(last_id)s
+          AND s.supporter_id IS NULL
+        ORDER BY s.email_normalized, s.created_at DESC
+        ON CONFLICT (email_normalized) DO UPDATE SET
+            email = EXCLUDED.email,
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            phone_number = EXCLUDED.phone_number,
+            phone_normalized = EXCLUDED.phone_normalized,
+            updated_at = EXCLUDED.updated_at
+        WHERE {supporter_table}.updated_at < EXCLUDED.updated_at
+        """,
+        {"first_id": first_id, "last_id": last_id},
+    )
+    cursor.execute(
+        f"""
+        UPDATE {signature_table} s
+        SET supporter_id = sp.id
+        FROM {supporter_table} sp
+        WHERE s.id BETWEEN %(first_id)s AND %(last_id)s
+          AND s.supporter_id IS NULL
+          AND sp.email_normalized = s.email_normalized
+        """,
+        {"first_id": first_id, "last_id": last_id},
+    )
+    return cursor.rowcount
+
+
+def unlinked_id_range():
+    """The lowest and highest id of the unlinked signatures, or (None, None)."""
+    signature_table, _ = _tables()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT min(id), max(id) FROM {signature_table} "
+            "WHERE supporter_id IS NULL"
+        )
+        return cursor.fetchone()
@@ -3,7 +3,7 @@ from django.core import mail
 from django.db.utils import IntegrityError
 from unittest.mock import patch
 
-from .models import Petition, PetitionSignature
+from .models import Petition, PetitionSignature, Supporter
 
 
 @pytest.mark.django_db
@@ -44,16 +44,6 @@ class TestPetitionModel:
 class TestPetitionSignatureModel:
     """Tests for the PetitionSignature model"""
 
-    @pytest.fixture
-    def petition(self):
-        """Create a petition for testing"""
-        return Petition.objects.create(
-            name="Test Petition",
-            target=100,
-            email_subject="Thank you for signing",
-            email_content="Thank you for supporting our cause.",
-        )
-
     def test_signature_creation(self, petition):
         """Test creating a signature"""
         signature = PetitionSignature.objects.create(
@@ -191,3 +181,681 @@ class TestCeleryTasks:
 
         # Check the result
         assert result == "Error: Signature with ID 999 not found"
+
+
+@pytest.mark.django_db
+class TestSignatureExport:
+    """Tests for streaming signature exports"""
+
+    @pytest.fixture
+    def petition(self, petition):
+        """The shared petition with two signatures"""
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone_number="+1234567890",
+            email_consent=True,
+        )
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="Jane",
+            last_name="Roe",
+            email="jane.roe@example.com",
+            phone_number="+1234567891",
+            email_consent=False,
+        )
+        return petition
+
+    def test_stream_csv(self, petition):
+        """Test that the CSV response streams a header and one row per signature"""
+        from .exports import stream_signatures_csv
+
+        response = stream_signatures_csv(petition.signatures.all(), "export.csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        assert response["Content-Disposition"] == 'attachment; filename="export.csv"'
+        assert lines[0].startswith("id,first_name,last_name,email")
+        assert len(lines) == 3
+
+    def test_consent_filter(self, petition):
+        """Test filtering the export by email consent"""
+        from .exports import filter_signatures
+
+        queryset = filter_signatures(petition.signatures.all(), email_consent=True)
+
+        assert list(queryset.values_list("email", flat=True)) == [
+            "john.doe@example.com"
+        ]
+
+    def test_write_export_file(self, petition, settings, tmp_path):
+        """Test writing a background export outside public media"""
+        from .exports import write_signatures_file
+
+        settings.EXPORTS_ROOT = tmp_path
+
+        name = write_signatures_file(petition.signatures.all(), "export.csv")
+
+        assert name.startswith("export-") and name != "export.csv"
+        assert (tmp_path / name).read_text().count("\n") == 3
+
+    def test_formulas_are_escaped(self, petition):
+        """Test cells that spreadsheets would run as formulas are quoted"""
+        from .exports import iter_signature_rows
+
+        petition.signatures.filter(first_name="John").update(
+            first_name="=HYPERLINK(1)", last_name="@SUM(1)"
+        )
+
+        john = next(
+            row
+            for row in iter_signature_rows(petition.signatures.all())
+            if row[3] == "john.doe@example.com"
+        )
+        assert john[1:3] == ("'=HYPERLINK(1)", "'@SUM(1)")
+        assert john[4] == "'+1234567890"
+
+    def test_download_is_staff_only(
+        self, petition, settings, tmp_path, client, admin_client
+    ):
+        """Test exports are only served to users who may view signatures"""
+        from .exports import write_signatures_file
+
+        settings.EXPORTS_ROOT = tmp_path
+        name = write_signatures_file(petition.signatures.all(), "export.csv")
+        url = f"/admin/petitions/exports/{name}"
+
+        assert client.get(url).status_code == 302
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert b"john.doe@example.com" in b"".join(response.streaming_content)
+        assert (
+            admin_client.get("/admin/petitions/exports/missing.csv").status_code == 404
+        )
+
+    def test_emailed_link_uses_requesting_site(
+        self, petition, settings, tmp_path, admin_client
+    ):
+        """Test the worker links to the site the export was requested on"""
+        from src.tasks.tasks import export_petition_signatures
+
+        settings.EXPORTS_ROOT = tmp_path
+        settings.WAGTAILADMIN_BASE_URL = "http://localhost:8000"
+
+        with patch("src.tasks.tasks.export_petition_signatures.delay") as delay:
+            admin_client.get(
+                f"/admin/petitions/{petition.pk}/signatures/export/?format=xlsx",
+                HTTP_HOST="admin.example.com",
+            )
+        export_petition_signatures(*delay.call_args.args, **delay.call_args.kwargs)
+
+        assert "http://admin.example.com/admin/petitions/exports/" in (
+            mail.outbox[0].body
+        )
+
+
+@pytest.mark.django_db
+class TestSignatureListing:
+    """Tests for the Wagtail signature listing query budget"""
+
+    # Queries the listing may run per page, independent of rows shown
+    QUERY_BUDGET = 30
+
+    @pytest.fixture
+    def index_url(self):
+        """URL of the Wagtail signature listing"""
+        from .wagtail_hooks import PetitionSignatureAdmin
+
+        return PetitionSignatureAdmin().url_helper.index_url
+
+    def create_signatures(self, count):
+        """Create signatures spread over several petitions"""
+        for i in range(count):
+            petition = Petition.objects.create(
+                name=f"Petition {i}",
+                target=100,
+                email_subject="Thank you for signing",
+                email_content="Thank you for supporting our cause.",
+            )
+            PetitionSignature.objects.create(
+                petition=petition,
+                first_name="John",
+                last_name="Doe",
+                email=f"john.doe{i}@example.com",
+                phone_number="+1234567890",
+            )
+
+    def count_listing_queries(self, admin_client, index_url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = admin_client.get(index_url)
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_rows(self, admin_client, index_url):
+        """Test that rendering more rows does not add queries (no N+1)"""
+        self.create_signatures(1)
+        admin_client.get(index_url)  # warm up per-session caches
+        few = self.count_listing_queries(admin_client, index_url)
+
+        self.create_signatures(20)
+        many = self.count_listing_queries(admin_client, index_url)
+
+        assert many == few
+        assert many <= self.QUERY_BUDGET
+
+    def test_petition_filter(self, admin_client, index_url):
+        """Test filtering the listing by petition id"""
+        self.create_signatures(2)
+        petition = Petition.objects.first()
+
+        response = admin_client.get(index_url, {"petition": petition.pk})
+
+        assert response.status_code == 200
+        assert list(response.context["object_list"]) == list(petition.signatures.all())
+
+
+class TestNormalization:
+    """Tests for email and phone normalization"""
+
+    def test_normalize_email(self):
+        """Test that emails are trimmed and lower-cased"""
+        from .normalization import normalize_email
+
+        assert normalize_email("  John.Doe@Example.COM ") == "john.doe@example.com"
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ("+48 600-123-456", "+48600123456"),
+            ("0048600123456", "+48600123456"),
+            ("600 123 456", "+48600123456"),
+            ("+1 (234) 567-890", "+1234567890"),
+            ("not a number", ""),
+        ],
+    )
+    def test_normalize_phone(self, raw, expected):
+        """Test E.164 normalization of phone numbers"""
+        from .normalization import normalize_phone
+
+        assert normalize_phone(raw) == expected
+
+
+@pytest.mark.django_db
+class TestSignatureSearch:
+    """Tests for the indexed signature search"""
+
+    @pytest.fixture
+    def petition(self, petition):
+        """The shared petition with two signatures"""
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="John",
+            last_name="Doe",
+            email="John.Doe@Example.com",
+            phone_number="+48 600 123 456",
+        )
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="Jane",
+            last_name="Roe",
+            email="jane.roe@example.com",
+            phone_number="+48700123456",
+        )
+        return petition
+
+    def test_normalized_columns_on_save(self, petition):
+        """Test that derived search columns are filled on save"""
+        signature = petition.signatures.get(last_name="Doe")
+
+        assert signature.email_normalized == "john.doe@example.com"
+        assert signature.phone_normalized == "+48600123456"
+        assert "john doe john.doe@example.com" in signature.search_document
+
+    def test_search_by_email_and_phone(self, petition):
+        """Test searching by email fragment and phone digits"""
+        from .search import search_signatures
+
+        by_email = search_signatures(PetitionSignature.objects.all(), "JOHN.DOE")
+        by_phone = search_signatures(PetitionSignature.objects.all(), "700123")
+
+        assert [s.last_name for s in by_email] == ["Doe"]
+        assert [s.last_name for s in by_phone] == ["Roe"]
+
+    def test_search_by_formatted_phone(self, petition):
+        """Test that phone numbers are normalized like the stored ones"""
+        from .search import search_signatures
+
+        for query in ["600-123-456", "0048 (600) 123 456", "+48 600 123 456"]:
+            results = search_signatures(PetitionSignature.objects.all(), query)
+            assert [s.last_name for s in results] == ["Doe"]
+
+    def test_search_with_only_short_terms(self, petition):
+        """Test that a query without a usable term matches nothing"""
+        from .search import search_signatures
+
+        assert not search_signatures(PetitionSignature.objects.all(), "ab cd")
+
+    def test_search_by_petition_name(self, petition):
+        """Test that admin search can match the petition name"""
+        from .search import search_signatures
+
+        results = search_signatures(
+            PetitionSignature.objects.all(), "test petition", include_petition_name=True
+        )
+
+        assert results.count() == 2
+
+    def test_backfill(self, petition):
+        """Test the backfill fills in signatures saved before the columns"""
+        import io
+
+        from django.core.management import call_command
+
+        PetitionSignature.objects.update(
+            email_normalized="", phone_normalized="", search_document=""
+        )
+
+        call_command(
+            "backfill_search_columns", batch_size=1, sleep=0, stdout=io.StringIO()
+        )
+
+        signature = petition.signatures.get(last_name="Doe")
+        assert signature.email_normalized == "john.doe@example.com"
+        assert signature.phone_normalized == "+48600123456"
+        assert not PetitionSignature.objects.filter(search_document="").exists()
+
+    def test_keyset_pagination(self, petition):
+        """Test walking the results page by page with cursors"""
+        from .pagination import keyset_page
+
+        first, cursor = keyset_page(petition.signatures.all(), limit=1)
+        second, last_cursor = keyset_page(petition.signatures.all(), cursor, limit=1)
+
+        assert len(first) == len(second) == 1
+        assert first[0].pk != second[0].pk
+        assert last_cursor is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSignatureImport:
+    """Tests for the COPY-based signature import"""
+
+    CSV = (
+        "first_name,last_name,email,phone_number,email_consent\n"
+        "John,Doe,john.doe@example.com,+48600123456,tak\n"
+        "Jane,Roe,jane.roe@example.com,+48700123456,0\n"
+        "Jane,Roe,JANE.ROE@example.com,+48700123456,0\n"
+        ",Nameless,nameless@example.com,+48800123456,1\n"
+        "Bad,Phone,bad.phone@example.com,12ab,1\n"
+        "Existing,Signer,existing@example.com,+48900123456,1\n"
+    )
+
+    @pytest.fixture
+    def petition(self, petition):
+        """The shared petition with one existing, counted signature"""
+        PetitionSignature.objects.create(
+            petition=petition,
+            first_name="Existing",
+            last_name="Signer",
+            email="Existing@Example.com",
+            phone_number="+48900123456",
+        )
+        Petition.objects.filter(pk=petition.pk).update(signature_count=1)
+        petition.refresh_from_db()
+        return petition
+
+    def test_import(self, petition):
+        """Test validation, dedupe and the counter update"""
+        import io
+
+        from .imports import import_signatures_csv
+
+        report = import_signatures_csv(petition, io.StringIO(self.CSV))
+
+        assert report.total == 6
+        assert report.imported == 2
+        assert report.duplicates == 2
+        assert [reason for _, reason in report.rejected] == [
+            "invalid first_name",
+            "invalid phone_number",
+        ]
+        petition.refresh_from_db()
+        assert petition.signature_count == 3
+        john = petition.signatures.get(email="john.doe@example.com")
+        assert john.email_consent is True
+        assert john.phone_normalized == "+48600123456"
+
+    def test_upload_and_report_stay_private(self, petition, settings, tmp_path):
+        """Test the uploaded file and the rejected rows are kept out of media"""
+        from django.core.files.base import ContentFile
+
+        from src.tasks.tasks import import_petition_signatures
+
+        from .exports import export_storage
+
+        settings.EXPORTS_ROOT = tmp_path / "exports"
+        settings.MEDIA_ROOT = tmp_path / "media"
+        path = export_storage().save(
+            "imports/upload.csv", ContentFile(self.CSV.encode())
+        )
+
+        import_petition_signatures(petition.pk, path, notify_email="staff@example.com")
+
+        (report,) = (tmp_path / "exports").glob("*-rejected-*.csv")
+        assert f"/admin/petitions/exports/{report.name}" in mail.outbox[0].body
+        assert not (tmp_path / "exports" / path).exists()
+        assert not (tmp_path / "media").exists()
+
+    def test_missing_columns(self, petition):
+        """Test that a file without the required columns is refused"""
+        import io
+
+        from .imports import import_signatures_csv
+
+        with pytest.raises(ValueError):
+            import_signatures_csv(petition, io.StringIO("name,email\nJohn,j@x.pl\n"))
+
+
+@pytest.mark.django_db
+class TestPetitionUpdate:
+    """Tests for partial, versioned petition updates"""
+
+    def test_stale_instance_keeps_signature_count(self, petition):
+        """Test an edit does not roll back signatures counted after loading"""
+        from .services import increment_signature_count, update_petition
+
+        increment_signature_count(petition.pk, by=5)
+        changed = update_petition(petition, {"name": "Renamed", "target": 100})
+
+        assert changed == ["name"]
+        petition.refresh_from_db()
+        assert petition.name == "Renamed"
+        assert petition.signature_count == 5
+        assert petition.version == 2
+
+    def test_unchanged_values_are_not_written(self, petition):
+        """Test a no-op update keeps the version"""
+        from .services import update_petition
+
+        assert update_petition(petition, {"target": 100}) == []
+        petition.refresh_from_db()
+        assert petition.version == 1
+
+    def test_stale_version_is_refused(self, petition):
+        """Test an update based on an old version is refused"""
+        from .services import StaleVersion, update_petition
+
+        update_petition(petition, {"target": 200})
+        with pytest.raises(StaleVersion):
+            update_petition(petition, {"name": "Renamed"}, expected_version=1)
+        petition.refresh_from_db()
+        assert petition.name == "Test Petition"
+
+    def test_counter_is_not_editable(self, petition):
+        """Test the signature count cannot be set through an update"""
+        from .services import update_petition
+
+        with pytest.raises(ValueError):
+            update_petition(petition, {"signature_count": 0})
+
+    def test_admin_form_uses_versioned_update(self, petition):
+        """Test the Wagtail edit form saves partially and checks the version"""
+        from wagtail.admin.panels import get_edit_handler
+
+        from .services import increment_signature_count
+
+        form_class = get_edit_handler(Petition).get_form_class()
+        assert "signature_count" not in form_class.base_fields
+        data = {
+            "name": "Renamed",
+            "target": "100",
+            "email_subject": "Thank you for signing",
+            "email_content": (
+                '{"blocks": [{"key": "a", "type": "unstyled", '
+                '"text": "Thank you for supporting our cause.", "depth": 0, '
+                '"inlineStyleRanges": [], "entityRanges": []}], "entityMap": {}}'
+            ),
+            "expected_version": "1",
+        }
+
+        increment_signature_count(petition.pk)
+        form = form_class(data, instance=petition)
+        assert form.is_valid(), form.errors
+        form.save()
+        petition.refresh_from_db()
+        assert petition.name == "Renamed"
+        assert petition.signature_count == 1
+        assert petition.version == 2
+
+        stale = form_class(data, instance=Petition.objects.get(pk=petition.pk))
+        assert not stale.is_valid()
+
+    def test_admin_edit_racing_the_version_check(self, petition, admin_client):
+        """Test an edit landing after clean() is shown as a form error"""
+        from .services import StaleVersion
+        from .wagtail_hooks import PetitionAdmin
+
+        url = PetitionAdmin().url_helper.get_action_url("edit", petition.pk)
+        data = {
+            "name": "Renamed",
+            "target": "100",
+            "email_subject": "Thank you for signing",
+            "email_content": (
+                '{"blocks": [{"key": "a", "type": "unstyled", '
+                '"text": "Thank you for supporting our cause.", "depth": 0, '
+                '"inlineStyleRanges": [], "entityRanges": []}], "entityMap": {}}'
+            ),
+            "expected_version": "1",
+        }
+
+        with patch(
+            "src.petitions.services.update_petition", side_effect=StaleVersion(2)
+        ):
+            response = admin_client.post(url, data)
+
+        assert response.status_code == 200
+        assert "Ktoś w międzyczasie zmienił tę petycję" in response.content.decode()
+        petition.refresh_from_db()
+        assert petition.name == "Test Petition"
+
+
+@pytest.mark.django_db
+class TestPetitionMilestones:
+    """Tests for milestone detection in the signature counter"""
+
+    @pytest.fixture
+    def petition(self, petition):
+        """The shared petition with a target small enough to reach quickly"""
+        Petition.objects.filter(pk=petition.pk).update(target=10)
+        petition.refresh_from_db()
+        return petition
+
+    def test_each_threshold_is_crossed_once(self, petition):
+        """Test single increments record every threshold exactly once"""
+        from .services import increment_signature_count
+
+        reached = []
+        for _ in range(12):
+            reached += [m.threshold for m in increment_signature_count(petition.pk)]
+
+        assert reached == [25, 50, 75, 100]
+        assert list(
+            petition.milestones.order_by("threshold").values_list(
+                "threshold", "signature_count"
+            )
+        ) == [(25, 3), (50, 5), (75, 8), (100, 10)]
+
+    def test_batch_crosses_several_thresholds(self, petition):
+        """Test a bulk import records every threshold it jumps over"""
+        from .services import increment_signature_count
+
+        milestones = increment_signature_count(petition.pk, by=8)
+
+        assert [m.threshold for m in milestones] == [25, 50, 75]
+        assert {m.signature_count for m in milestones} == {8}
+
+    def test_no_crossing_costs_one_query(self, petition, django_assert_num_queries):
+        """Test the common path is a single UPDATE ... RETURNING"""
+        from .services import increment_signature_count
+
+        with django_assert_num_queries(1):
+            assert increment_signature_count(petition.pk) == []
+
+    def test_threshold_is_not_recorded_twice(self, petition):
+        """Test crossing a threshold again after a target change is ignored"""
+        from .services import increment_signature_count
+
+        increment_signature_count(petition.pk, by=3)
+        Petition.objects.filter(pk=petition.pk).update(target=20)
+
+        assert increment_signature_count(petition.pk, by=3) == []
+        assert petition.milestones.count() == 1
+
+    @patch("src.petitions.services.signature")
+    def test_subscribers_are_queued_on_commit(
+        self, signature, petition, settings, django_capture_on_commit_callbacks
+    ):
+        """Test every subscriber task is queued once the signature commits"""
+        from .services import increment_signature_count
+
+        settings.PETITION_MILESTONE_SUBSCRIBERS = ["a.task", "b.task"]
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            (milestone,) = increment_signature_count(petition.pk, by=3)
+        signature.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        assert [c.args for c in signature.call_args_list] == [
+            ("a.task",),
+            ("b.task",),
+        ]
+        signature.assert_called_with("b.task", args=(milestone.pk,))
+
+    def test_staff_are_notified(self, petition, django_user_model):
+        """Test the notification goes to active staff with an email address"""
+        from src.tasks.tasks import notify_staff_of_milestone
+
+        from .services import increment_signature_count
+
+        django_user_model.objects.create(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        django_user_model.objects.create(username="user", email="user@example.com")
+        (milestone,) = increment_signature_count(petition.pk, by=5)[1:]
+
+        notify_staff_of_milestone(milestone.pk)
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ["staff@example.com"]
+        assert "50%" in mail.outbox[0].subject
+
+
+@pytest.mark.django_db
+class TestSupporters:
+    """Tests for supporters shared by signatures across petitions"""
+
+    @pytest.fixture
+    def petitions(self):
+        return [
+            Petition.objects.create(
+                name=f"Petition {i}",
+                target=100,
+                email_subject="Thank you for signing",
+                email_content="Thank you for supporting our cause.",
+            )
+            for i in range(2)
+        ]
+
+    def sign(self, petition, email, first_name="John"):
+        return PetitionSignature.objects.create(
+            petition=petition,
+            first_name=first_name,
+            last_name="Doe",
+            email=email,
+            phone_number="+48 600 123 456",
+        )
+
+    def test_signatures_share_a_supporter(self, petitions):
+        """Test one supporter per normalized email, with the latest details"""
+        first = self.sign(petitions[0], "John.Doe@Example.com")
+        second = self.sign(petitions[1], "john.doe@example.com", first_name="Jon")
+
+        assert first.supporter_id == second.supporter_id
+        supporter = Supporter.objects.get()
+        assert supporter.first_name == "Jon"
+        assert supporter.phone_normalized == "+48600123456"
+
+    def test_supporter_only_upserted_when_contact_changes(self, petitions):
+        """Test saves that leave the contact details alone skip the upsert"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        signature = self.sign(petitions[0], "john.doe@example.com")
+
+        with CaptureQueriesContext(connection) as ctx:
+            signature.email_consent = True
+            signature.save()
+            PetitionSignature.objects.get(pk=signature.pk).save()
+        assert len(ctx.captured_queries) == 3
+
+        signature.first_name = "Jon"
+        signature.save()
+        assert Supporter.objects.get().first_name == "Jon"
+
+    def test_deleting_supporter_keeps_signatures(self, petitions):
+        """Test a supporter with signatures can't be deleted"""
+        from django.db.models import ProtectedError
+
+        self.sign(petitions[0], "john.doe@example.com")
+
+        with pytest.raises(ProtectedError):
+            Supporter.objects.all().delete()
+        assert PetitionSignature.objects.count() == 1
+
+    def test_backfill(self, petitions):
+        """Test the backfill links signatures saved before supporters existed"""
+        import io
+
+        from django.core.management import call_command
+
+        signatures = [
+            self.sign(petitions[0], "john.doe@example.com"),
+            self.sign(petitions[1], "JOHN.DOE@example.com", first_name="Jon"),
+            self.sign(petitions[0], "jane.roe@example.com", first_name="Jane"),
+        ]
+        PetitionSignature.objects.update(supporter=None)
+        Supporter.objects.all().delete()
+
+        call_command("backfill_supporters", batch_size=2, sleep=0, stdout=io.StringIO())
+
+        assert not PetitionSignature.objects.filter(supporter=None).exists()
+        assert Supporter.objects.count() == 2
+        john = Supporter.objects.get(email_normalized="john.doe@example.com")
+        assert john.first_name == "Jon"
+        assert set(john.signatures.values_list("pk", flat=True)) == {
+            signatures[0].pk,
+            signatures[1].pk,
+        }
+
+    def test_import_links_supporters(self, petitions):
+        """Test signatures imported with COPY get supporters too"""
+        import io
+
+        from .imports import import_signatures_csv
+
+        self.sign(petitions[0], "john.doe@example.com")
+        import_signatures_csv(
+            petitions[1],
+            io.StringIO(
+                "first_name,last_name,email,phone_number\n"
+                "John,Doe,John.Doe@example.com,+48600123456\n"
+                "Jane,Roe,jane.roe@example.com,+48700123456\n"
+            ),
+        )
+
+        assert not PetitionSignature.objects.filter(supporter=None).exists()
+        assert Supporter.objects.count() == 2
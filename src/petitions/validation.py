@@ -0,0 +1,16 @@
+# Validation rules shared by the API schemas and the bulk signature import.
+# The patterns are valid both as Python and as Postgres POSIX regular
+# expressions, so set-based checks in SQL match the API exactly.
+
+# Phone number with optional leading + and country code
+PHONE_NUMBER_REGEX = r"^\+?[0-9]{5,20}$"
+PHONE_NUMBER_MIN_LENGTH = 5
+PHONE_NUMBER_MAX_LENGTH = 20
+
+NAME_MIN_LENGTH = 1
+NAME_MAX_LENGTH = 100
+
+# Structural email check used for SQL validation; the API additionally runs
+# the full EmailStr validator
+EMAIL_REGEX = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+EMAIL_MAX_LENGTH = 254
@@ -1 +1,195 @@
-# Create your views here.
+import datetime
+import uuid
+
+from django.contrib import messages
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import InvalidPage
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from wagtail_modeladmin.views import EditView, IndexView
+
+from src.petitions.exports import (
+    export_filename,
+    export_storage,
+    filter_signatures,
+    stream_signatures_csv,
+)
+from src.petitions.forms import ImportSignaturesForm
+from src.petitions.models import Petition, PetitionSignature
+from src.petitions.pagination import EstimatedCountPaginator
+from src.petitions.services import StaleVersion
+
+
+def _bool_param(value):
+    if value in ("1", "true", "True"):
+        return True
+    if value in ("0", "false", "False"):
+        return False
+    return None
+
+
+def _date_param(value):
+    try:
+        return datetime.date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def export_signatures(request, petition_id):
+    """
+    Wagtail admin view exporting a petition's signatures.
+
+    Supports the same filters as the API export endpoint via the query string:
+    ``email_consent``, ``phone_consent``, ``date_from``, ``date_to``,
+    ``format`` (csv/xlsx) and ``background``.
+    """
+    opts = PetitionSignature._meta
+    if not request.user.has_perm(
+        f"{opts.app_label}.{get_permission_codename('view', opts)}"
+    ):
+        raise PermissionDenied
+
+    petition = get_object_or_404(Petition, pk=petition_id)
+    file_format = "xlsx" if request.GET.get("format") == "xlsx" else "csv"
+    filters = {
+        "email_consent": _bool_param(request.GET.get("email_consent")),
+        "phone_consent": _bool_param(request.GET.get("phone_consent")),
+        "date_from": _date_param(request.GET.get("date_from")),
+        "date_to": _date_param(request.GET.get("date_to")),
+    }
+
+    if file_format == "csv" and not _bool_param(request.GET.get("background")):
+        queryset = filter_signatures(petition.signatures.all(), **filters)
+        return stream_signatures_csv(queryset, export_filename(petition, "csv"))
+
+    from src.tasks.tasks import export_petition_signatures
+
+    for key in ("date_from", "date_to"):
+        if filters[key]:
+            filters[key] = filters[key].isoformat()
+    export_petition_signatures.delay(
+        petition.pk,
+        file_format=file_format,
+        filters=filters,
+        notify_email=request.user.email or None,
+        base_url=request.build_absolute_uri("/"),
+    )
+    messages.success(
+        request,
+        f"Eksport podpisów petycji „{petition.name}” został zlecony. "
+        "Link do pliku zostanie wysłany e-mailem.",
+    )
+    return redirect("wagtailadmin_home")
+
+
+def import_signatures(request, petition_id):
+    """
+    Wagtail admin view for uploading a CSV of offline signatures.
+
+    The upload is stored in the private export storage and imported by a
+    Celery task, so large files never block a web worker. A link to the
+    report of rejected rows is emailed to the uploader.
+    """
+    opts = PetitionSignature._meta
+    if not request.user.has_perm(
+        f"{opts.app_label}.{get_permission_codename('add', opts)}"
+    ):
+        raise PermissionDenied
+
+    petition = get_object_or_404(Petition, pk=petition_id)
+    form = ImportSignaturesForm(request.POST or None, request.FILES or None)
+
+    if request.method == "POST" and form.is_valid():
+        from src.tasks.tasks import import_petition_signatures
+
+        path = export_storage().save(
+            f"imports/uploads/{uuid.uuid4().hex}.csv", form.cleaned_data["file"]
+        )
+        import_petition_signatures.delay(
+            petition.pk,
+            path,
+            send_confirmations=form.cleaned_data["send_confirmations"],
+            notify_email=request.user.email or None,
+            base_url=request.build_absolute_uri("/"),
+        )
+        messages.success(
+            request,
+            f"Import podpisów do petycji „{petition.name}” został zlecony. "
+            "Raport zostanie wysłany e-mailem.",
+        )
+        return redirect("wagtailadmin_home")
+
+    return render(
+        request,
+        "petitions/admin/import_signatures.html",
+        {"petition": petition, "form": form},
+    )
+
+
+def petition_autocomplete(request):
+    """Return up to 20 petitions whose name matches ``q``, for admin filters."""
+    query = request.GET.get("q", "").strip()
+    petitions = Petition.objects.order_by("-created_at")
+    if query:
+        petitions = petitions.filter(name__icontains=query)
+    return JsonResponse(
+        {
+            "results": [
+                {"id": pk, "name": name}
+                for pk, name in petitions.values_list("id", "name")[:20]
+            ]
+        }
+    )
+
+
+class SignatureIndexView(IndexView):
+    """
+    Signature listing that avoids exact counts over the whole table.
+
+    The stock modeladmin index view runs ``COUNT(*)`` three times per page
+    (all rows, filtered rows and the paginator) and rebuilds the filtered
+    queryset. Here the counts come from ``EstimatedCountPaginator`` and the
+    queryset built in ``dispatch`` is reused.
+    """
+
+    def get_context_data(self, **kwargs):
+        paginator = EstimatedCountPaginator(self.queryset, self.items_per_page)
+        all_count = EstimatedCountPaginator(self.get_base_queryset(), 1).count
+
+        try:
+            page_obj = paginator.page(self.page_num + 1)
+        except InvalidPage:
+            page_obj = paginator.page(1)
+
+        context = {
+            "view": self,
+            "all_count": all_count,
+            "result_count": paginator.count,
+            "result_count_is_estimated": paginator.is_estimated,
+            "paginator": paginator,
+            "page_obj": page_obj,
+            "object_list": page_obj.object_list,
+            "user_can_create": self.permission_helper.user_can_create(
+                self.request.user
+            ),
+            "show_search": self.search_handler.show_search_form,
+        }
+        context.update(kwargs)
+        return super(IndexView, self).get_context_data(**context)
+
+
+class PetitionEditView(EditView):
+    """
+    Petition edit view that shows a conflicting edit as a form error.
+
+    PetitionForm.clean() checks the version, but another edit can still land
+    before the save; update_petition then raises StaleVersion.
+    """
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except StaleVersion:
+            form.add_error(None, form.STALE_VERSION_MESSAGE)
+            return self.form_invalid(form)
@@ -1,7 +1,48 @@
 
+from django.urls import path, reverse
+from wagtail import hooks
+from wagtail_modeladmin.helpers import ButtonHelper
 from wagtail_modeladmin.options import ModelAdmin, modeladmin_register
 
+from src.petitions import views
+from src.petitions.exports import download_export
+from src.petitions.filters import PetitionListFilter
 from src.petitions.models import Petition, PetitionSignature # Use absolute import
+from src.petitions.search import SignatureSearchHandler
+
+
+class PetitionButtonHelper(ButtonHelper):
+    """Adds a signature export button next to each petition."""
+
+    def export_button(self, obj, classnames_add=None):
+        classnames = self.edit_button_classnames + (classnames_add or [])
+        return {
+            'url': reverse('petitions_export_signatures', args=[obj.pk]),
+            'label': 'Eksport podpisów',
+            'classname': self.finalise_classname(classnames),
+            'title': f'Eksportuj podpisy petycji {obj.name} do CSV',
+        }
+
+    def import_button(self, obj, classnames_add=None):
+        classnames = self.edit_button_classnames + (classnames_add or [])
+        return {
+            'url': reverse('petitions_import_signatures', args=[obj.pk]),
+            'label': 'Import podpisów',
+            'classname': self.finalise_classname(classnames),
+            'title': f'Importuj podpisy do petycji {obj.name} z pliku CSV',
+        }
+
+    def get_buttons_for_obj(
+        self, obj, exclude=None, classnames_add=None, classnames_exclude=None
+    ):
+        buttons = super().get_buttons_for_obj(
+            obj, exclude, classnames_add, classnames_exclude
+        )
+        if 'export' not in (exclude or []):
+            buttons.append(self.export_button(obj, classnames_add))
+        if 'import' not in (exclude or []):
+            buttons.append(self.import_button(obj, classnames_add))
+        return buttons
 
 
 class PetitionAdmin(ModelAdmin):
@@ -13,6 +54,9 @@ class PetitionAdmin(ModelAdmin):
     list_display = ('name', 'target', 'signature_count', 'created_at', 'updated_at')
     search_fields = ('name', 'email_subject')
     list_filter = ('created_at', 'updated_at')
+    button_helper_class = PetitionButtonHelper
+    # Reports edits that race the version check as form errors
+    edit_view_class = views.PetitionEditView
     # You might want to make some fields read-only in the Wagtail admin too
     # inspect_view_enabled = True # Optionally enable an inspect view
 
@@ -33,7 +77,14 @@ class PetitionSignatureAdmin(ModelAdmin):
         'created_at',
     )
     search_fields = ('first_name', 'last_name', 'email', 'petition__name') # Allow searching by petition name
-    list_filter = ('petition', 'email_consent', 'phone_consent', 'created_at')
+    # Trigram-indexed search over names, normalized email/phone and petition name
+    search_handler_class = SignatureSearchHandler
+    # Lazy petition filter instead of listing every petition in the sidebar
+    list_filter = (PetitionListFilter, 'email_consent', 'phone_consent', 'created_at')
+    # Join the petition so the 'petition' column does not query once per row
+    list_select_related = ('petition',)
+    # Uses planner estimates instead of COUNT(*) on large tables
+    index_view_class = views.SignatureIndexView
     # Signatures are often best managed via the petition, maybe make them read-only here?
     # Or limit editing capabilities. For now, leave as default.
     inspect_view_enabled = False
@@ -42,6 +93,32 @@ class PetitionSignatureAdmin(ModelAdmin):
    
 
 
+@hooks.register('register_admin_urls')
+def register_petition_admin_urls():
+    return [
+        path(
+            'petitions/<int:petition_id>/signatures/export/',
+            views.export_signatures,
+            name='petitions_export_signatures',
+        ),
+        path(
+            'petitions/exports/<str:name>',
+            download_export,
+            name='petitions_download_export',
+        ),
+        path(
+            'petitions/<int:petition_id>/signatures/import/',
+            views.import_signatures,
+            name='petitions_import_signatures',
+        ),
+        path(
+            'petitions/autocomplete/',
+            views.petition_autocomplete,
+            name='petitions_autocomplete',
+        ),
+    ]
+
+
 # Register the ModelAdmin classes
 modeladmin_register(PetitionAdmin)
 modeladmin_register(PetitionSignatureAdmin)
@@ -0,0 +1,208 @@
+import atexit
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+from opentelemetry.trace import SpanKind
+
+from src.observability.tracing import attach, current_context, detach, get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    A per-process pool of persistent SMTP connections.
+
+    Each pooled connection is an opened Django SMTP backend, so TLS, SSL and
+    authentication behave exactly like the stock ``send_mail`` path. Idle
+    connections are health-checked with ``NOOP`` before being handed out and
+    ``drain()`` waits for in-flight sends before closing everything.
+    """
+
+    def __init__(self, size=4, health_check_interval=30, acquire_timeout=30, **params):
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.params = params
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _connect(self):
+        connection = SMTPEmailBackend(fail_silently=False, **self.params)
+        connection.open()
+        return connection
+
+    def _is_healthy(self, connection):
+        try:
+            status, _ = connection.connection.noop()
+        except (smtplib.SMTPException, OSError):
+            return False
+        return status == 250
+
+    def acquire(self):
+        """Borrow a healthy connection, opening a new one if none is idle."""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is draining")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("Timed out waiting for a free SMTP connection")
+        try:
+            while True:
+                try:
+                    connection, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                idle_for = time.monotonic() - last_used
+                if idle_for < self.health_check_interval or self._is_healthy(
+                    connection
+                ):
+                    return connection
+                self._discard(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if it is broken."""
+        try:
+            if discard or self._closed:
+                self._discard(connection)
+            else:
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def send(self, email_message, trace_context=None):
+        """
+        Send a single message over a pooled connection.
+
+        ``trace_context`` is the caller's tracing context; sends run on
+        executor threads, which do not inherit it.
+        """
+        token = attach(trace_context) if trace_context is not None else None
+        try:
+            with get_tracer().start_as_current_span(
+                "smtp.send",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "smtp.host": self.params.get("host") or settings.EMAIL_HOST
+                },
+            ):
+                connection = self.acquire()
+                try:
+                    sent = connection._send(email_message)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    self.release(connection, discard=True)
+                    raise
+                except Exception:
+                    self.release(connection)
+                    raise
+                self.release(connection)
+                return sent
+        finally:
+            if token is not None:
+                detach(token)
+
+    def drain(self, timeout=30):
+        """Stop handing out connections, wait for in-flight sends and close."""
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        acquired = 0
+        for _ in range(self.size):
+            if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                logger.warning("SMTP pool drained with sends still in flight")
+                break
+            acquired += 1
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+        for _ in range(acquired):
+            self._slots.release()
+
+
+_pool = None
+_executor = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """
+    Return the SMTP pool for the current process.
+
+    The pool is created lazily so prefork workers each build their own after
+    forking instead of sharing sockets inherited from the parent.
+    """
+    global _pool, _executor, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = SMTPConnectionPool(
+                size=settings.EMAIL_POOL_SIZE,
+                health_check_interval=settings.EMAIL_POOL_HEALTH_CHECK_INTERVAL,
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EMAIL_POOL_SIZE, thread_name_prefix="smtp-pool"
+            )
+            _pool_pid = os.getpid()
+        return _pool, _executor
+
+
+def drain_connection_pool(timeout=30):
+    """Gracefully close the current process' SMTP pool, if one was created."""
+    global _pool, _executor
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            return
+        _executor.shutdown(wait=True)
+        _pool.drain(timeout=timeout)
+        _pool = None
+        _executor = None
+
+
+atexit.register(drain_connection_pool)
+
+
+class PooledSMTPEmailBackend(BaseEmailBackend):
+    """
+    Email backend that sends over a shared pool of persistent SMTP connections.
+
+    Messages passed to a single ``send_messages`` call are sent concurrently,
+    one per pooled connection, so a worker process can keep several SMTP
+    transactions in flight instead of paying one round trip at a time.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        pool, executor = get_connection_pool()
+        trace_context = current_context()
+        futures = [
+            executor.submit(pool.send, message, trace_context)
+            for message in email_messages
+        ]
+        num_sent = 0
+        for future in futures:
+            try:
+                if future.result():
+                    num_sent += 1
+            except Exception:
+                if not self.fail_silently:
+                    raise
+        return num_sent
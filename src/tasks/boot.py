@@ -0,0 +1,80 @@
+"""
+Measure how long a process takes to boot and what it imports.
+
+Each measurement runs in a fresh interpreter so imports from the current
+process do not leak into the result.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Modules the worker's task path must not import: the web URL conf with the
+# admin URLs, the Ninja API and its pydantic schemas, headless preview, and
+# openpyxl, which XLSX exports import lazily.
+WORKER_HEAVY_MODULES = [
+    "src.mysite.urls",
+    "wagtail.admin.urls",
+    "django.contrib.admin.views.main",
+    "ninja",
+    "src.api.api",
+    "wagtail_headless_preview",
+    "openpyxl",
+]
+
+_BOOT_SCRIPTS = {
+    # What a gunicorn worker loads before serving: the WSGI app and URL conf
+    "web": (
+        "from src.mysite.wsgi import application\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    # What a Celery worker child loads before running its first task
+    "worker": (
+        "from src.tasks.celery import app\n"
+        "app.loader.import_default_modules()\n"
+        "import src.tasks.tasks\n"
+    ),
+}
+
+_MEASURE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec({script!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": seconds,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def measure_boot(role, settings_module):
+    """
+    Boot a ``role`` ("web" or "worker") process with ``settings_module``.
+
+    Returns the boot time in seconds, the peak RSS in KiB, the number of
+    imported modules and which WORKER_HEAVY_MODULES were imported.
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE.format(script=_BOOT_SCRIPTS[role])],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = set(report.pop("modules"))
+    report["module_count"] = len(modules)
+    report["heavy_modules"] = [
+        name
+        for name in WORKER_HEAVY_MODULES
+        if name in modules or any(m.startswith(f"{name}.") for m in modules)
+    ]
+    return report
@@ -1,8 +1,15 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
-# Set the default Django settings module for the 'celery' program.
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.mysite.settings")
+# Set the default Django settings module for the 'celery' program. The
+# worker profile leaves out the admin UIs, the Ninja API and other web-only
+# apps (see src/mysite/settings_worker.py); beat overrides it with the full
+# settings for the django_celery_beat scheduler.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.mysite.settings_worker")
+# System checks run with the web settings at deploy time. In workers they
+# would build the admin edit form of every page model on each boot.
+os.environ.setdefault("CELERY_SKIP_CHECKS", "true")
 
 app = Celery("tasks")
 
@@ -14,6 +21,14 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@worker_process_shutdown.connect
+def drain_smtp_pool(**kwargs):
+    """Let in-flight emails finish before a worker child exits."""
+    from src.tasks.backends import drain_connection_pool
+
+    drain_connection_pool()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
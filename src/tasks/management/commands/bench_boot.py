@@ -0,0 +1,71 @@
+import json
+import os
+import platform
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from src.tasks.boot import measure_boot
+
+SCENARIOS = {
+    "web": ("web", "src.mysite.settings"),
+    # Worker with the web settings, as before settings_worker existed
+    "worker_full_settings": ("worker", "src.mysite.settings"),
+    "worker": ("worker", "src.mysite.settings_worker"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare boot time, peak RSS and imported modules of a web process and "
+        "a Celery worker with the full and the slim worker settings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument(
+            "--output",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "boot.json"),
+            help="Where to write the machine-readable results",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for scenario, (role, settings_module) in SCENARIOS.items():
+            runs = [measure_boot(role, settings_module) for _ in range(options["runs"])]
+            results[scenario] = {
+                "settings": settings_module,
+                "median_seconds": round(
+                    statistics.median(run["seconds"] for run in runs), 3
+                ),
+                "median_max_rss_kb": statistics.median(
+                    run["max_rss_kb"] for run in runs
+                ),
+                "module_count": runs[-1]["module_count"],
+                "heavy_modules": runs[-1]["heavy_modules"],
+            }
+
+        report = {
+            "recorded_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "runs": options["runs"],
+            **results,
+        }
+
+        os.makedirs(os.path.dirname(options["output"]), exist_ok=True)
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2)
+
+        for scenario, result in results.items():
+            self.stdout.write(
+                f"{scenario:<22} {result['median_seconds']:>7.3f}s "
+                f"{result['median_max_rss_kb'] / 1024:>7.1f} MiB "
+                f"{result['module_count']:>5} modules"
+            )
+            if result["heavy_modules"]:
+                self.stdout.write(
+                    f"{'':<22} heavy: {', '.join(result['heavy_modules'])}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
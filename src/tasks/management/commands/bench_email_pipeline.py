@@ -0,0 +1,192 @@
+import json
+import math
+import os
+import platform
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from src.petitions.models import Petition, PetitionSignature
+from src.tasks.backends import drain_connection_pool
+from src.tasks.smtp_sink import SMTPSink
+from src.tasks.tasks import send_petition_confirmation_email
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile of ``values`` using nearest-rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Push synthetic signatures through send_petition_confirmation_email "
+        "against a local SMTP sink and record throughput, latency and DB "
+        "queries per message as a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--signatures", type=int, default=200)
+        parser.add_argument(
+            "--mode",
+            choices=("eager", "workers"),
+            default="eager",
+            help="Run tasks in-process (baseline) or through running Celery workers",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Simulated SMTP server latency per message, in seconds",
+        )
+        parser.add_argument(
+            "--failure-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of messages the SMTP sink rejects with a 451",
+        )
+        parser.add_argument(
+            "--backend",
+            default="django.core.mail.backends.smtp.EmailBackend",
+            help="Email backend to benchmark",
+        )
+        parser.add_argument(
+            "--host",
+            default="127.0.0.1",
+            help=(
+                "Interface the SMTP sink listens on. In workers mode the workers "
+                "must be started with EMAIL_HOST/EMAIL_PORT pointing at the sink"
+            ),
+        )
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument(
+            "--output",
+            default=os.path.join(
+                settings.BASE_DIR, "benchmarks", "email_pipeline.json"
+            ),
+            help="Where to write the machine-readable results",
+        )
+
+    def handle(self, *args, **options):
+        count = options["signatures"]
+        sink = SMTPSink(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            failure_rate=options["failure_rate"],
+        )
+        petition = Petition.objects.create(
+            name=f"Email pipeline benchmark {uuid.uuid4().hex[:8]}",
+            target=count,
+            email_subject="Benchmark confirmation",
+            email_content="Thank you for signing the benchmark petition.",
+        )
+
+        try:
+            with (
+                sink,
+                override_settings(
+                    EMAIL_BACKEND=options["backend"],
+                    EMAIL_HOST=sink.host,
+                    EMAIL_PORT=sink.port,
+                    EMAIL_USE_TLS=False,
+                    EMAIL_HOST_USER="",
+                    EMAIL_HOST_PASSWORD="",
+                ),
+            ):
+                committed_at = self._create_signatures(petition, count)
+                start = time.perf_counter()
+                if options["mode"] == "eager":
+                    results, queries = self._run_eager(committed_at)
+                else:
+                    results, queries = self._run_workers(committed_at), None
+                elapsed = time.perf_counter() - start
+                drain_connection_pool()
+
+                latencies = [
+                    sink.accepted_at[email] - committed
+                    for email, committed in committed_at.items()
+                    if email in sink.accepted_at
+                ]
+                rejected = sink.rejected
+        finally:
+            petition.delete()
+
+        failed = sum(1 for result in results if str(result).startswith("Error"))
+        report = {
+            "recorded_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "mode": options["mode"],
+            "backend": options["backend"],
+            "signatures": count,
+            "smtp_latency_s": options["latency"],
+            "smtp_failure_rate": options["failure_rate"],
+            "delivered": len(latencies),
+            "failed": failed,
+            "smtp_rejected": rejected,
+            "elapsed_s": round(elapsed, 4),
+            "throughput_msg_per_s": round(len(latencies) / elapsed, 2),
+            "latency_p50_ms": self._ms(percentile(latencies, 50)),
+            "latency_p99_ms": self._ms(percentile(latencies, 99)),
+            "db_queries_per_message": (
+                round(queries / count, 2) if queries is not None else None
+            ),
+        }
+
+        os.makedirs(os.path.dirname(options["output"]), exist_ok=True)
+        with open(options["output"], "w") as f:
+            json.dump(report, f, indent=2)
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:<24} {value}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Baseline written to {options['output']}")
+        )
+
+    def _create_signatures(self, petition, count):
+        """Create signatures one commit at a time, returning commit times by email."""
+        committed_at = {}
+        for i in range(count):
+            signature = PetitionSignature.objects.create(
+                petition=petition,
+                first_name="Bench",
+                last_name=f"Signer{i}",
+                email=f"bench-{petition.id}-{i}@example.com",
+                phone_number="+48123456789",
+                email_consent=True,
+            )
+            committed_at[signature.email] = time.time()
+        return committed_at
+
+    def _signature_ids(self, committed_at):
+        return PetitionSignature.objects.filter(
+            email__in=list(committed_at)
+        ).values_list("id", flat=True)
+
+    def _run_eager(self, committed_at):
+        signature_ids = list(self._signature_ids(committed_at))
+        results = []
+        with CaptureQueriesContext(connection) as ctx:
+            for signature_id in signature_ids:
+                results.append(
+                    send_petition_confirmation_email.apply((signature_id,)).get()
+                )
+        return results, len(ctx.captured_queries)
+
+    def _run_workers(self, committed_at):
+        pending = [
+            send_petition_confirmation_email.delay(signature_id)
+            for signature_id in self._signature_ids(committed_at)
+        ]
+        return [result.get(timeout=300) for result in pending]
+
+    def _ms(self, seconds):
+        return round(seconds * 1000, 2) if seconds is not None else None
@@ -0,0 +1,87 @@
+import time
+
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from src.tasks.backends import drain_connection_pool
+from src.tasks.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SMTP throughput of the per-message send_mail path with the "
+        "pooled backend against a local SMTP sink"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.02,
+            help="Simulated SMTP server latency per message, in seconds",
+        )
+        parser.add_argument("--pool-size", type=int, default=8)
+        parser.add_argument("--port", type=int, default=8025)
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        with SMTPSink(port=options["port"], latency=options["latency"]) as sink:
+            smtp_settings = {
+                "EMAIL_HOST": sink.host,
+                "EMAIL_PORT": sink.port,
+                "EMAIL_USE_TLS": False,
+                "EMAIL_HOST_USER": "",
+                "EMAIL_HOST_PASSWORD": "",
+                "EMAIL_POOL_SIZE": options["pool_size"],
+            }
+
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                **smtp_settings,
+            ):
+                baseline = self._time(self._send_one_by_one, count)
+
+            with override_settings(
+                EMAIL_BACKEND="src.tasks.backends.PooledSMTPEmailBackend",
+                **smtp_settings,
+            ):
+                pooled = self._time(self._send_batch, count)
+                drain_connection_pool()
+
+            delivered = len(sink.messages)
+
+        self.stdout.write(f"messages per run:  {count}")
+        self.stdout.write(f"send_mail:         {count / baseline:.1f} msg/s")
+        self.stdout.write(
+            f"pooled backend:    {count / pooled:.1f} msg/s "
+            f"(pool size {options['pool_size']})"
+        )
+        self.stdout.write(f"delivered to sink: {delivered}")
+
+    def _time(self, func, count):
+        start = time.perf_counter()
+        func(count)
+        return time.perf_counter() - start
+
+    def _send_one_by_one(self, count):
+        for i in range(count):
+            send_mail(
+                subject="Benchmark",
+                message="Benchmark message",
+                from_email="bench@example.com",
+                recipient_list=[f"signer{i}@example.com"],
+            )
+
+    def _send_batch(self, count):
+        messages = [
+            EmailMessage(
+                subject="Benchmark",
+                body="Benchmark message",
+                from_email="bench@example.com",
+                to=[f"signer{i}@example.com"],
+            )
+            for i in range(count)
+        ]
+        get_connection().send_messages(messages)
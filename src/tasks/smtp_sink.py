@@ -0,0 +1,79 @@
+import asyncio
+import random
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+
+class SinkHandler:
+    """
+    aiosmtpd handler that accepts messages after an optional delay.
+
+    A ``failure_rate`` between 0 and 1 makes the sink reject that fraction of
+    messages with a temporary error. Accepted messages are recorded together
+    with the wall-clock time they were accepted, keyed by recipient.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.messages = []
+        self.accepted_at = {}
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            with self._lock:
+                self.rejected += 1
+            return "451 Requested action aborted: local error in processing"
+        accepted_at = time.time()
+        with self._lock:
+            self.messages.append(envelope)
+            for recipient in envelope.rcpt_tos:
+                self.accepted_at[recipient] = accepted_at
+        return "250 Message accepted for delivery"
+
+    @property
+    def count(self):
+        with self._lock:
+            return len(self.messages)
+
+
+class SMTPSink:
+    """
+    A local SMTP server running in a background thread, for tests and benchmarks.
+
+    Usage:
+        with SMTPSink(latency=0.05) as sink:
+            # point EMAIL_HOST/EMAIL_PORT at sink.host/sink.port
+            ...
+    """
+
+    def __init__(self, host="127.0.0.1", port=8025, latency=0.0, failure_rate=0.0):
+        self.host = host
+        self.port = port
+        self.handler = SinkHandler(latency=latency, failure_rate=failure_rate)
+        self.controller = Controller(self.handler, hostname=host, port=port)
+
+    def __enter__(self):
+        self.controller.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.controller.stop()
+
+    @property
+    def messages(self):
+        return self.handler.messages
+
+    @property
+    def accepted_at(self):
+        return self.handler.accepted_at
+
+    @property
+    def rejected(self):
+        return self.handler.rejected
@@ -1,5 +1,5 @@
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
 
 
@@ -11,6 +11,8 @@ def send_petition_confirmation_email(signature_id):
     Args:
         signature_id: The ID of the PetitionSignature
     """
+    from src.observability.metrics import record_emails
+    from src.observability.tracing import get_tracer
     from src.petitions.models import PetitionSignature
 
     try:
@@ -23,17 +25,398 @@ def send_petition_confirmation_email(signature_id):
         petition = signature.petition
 
         # Send the email
-        send_mail(
-            subject=petition.email_subject,
-            message=petition.email_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[signature.email],
-            fail_silently=False,
-        )
+        with get_tracer().start_as_current_span(
+            "email.send", attributes={"email.backend": settings.EMAIL_BACKEND}
+        ):
+            send_mail(
+                subject=petition.email_subject,
+                message=petition.email_content,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[signature.email],
+                fail_silently=False,
+            )
+        record_emails(sent=1)
 
         return f"Confirmation email sent to {signature.email} for petition: {petition.name}"
 
     except PetitionSignature.DoesNotExist:
         return f"Error: Signature with ID {signature_id} not found"
     except Exception as e:
+        record_emails(failed=1)
         return f"Error sending confirmation email: {str(e)}"
+
+
+@shared_task
+def send_petition_confirmation_emails(signature_ids):
+    """
+    Send confirmation emails for many signatures in one task.
+
+    With the pooled SMTP backend the messages are delivered concurrently over
+    the worker's persistent connections.
+
+    Args:
+        signature_ids: IDs of PetitionSignature objects
+    """
+    from src.observability.metrics import record_emails
+    from src.petitions.models import PetitionSignature
+
+    signatures = PetitionSignature.objects.select_related("petition").filter(
+        id__in=signature_ids
+    )
+    messages = [
+        EmailMessage(
+            subject=signature.petition.email_subject,
+            body=signature.petition.email_content,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[signature.email],
+        )
+        for signature in signatures
+    ]
+
+    try:
+        sent = get_connection(fail_silently=False).send_messages(messages)
+    except Exception as e:
+        record_emails(failed=len(messages))
+        return f"Error sending confirmation emails: {str(e)}"
+    record_emails(sent=sent, failed=len(messages) - sent)
+
+    return f"Sent {sent} of {len(signature_ids)} confirmation emails"
+
+
+@shared_task
+def export_petition_signatures(
+    petition_id, file_format="csv", filters=None, notify_email=None, base_url=None
+):
+    """
+    Write a petition's signatures to a file in the private export storage.
+
+    Args:
+        petition_id: The ID of the Petition
+        file_format: "csv" or "xlsx"
+        filters: Export filters (email_consent, phone_consent, date_from,
+            date_to) with dates as ISO strings
+        notify_email: Address to notify with the download link when ready
+        base_url: Absolute URL of the site the export was requested on, for
+            the download link
+    """
+    import datetime
+
+    from src.petitions.exports import (
+        download_url,
+        export_filename,
+        filter_signatures,
+        write_signatures_file,
+    )
+    from src.petitions.models import Petition
+
+    filters = dict(filters or {})
+    for key in ("date_from", "date_to"):
+        if filters.get(key):
+            filters[key] = datetime.date.fromisoformat(filters[key])
+
+    try:
+        petition = Petition.objects.get(id=petition_id)
+    except Petition.DoesNotExist:
+        return f"Error: Petition with ID {petition_id} not found"
+
+    queryset = filter_signatures(petition.signatures.all(), **filters)
+    path = write_signatures_file(
+        queryset, export_filename(petition, file_format), file_format
+    )
+
+    if notify_email:
+        url = download_url(path, base_url)
+        send_mail(
+            subject=f"Signature export ready: {petition.name}",
+            message=f"Your export is ready (staff login required): {url}",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[notify_email],
+            fail_silently=False,
+        )
+
+    return path
+
+
+@shared_task
+def import_petition_signatures(
+    petition_id, path, send_confirmations=False, notify_email=None, base_url=None
+):
+    """
+    Import an uploaded CSV of offline signatures from the export storage.
+
+    Args:
+        petition_id: The ID of the Petition
+        path: Storage path of the uploaded CSV file
+        send_confirmations: Whether to queue confirmation emails
+        notify_email: Address to send the import report to
+        base_url: Absolute URL of the site the import was requested on, for
+            the report link
+    """
+    import io
+    import uuid
+
+    from django.core.files.base import ContentFile
+
+    from src.observability.metrics import record_signatures
+    from src.petitions.exports import download_url, export_storage
+    from src.petitions.imports import import_signatures_csv
+    from src.petitions.models import Petition
+
+    try:
+        petition = Petition.objects.get(id=petition_id)
+    except Petition.DoesNotExist:
+        return f"Error: Petition with ID {petition_id} not found"
+
+    storage = export_storage()
+    try:
+        with storage.open(path, "rb") as f:
+            text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+            report = import_signatures_csv(
+                petition, text, send_confirmations=send_confirmations
+            )
+    except ValueError as e:
+        return f"Error importing signatures: {str(e)}"
+    finally:
+        storage.delete(path)
+
+    record_signatures(report.imported, source="import")
+
+    summary = (
+        f"Imported {report.imported} of {report.total} rows into {petition.name} "
+        f"({report.duplicates} duplicates, {len(report.rejected)} rejected)"
+    )
+    if notify_email:
+        rejected = io.StringIO()
+        report.write_rejected_csv(rejected)
+        # Served by download_export, which only takes top-level names
+        report_path = storage.save(
+            f"petition-{petition.pk}-rejected-{uuid.uuid4().hex}.csv",
+            ContentFile(rejected.getvalue().encode("utf-8")),
+        )
+        send_mail(
+            subject=f"Signature import finished: {petition.name}",
+            message=(
+                f"{summary}\n\nRejected rows (staff login required): "
+                f"{download_url(report_path, base_url)}"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[notify_email],
+            fail_silently=False,
+        )
+
+    return summary
+
+
+@shared_task
+def snapshot_petition_page(page_id):
+    """
+    Write the static snapshot of a PetitionPage and revalidate the frontend.
+
+    Unpublished pages have their snapshot removed instead. Snapshots left at
+    the old path of deleted or moved pages are removed by
+    remove_petition_page_snapshot.
+
+    Args:
+        page_id: The ID of the PetitionPage
+    """
+    from src.cms.models import PetitionPage
+    from src.cms.snapshots import (
+        notify_revalidate,
+        page_url,
+        remove_page_snapshot,
+        write_page_snapshot,
+    )
+
+    page = PetitionPage.objects.select_related("petition").filter(id=page_id).first()
+    if page is None:
+        return f"Error: PetitionPage with ID {page_id} not found"
+
+    if not page.live:
+        remove_page_snapshot(page)
+        paths = [page_url(page)] if page_url(page) else []
+    else:
+        paths = write_page_snapshot(page)
+    notify_revalidate(paths)
+    return f"Snapshot updated for {', '.join(paths) or page.title}"
+
+
+@shared_task
+def remove_petition_page_snapshot(url, page_id=None):
+    """
+    Remove the snapshot a PetitionPage left at ``url`` and revalidate it.
+
+    Args:
+        url: The public path the page was served at, e.g. ``/save-the-park/``
+        page_id: The ID of a deleted PetitionPage, to also remove its JSON
+    """
+    from src.cms.snapshots import notify_revalidate, remove_snapshot
+
+    remove_snapshot(url, page_id)
+    notify_revalidate([url])
+    return f"Snapshot removed for {url}"
+
+
+@shared_task
+def snapshot_petition(petition_id):
+    """
+    Refresh the snapshots of every live page showing a petition.
+
+    Args:
+        petition_id: The ID of the Petition
+    """
+    from src.cms.models import PetitionPage
+
+    page_ids = list(
+        PetitionPage.objects.live()
+        .filter(petition_id=petition_id)
+        .values_list("id", flat=True)
+    )
+    for page_id in page_ids:
+        snapshot_petition_page(page_id)
+    return f"Refreshed {len(page_ids)} snapshot(s) for petition {petition_id}"
+
+
+@shared_task
+def refresh_snapshot_counts():
+    """
+    Rewrite only the count.json fragments of petitions shown on live pages.
+
+    Runs periodically from Celery beat. The page HTML and JSON snapshots are
+    left alone, so new signatures never trigger a re-render.
+    """
+    from src.cms.models import PetitionPage
+    from src.cms.snapshots import write_count_snapshot
+    from src.petitions.models import Petition
+
+    petitions = Petition.objects.filter(
+        id__in=PetitionPage.objects.live().values("petition_id")
+    ).values_list("id", "signature_count", "target")
+    refreshed = 0
+    for petition_id, signature_count, target in petitions:
+        write_count_snapshot(petition_id, signature_count, target)
+        refreshed += 1
+    return f"Refreshed {refreshed} count snapshot(s)"
+
+
+@shared_task
+def generate_image_rendition(image_id, filter_spec):
+    """
+    Generate one image rendition ahead of the first request for it.
+
+    Args:
+        image_id: The ID of the Wagtail image
+        filter_spec: The rendition filter, e.g. "width-500"
+    """
+    from src.cms.renditions import generate_rendition
+
+    if not generate_rendition(image_id, filter_spec):
+        return f"Error: Image with ID {image_id} not found"
+    return f"Rendition {filter_spec} ready for image {image_id}"
+
+
+@shared_task
+def update_page_search_index(page_ids):
+    """
+    Re-index petition pages in the Wagtail search backend.
+
+    Args:
+        page_ids: IDs of the PetitionPages to index
+    """
+    from wagtail.search import index
+
+    from src.cms.models import PetitionPage
+
+    pages = PetitionPage.objects.filter(id__in=page_ids).select_related("petition")
+    indexed = 0
+    for page in pages:
+        index.insert_or_update_object(page)
+        indexed += 1
+    return f"Indexed {indexed} page(s)"
+
+
+@shared_task
+def notify_staff_of_milestone(milestone_id):
+    """
+    Email active staff members that a petition reached a milestone.
+
+    Args:
+        milestone_id: The ID of the PetitionMilestone
+    """
+    from django.contrib.auth import get_user_model
+
+    from src.petitions.models import PetitionMilestone
+
+    milestone = (
+        PetitionMilestone.objects.select_related("petition")
+        .filter(id=milestone_id)
+        .first()
+    )
+    if milestone is None:
+        return f"Error: PetitionMilestone with ID {milestone_id} not found"
+
+    recipients = list(
+        get_user_model()
+        .objects.filter(is_staff=True, is_active=True)
+        .exclude(email="")
+        .values_list("email", flat=True)
+    )
+    if recipients:
+        petition = milestone.petition
+        send_mail(
+            subject=f"Petycja „{petition.name}” osiągnęła {milestone.threshold}% celu",
+            message=(
+                f"Petycja „{petition.name}” ma już {milestone.signature_count} "
+                f"podpisów z {milestone.target}."
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=recipients,
+        )
+    return f"Milestone {milestone} sent to {len(recipients)} staff member(s)"
+
+
+@shared_task
+def refresh_petition_after_milestone(milestone_id):
+    """
+    Drop cached counts, page renders and CDN responses of a petition that
+    reached a milestone and refresh its snapshots, so it shows right away.
+
+    Args:
+        milestone_id: The ID of the PetitionMilestone
+    """
+    from django.core.cache import cache
+
+    from src.cms.caching import invalidate_page
+    from src.cms.models import PetitionPage
+    from src.petitions.cache import signature_count_cache_key
+    from src.petitions.models import PetitionMilestone
+
+    petition_id = (
+        PetitionMilestone.objects.filter(id=milestone_id)
+        .values_list("petition_id", flat=True)
+        .first()
+    )
+    if petition_id is None:
+        return f"Error: PetitionMilestone with ID {milestone_id} not found"
+
+    cache.delete(signature_count_cache_key(petition_id))
+    for page_id in PetitionPage.objects.filter(petition_id=petition_id).values_list(
+        "pk", flat=True
+    ):
+        invalidate_page(page_id)
+    purge_petition_cache(petition_id)
+    return snapshot_petition(petition_id)
+
+
+@shared_task
+def purge_petition_cache(petition_id):
+    """
+    Purge the CDN's cached API responses showing a petition.
+
+    Args:
+        petition_id: The ID of the Petition
+    """
+    from src.api.caching import purge_petition
+
+    if not purge_petition(petition_id):
+        return f"CDN purge skipped or failed for petition {petition_id}"
+    return f"Purged cached responses of petition {petition_id}"
@@ -3,6 +3,7 @@ from django.core import mail
 from unittest.mock import patch, MagicMock
 
 from src.petitions.models import Petition, PetitionSignature
+from src.tasks.boot import measure_boot
 from src.tasks.tasks import send_petition_confirmation_email
 
 
@@ -86,3 +87,89 @@ class TestCeleryTasks:
 
             # Check that delay was called with the correct arguments
             mock_delay.assert_called_once_with(signature.id)
+
+
+class TestPooledSMTPEmailBackend:
+    """Tests for the pooled SMTP email backend"""
+
+    @pytest.fixture
+    def sink(self, settings):
+        """Run a local SMTP sink and point the email settings at it"""
+        from src.tasks.backends import drain_connection_pool
+        from src.tasks.smtp_sink import SMTPSink
+
+        with SMTPSink(port=8026) as sink:
+            settings.EMAIL_BACKEND = "src.tasks.backends.PooledSMTPEmailBackend"
+            settings.EMAIL_HOST = sink.host
+            settings.EMAIL_PORT = sink.port
+            settings.EMAIL_USE_TLS = False
+            settings.EMAIL_POOL_SIZE = 2
+            yield sink
+            drain_connection_pool()
+
+    def test_send_messages_concurrently(self, sink):
+        """Test that a batch is delivered over the pooled connections"""
+        from django.core.mail import EmailMessage, get_connection
+
+        messages = [
+            EmailMessage("Subject", "Body", "from@example.com", [f"to{i}@example.com"])
+            for i in range(10)
+        ]
+
+        sent = get_connection().send_messages(messages)
+
+        assert sent == 10
+        assert len(sink.messages) == 10
+
+    def test_connections_are_reused(self, sink):
+        """Test that the pool keeps connections open between sends"""
+        from django.core.mail import send_mail
+        from src.tasks.backends import get_connection_pool
+
+        for i in range(5):
+            send_mail("Subject", "Body", "from@example.com", [f"to{i}@example.com"])
+
+        pool, _ = get_connection_pool()
+        assert 0 < pool._idle.qsize() <= 2
+        assert len(sink.messages) == 5
+
+
+class TestEmailPipelineBenchmark:
+    """Tests for the email pipeline benchmark helpers"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        from src.tasks.management.commands.bench_email_pipeline import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+
+    def test_sink_failure_injection(self):
+        """Test that the SMTP sink rejects messages when asked to"""
+        import smtplib
+
+        from src.tasks.smtp_sink import SMTPSink
+
+        with SMTPSink(port=8027, failure_rate=1.0) as sink:
+            with smtplib.SMTP(sink.host, sink.port) as client:
+                with pytest.raises(smtplib.SMTPDataError):
+                    client.sendmail("from@example.com", ["to@example.com"], "Body")
+
+        assert sink.rejected == 1
+        assert sink.accepted_at == {}
+
+
+class TestWorkerBoot:
+    """Tests for the slim Celery worker settings"""
+
+    def test_task_path_avoids_heavy_imports(self):
+        """Test a worker booted with settings_worker imports no web-only modules"""
+        report = measure_boot("worker", "src.mysite.settings_worker")
+        assert report["heavy_modules"] == []
+
+    def test_web_boot_is_detected(self):
+        """Test the check sees the modules a web process loads"""
+        report = measure_boot("web", "src.mysite.settings")
+        assert {"src.mysite.urls", "ninja"} <= set(report["heavy_modules"])